@@ -0,0 +1,43 @@
+"""
+Benchmark loading and running path checks as separate checks and as one
+batched check.
+
+    $ python benchmarks/batch.py [number of paths ...]
+"""
+import sys
+import tempfile
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from geomancy.checks import Check
+
+
+def run(d: dict) -> float:
+    """Load and run the checks in the dict and return the elapsed time"""
+    done = threading.Event()
+    start = time.perf_counter()
+    check = Check.load(d, name="Benchmark")
+    with ThreadPoolExecutor() as executor:
+        result = check.check(executor=executor)
+        result.listeners.append(lambda r: r.done and done.set())
+        if not result.done:
+            done.wait()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [5_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            paths = [str(Path(tmp) / f"file{i}.txt") for i in range(count)]
+            for path in paths:
+                Path(path).touch()
+
+            d = {f"Path{i}": {"checkPath": path} for i, path in enumerate(paths)}
+            elapsed = run({"Paths": d})
+            print(f"separate: {count} paths in {elapsed:.3f}s")
+
+            elapsed = run({"Paths": {"checkPath": paths}})
+            print(f"batched: {count} paths in {elapsed:.3f}s")
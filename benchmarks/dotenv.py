@@ -0,0 +1,83 @@
+"""
+Benchmark parsing, streaming, loading and tokenizing with the cache large env
+files with unquoted, double-quoted, single-quoted and multiline values and
+comments, and the peak memory used.
+
+    $ python benchmarks/dotenv.py [number of lines ...]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from geomancy.environment import parse_env, load_snapshot
+from geomancy.environment.cache import EnvCache
+from geomancy.environment.dotenv import stream_env
+
+
+def env_file(count: int) -> str:
+    """Create the contents of an env file with the given number of lines"""
+    lines = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            lines.append(f"BENCH_VAR{i}=value {i} # comment")
+        elif kind == 1:
+            lines.append(f'BENCH_VAR{i}="quoted ${{BENCH_VAR{i - 1}}}\\t{i}"')
+        elif kind == 2:
+            lines.append(f"BENCH_VAR{i}='literal $BENCH_VAR{i - 1}'")
+        elif kind == 3:
+            lines.append(f'BENCH_VAR{i}="""multiline\n{i}"""')
+        else:
+            lines.append(f"# comment {i}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1_000, 10_000, 100_000]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in counts:
+            string = env_file(count)
+            filepath = Path(tmpdir) / f"bench{count}.env"
+            filepath.write_text(string)
+
+            def read_parse():
+                return parse_env(filepath.read_text())
+
+            def stream():
+                return sum(1 for _ in stream_env(filepath))
+
+            def load():
+                return load_snapshot(filepath)
+
+            size = filepath.stat().st_size / 1024**2
+            for name, func in (("parse_env", read_parse), ("stream_env", stream)):
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+
+                # Measure the peak memory separately, since tracing is slow
+                tracemalloc.start()
+                func()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{name}: {count} lines ({size:.1f}MB) in {elapsed:.3f}s, "
+                    f"peak memory {peak / 1024 ** 2:.1f}MB"
+                )
+
+            start = time.perf_counter()
+            env = load()
+            elapsed = time.perf_counter() - start
+            assert len(env) >= count - count // 5
+            print(f"load_snapshot: {count} lines in {elapsed:.3f}s")
+
+            # Tokenize without the cached tokens, then with the cached tokens
+            cache = EnvCache(Path(tmpdir) / "cache")
+            for name in ("EnvCache (miss)", "EnvCache (hit)"):
+                start = time.perf_counter()
+                tokens, _ = cache.tokenize(filepath)
+                elapsed = time.perf_counter() - start
+                print(f"{name}: {count} lines in {elapsed:.3f}s")
+            cache.clear()
@@ -0,0 +1,49 @@
+"""
+Benchmark the thread and process executors with CPU-bound checks.
+
+    $ python benchmarks/executors.py [number of checks] [iterations per check]
+"""
+import typing as t
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from geomancy.checks import Check, Result
+from geomancy.checks.base import Executor
+from geomancy.checks.executors import ProcessExecutor
+
+
+class CheckBusy(Check):
+    """A check that holds the GIL for a number of iterations"""
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        total = sum(i * i for i in range(int(self.raw_value)))
+        return Result(msg=f"{self.name} ({total})", status="passed")
+
+
+def run(check: Check, executor: Executor) -> float:
+    """Run the check with the executor and return the elapsed time"""
+    done = threading.Event()
+    start = time.perf_counter()
+    with executor:
+        result = check.check(executor=executor)
+        result.listeners.append(lambda r: r.done and done.set())
+        if not result.done:
+            done.wait()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    iterations = sys.argv[2] if len(sys.argv) > 2 else "1000000"
+    children = [CheckBusy(name=f"Busy{i}", value=iterations) for i in range(count)]
+    check = Check(name="Benchmark", children=children)
+
+    elapsed = run(check, ThreadPoolExecutor())
+    print(f"threads: {count} checks in {elapsed:.2f}s")
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        elapsed = run(check, ProcessExecutor(max_workers=workers))
+        print(f"processes ({workers} workers): {count} checks in {elapsed:.2f}s")
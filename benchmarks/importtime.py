@@ -0,0 +1,71 @@
+"""
+Benchmark the import time of geo commands with 'python -X importtime', and
+check that the commands start within their budgets.
+
+    $ python benchmarks/importtime.py [number of runs]
+"""
+import typing as t
+import subprocess
+import sys
+
+#: The import time budget, in milliseconds, for geo commands
+budgets = {
+    ("--version",): 100.0,
+    ("run", "true"): 100.0,
+}
+
+#: The modules that geo commands shouldn't import, by command
+unused = {
+    ("--version",): ("rich", "yaml", "thatway", "asyncio", "geomancy.checks"),
+    ("run", "true"): ("rich", "yaml", "thatway", "asyncio", "geomancy.checks"),
+}
+
+code = """
+import sys
+from geomancy.entrypoints import geo_cli
+try:
+    geo_cli({args!r})
+except SystemExit:
+    pass
+"""
+
+
+def importtime(args: t.Tuple[str, ...]) -> t.Tuple[float, t.List[str]]:
+    """The total import time, in milliseconds, and the imported modules of a geo
+    command"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code.format(args=list(args))],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    # Lines are formatted as: 'import time: self [us] | cumulative | package'
+    total, modules = 0, []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append(name.strip())
+        if not name.startswith("  "):  # top-level imports
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    passed = True
+    for args, budget in budgets.items():
+        results = [importtime(args) for _ in range(runs)]
+        elapsed = min(elapsed for elapsed, _ in results)
+        imported = [m for m in unused[args] if m in results[0][1]]
+
+        within = elapsed <= budget and not imported
+        passed &= within
+        print(
+            f"geo {' '.join(args)}: {elapsed:.1f}ms (budget {budget:.0f}ms)"
+            + (f", imports {', '.join(imported)}" if imported else "")
+            + ("" if within else " -- OVER BUDGET")
+        )
+
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,37 @@
+"""
+Benchmark loading checks from large synthetic check trees.
+
+    $ python benchmarks/load.py [number of checks ...]
+"""
+import sys
+import time
+
+from geomancy.checks import Check
+
+
+def tree(count: int, width: int = 100) -> dict:
+    """A dict for a check tree with groups of 'width' environment checks and
+    about 'count' checks in total"""
+    groups = max(count // (width + 1), 1)
+    return {
+        f"Group{i}": {
+            f"Check{j}": {"checkEnv": f"$VALUE{j}", "desc": "A check"}
+            for j in range(width)
+        }
+        for i in range(groups)
+    }
+
+
+def run(d: dict) -> float:
+    """Load the checks in the dict and return the elapsed time"""
+    start = time.perf_counter()
+    Check.load(d, name="Benchmark")
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for count in counts:
+        d = tree(count)
+        elapsed = run(d)
+        print(f"load: {count} checks in {elapsed:.3f}s")
@@ -0,0 +1,33 @@
+"""
+Benchmark the memory used by large check trees.
+
+    $ python benchmarks/memory.py [number of checks ...]
+"""
+import sys
+import tracemalloc
+
+from geomancy.checks import Check
+
+from load import tree
+
+
+def run(d: dict) -> int:
+    """Load the checks in the dict and return the memory used by the tree, in
+    bytes"""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.take_snapshot()
+        check = Check.load(d, name="Benchmark")
+        end = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    assert check is not None
+    return sum(stat.size_diff for stat in end.compare_to(start, "filename"))
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for count in counts:
+        d = tree(count)
+        size = run(d)
+        print(f"memory: {count} checks in {size / 2**20:.1f}MB")
@@ -0,0 +1,44 @@
+"""
+Benchmark parsing large YAML checks files with the pure-python and libyaml
+loaders.
+
+    $ python benchmarks/parse.py [number of checks ...]
+"""
+import typing as t
+import sys
+import time
+
+import yaml
+
+from load import tree
+
+
+def run(data: str, loader: t.Type) -> t.Tuple[float, dict]:
+    """Parse the YAML data with the loader and return the elapsed time and the
+    parsed dict"""
+    start = time.perf_counter()
+    d = yaml.load(data, Loader=loader)
+    return time.perf_counter() - start, d
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    loaders = [yaml.SafeLoader]
+    if hasattr(yaml, "CSafeLoader"):
+        loaders.append(yaml.CSafeLoader)
+    else:
+        print("PyYAML wasn't built with libyaml. CSafeLoader isn't available.")
+
+    for count in counts:
+        data = yaml.dump(
+            tree(count), Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        )
+        size = len(data.encode()) / 1024**2
+        parsed = []
+        for loader in loaders:
+            elapsed, d = run(data, loader)
+            parsed.append(d)
+            print(f"{loader.__name__}: {count} checks ({size:.1f}MB) in {elapsed:.3f}s")
+
+        # The loaders should parse the same checks
+        assert all(d == parsed[0] for d in parsed)
@@ -0,0 +1,85 @@
+"""
+Benchmark running the checks of a large YAML checks file while it's parsed,
+compared to loading the checks file before running its checks.
+
+    $ python benchmarks/stream.py [number of checks] [seconds per check]
+"""
+import typing as t
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from geomancy.checks import Check, Result
+from geomancy.checks.base import Executor, Scheduler
+from geomancy.entrypoints.check import load_checks_file, run_checks_file
+
+
+class CheckWait(Check):
+    """A check that waits on I/O for a number of seconds"""
+
+    aliases = ("checkWait",)
+
+    #: The times (see time.perf_counter) when the checks finished
+    finished: t.List[float] = []
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        time.sleep(float(self.raw_value))
+        self.finished.append(time.perf_counter())
+        return Result(msg=self.name, status="passed")
+
+
+def tree(count: int, seconds: float, width: int = 100) -> dict:
+    """A dict for a checks file with groups of 'width' checks and about 'count'
+    checks in total"""
+    return {
+        f"Group{i}": {
+            f"Check{j}": {"checkWait": seconds, "desc": "A check"} for j in range(width)
+        }
+        for i in range(max(count // (width + 1), 1))
+    }
+
+
+def run(checks_file: Path, stream: bool) -> t.Tuple[float, float]:
+    """Load and run the checks of a checks file, and return the elapsed times
+    until the first check finished and until all checks finished"""
+    CheckWait.finished.clear()
+    done = threading.Event()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        scheduler = Scheduler(root=None, executor=executor)
+        if stream:
+            _, result = run_checks_file(checks_file, scheduler)
+        else:
+            check = load_checks_file(checks_file)
+            scheduler.add(check)
+            result = check.check(executor=scheduler)
+        result.listeners.append(lambda r: r.done and done.set())
+        if not result.done:
+            done.wait()
+    return min(CheckWait.finished) - start, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        checks_file = Path(tmpdir) / "checks.yaml"
+        checks_file.write_text(
+            yaml.dump(
+                tree(count, seconds),
+                Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+            )
+        )
+        for stream in (False, True):
+            first, elapsed = run(checks_file, stream=stream)
+            name = "stream" if stream else "load, then run"
+            print(
+                f"{name}: {count} checks in {elapsed:.2f}s (first check finished "
+                f"in {first:.2f}s)"
+            )
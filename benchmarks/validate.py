@@ -0,0 +1,39 @@
+"""
+Benchmark validating large YAML checks files, compared to parsing them and
+loading their checks.
+
+    $ python benchmarks/validate.py [number of checks ...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from geomancy.entrypoints.loader import ChecksLoader
+from geomancy.entrypoints.validate import Schema, validate_checks_file
+from load import tree
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    schema = Schema()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in counts:
+            checks_file = Path(tmpdir) / f"checks{count}.yaml"
+            checks_file.write_text(
+                yaml.dump(
+                    tree(count), Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+                )
+            )
+
+            start = time.perf_counter()
+            issues, _ = validate_checks_file(checks_file, schema)
+            elapsed = time.perf_counter() - start
+            assert issues == []
+            print(f"validate: {count} checks in {elapsed:.3f}s")
+
+            start = time.perf_counter()
+            ChecksLoader().load(checks_file)
+            elapsed = time.perf_counter() - start
+            print(f"load: {count} checks in {elapsed:.3f}s")
@@ -1,4 +1,7 @@
-from . import checks, environment
+import importlib
+
+#: Sub-packages that are imported when they're first used (see __getattr__)
+_subpackages = ("checks", "environment")
 
 # Project version
 __version__ = (1, 2, 4)  # Major, minor, patch, stage
@@ -18,3 +21,11 @@ def get_version(version=__version__):
         return ".".join(map(str, version[:-1])) + version[-1]
     else:
         return ".".join(map(str, version))
+
+
+def __getattr__(name):
+    """Import sub-packages when they're first used, which keeps the CLI startup
+    fast"""
+    if name in _subpackages:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
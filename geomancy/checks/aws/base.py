@@ -1,10 +1,12 @@
 """Base class for AWS checks"""
 import typing as t
+import os
 from functools import lru_cache
 
 from thatway import Setting
 
 from ..base import Check, Result, Executor, CheckException
+from ...environment import current_env
 
 __all__ = ("CheckAws",)
 
@@ -20,8 +22,12 @@ import_error_msg = (
 class CheckAws(Check):
     """Abstract base class for AWS checks"""
 
+    __slots__ = ("profile",)
+
     import_error_msg = import_error_msg
 
+    resource = "aws"
+
     #: Profile name to use to authenticate the AWS client, str
     profile: t.Optional[str]
 
@@ -40,6 +46,46 @@ class CheckAws(Check):
         # Hash method used for LRU caching
         return hash((self.__class__.__name__, self.profile))
 
+    def session(self, profile: t.Optional[str] = None) -> "boto3.Session":
+        """Create an AWS session for the given profile.
+
+        The AWS environment variables, like AWS_PROFILE, AWS_DEFAULT_REGION and
+        AWS_ACCESS_KEY_ID, are read from the current environment (see
+        :func:`current_env <geomancy.environment.current_env>`), which may be a
+        snapshot with variables loaded from environment files.
+
+        Raises
+        ------
+        botocore.exceptions.ProfileNotFound
+            The specified profile name could not be found
+        """
+        boto3, botocore_session = self.import_modules("boto3", "botocore.session")
+        environ = current_env()
+        if environ is os.environ:
+            # boto3 reads the environment variables of the process
+            return boto3.Session(profile_name=profile)
+
+        # Set the session variables, like the region, from the snapshot
+        session = botocore_session.Session()
+        for name, (_, env_vars, _, _) in session.session_var_map.items():
+            env_vars = (env_vars,) if isinstance(env_vars, str) else env_vars or ()
+            for env_var in env_vars:
+                if env_var in environ and name != "profile":
+                    session.set_config_variable(name, environ[env_var])
+
+        # Credentials from environment variables are used before profiles,
+        # unless a profile is specified
+        kwargs = {}
+        if profile is None:
+            profile = environ.get("AWS_PROFILE", environ.get("AWS_DEFAULT_PROFILE"))
+            if "AWS_ACCESS_KEY_ID" in environ and "AWS_SECRET_ACCESS_KEY" in environ:
+                kwargs = {
+                    "aws_access_key_id": environ["AWS_ACCESS_KEY_ID"],
+                    "aws_secret_access_key": environ["AWS_SECRET_ACCESS_KEY"],
+                    "aws_session_token": environ.get("AWS_SESSION_TOKEN"),
+                }
+        return boto3.Session(botocore_session=session, profile_name=profile, **kwargs)
+
     def client(self, *args, **kwargs) -> "botocore.client.BaseClient":
         """Retrieve the AWS client using the given profile.
 
@@ -49,16 +95,12 @@ class CheckAws(Check):
             The specified profile name could not be found
         """
         # Get the needed modules, profile name
-        boto3, exceptions = self.import_modules("boto3", "botocore.exceptions")
-        profile = kwargs.get("profile", self.profile)
+        exceptions = self.import_modules("botocore.exceptions")
+        profile = kwargs.pop("profile", self.profile)
 
         # Get a session
         try:
-            session = (
-                boto3.Session(profile_name=profile)
-                if self.profile is not None
-                else boto3.Session()
-            )
+            session = self.session(profile)
         except exceptions.ProfileNotFound:
             raise CheckException("failed (profile not found)")
 
@@ -92,11 +134,17 @@ class CheckAws(Check):
             raise CheckException("failed (could not parse IAM.get_user())")
 
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
-        """Run sub-checks in sequence rather than concurrently, as done by the
-        Check base class.
+        """Run sub-checks once the sub-checks they require pass.
 
-        This is done because the results of latter checks depend on earlier checks.
+        Sub-checks are run concurrently with an executor (see
+        :class:`~geomancy.checks.base.Scheduler`), or in sequence without an
+        executor. The results of latter checks may depend on earlier checks.
         """
+        if executor is not None:
+            result = super().check(executor=executor, level=level)
+            result.msg = f"[bold]{self.name}[/bold]"
+            return result
+
         # check children
         child_results = []
         for child in self.children:
@@ -25,6 +25,8 @@ logger = logging.getLogger(__name__)
 class CheckAwsIamAuthentication(CheckAws):
     """Checks that the AWS profile can be authenticated"""
 
+    __slots__ = ()
+
     msg = Setting("Check AWS IAM authentication")
 
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
@@ -55,6 +57,8 @@ class CheckAwsIamAuthentication(CheckAws):
 class CheckAwsIamAccessKeyAge(CheckAws):
     """Check the age of AWS access keys"""
 
+    __slots__ = ("key_age",)
+
     #: The key age in days
     key_age: int
 
@@ -66,6 +70,9 @@ class CheckAwsIamAccessKeyAge(CheckAws):
 
     msg = Setting("Check AWS IAM access key age ({check.key_age} days)")
 
+    #: Key ages are measured in days, so they can be cached between runs
+    cache_ttl = Setting(3600)
+
     def __init__(self, *args, **kwargs):
         # Retrieve kwargs
         self.key_age = pop_first(
@@ -119,8 +126,13 @@ class CheckAwsIamRootAccess(CheckAws):
     see: https://aws.amazon.com/blogs/security/an-easier-way-to-determine-the-presence-of-aws-account-access-keys/ # noqa
     """
 
+    __slots__ = ()
+
     msg = Setting("Check AWS IAM root keys are not present")
 
+    #: Root keys rarely change, so they can be cached between runs
+    cache_ttl = Setting(3600)
+
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
         msg = self.msg.format(check=self)
         exceptions = self.import_modules("botocore.exceptions")
@@ -166,6 +178,8 @@ class CheckAwsIamRootAccess(CheckAws):
 class CheckAwsIam(CheckAws):
     """Check the IAM access credentials and settings"""
 
+    __slots__ = ("root_access", "key_age")
+
     #: Check whether root secret keys or signing certs exist
     root_access: bool
 
@@ -201,22 +215,26 @@ class CheckAwsIam(CheckAws):
         super().__init__(*args, **kwargs)
 
         # Replace children
-        self.children.clear()
+        children = []
 
         # Add sub-checks
         # 1. CheckAwsIamAuthentication
-        child = CheckAwsIamAuthentication(*args, **kwargs)
-        child.name = f"{self.name}Authentication"
-        self.children.append(child)
+        authentication = CheckAwsIamAuthentication(*args, **kwargs)
+        authentication.name = f"{self.name}Authentication"
+        children.append(authentication)
 
-        # 2. CheckAwsIamAccessKeyAge
+        # 2. CheckAwsIamAccessKeyAge. Requires authentication
         if isinstance(self.key_age, int):
             child = CheckAwsIamAccessKeyAge(*args, **kwargs)
             child.name = f"{self.name}AccessKeyAge"
-            self.children.append(child)
+            child.requires = [authentication]
+            children.append(child)
 
-        # 3. CheckAwsIAMRootAccess
+        # 3. CheckAwsIAMRootAccess. Requires authentication
         if self.root_access:
             child = CheckAwsIamRootAccess(*args, **kwargs)
             child.name = f"{self.name}RootAccess"
-            self.children.append(child)
+            child.requires = [authentication]
+            children.append(child)
+
+        self.children = children
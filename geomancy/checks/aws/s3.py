@@ -21,6 +21,8 @@ logger = logging.getLogger(__name__)
 class CheckAwsS3BucketAccess(CheckAws):
     """Check AWS S3 bucket availability"""
 
+    __slots__ = ()
+
     msg = Setting("Check AWS S3 bucket access '{check.value}'")
 
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
@@ -92,6 +94,8 @@ class CheckAwsS3BucketAccess(CheckAws):
 class CheckAwsS3BucketPrivate(CheckAws):
     """Check AWS S3 buck availability"""
 
+    __slots__ = ()
+
     msg = Setting("Check AWS S3 bucket private '{check.value}'")
 
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
@@ -177,8 +181,13 @@ class CheckAwsS3(CheckAws):
     See: https://docs.aws.amazon.com/AmazonS3/latest/userguide/security-best-practices.html
     """
 
+    __slots__ = ("private",)
+
     #: Check that a bucket is private and fail if it is publicly accessible
-    private: bool = True
+    private: bool
+
+    #: Default value for private
+    private_default = Setting(True)
 
     #: Alternative parameter names for private
     private_aliases = ("private",)
@@ -189,21 +198,26 @@ class CheckAwsS3(CheckAws):
 
     def __init__(self, *args, **kwargs):
         # Set up keyword arguments
-        self.private = pop_first(kwargs, *self.private_aliases, default=self.private)
+        self.private = pop_first(
+            kwargs, *self.private_aliases, default=self.private_default
+        )
 
         # Set up the rest of the class
         super().__init__(*args, **kwargs)
 
-        # Replace children with bucket sub-checls
-        self.children.clear()
+        # Replace children with bucket sub-checks
+        children = []
 
         # Bucket accessibility check
-        child = CheckAwsS3BucketAccess(*args, **kwargs)
-        child.name = f"{self.name}Access"
-        self.children.append(child)
+        access = CheckAwsS3BucketAccess(*args, **kwargs)
+        access.name = f"{self.name}Access"
+        children.append(access)
 
-        # Bucket public access
+        # Bucket public access. Requires access to the bucket
         if self.private:
             child = CheckAwsS3BucketPrivate(*args, **kwargs)
             child.name = f"{self.name}Private"
-            self.children.append(child)
+            child.requires = [access]
+            children.append(child)
+
+        self.children = children
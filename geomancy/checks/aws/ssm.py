@@ -22,6 +22,8 @@ logger = logging.getLogger(__name__)
 class CheckAwsSsmParameter(CheckAws):
     """Check AWS SSM parameter availability"""
 
+    __slots__ = ("type",)
+
     #: The parameter type, either 'String', 'StringList', 'SecureString'
     #: If None, the parameter type won't be checked
     type: t.Optional[str]
@@ -30,6 +32,9 @@ class CheckAwsSsmParameter(CheckAws):
     #: 'String', 'StringList', 'SecureString' or None
     type_default = Setting("String")
 
+    #: Alternative parameter names for type
+    type_aliases = ("type",)
+
     #: The allowed values for the 'type' attribute
     allowed_types = Setting(("String", "StringList", "SecureString"))
 
@@ -39,7 +44,7 @@ class CheckAwsSsmParameter(CheckAws):
 
     def __init__(self, *args, **kwargs):
         # Set up keyword arguments
-        self.type = pop_first(kwargs, "type", default=self.type_default)
+        self.type = pop_first(kwargs, *self.type_aliases, default=self.type_default)
         super().__init__(*args, **kwargs)
 
         # Check the attributes
@@ -2,10 +2,19 @@
 Check base class and check groups that contain one or more child checks.
 """
 import typing as t
+import asyncio
 import importlib
 import re
-from concurrent.futures import Future, Executor
-from types import ModuleType
+import logging
+import threading
+import time
+import heapq
+import itertools
+import copy
+from concurrent.futures import Future, Executor, InvalidStateError
+from collections import defaultdict, deque
+from functools import partial
+from types import ModuleType, MappingProxyType
 from inspect import isabstract
 from dataclasses import dataclass, field
 
@@ -13,10 +22,24 @@ from rich.table import Table
 from rich.padding import Padding
 from thatway import Setting
 
-from .utils import pop_first, all_subclasses
-from ..environment import sub_env
+from .utils import pop_first
+from ..environment import EnvTemplate
 
-__all__ = ("Check", "CheckException", "Result", "CheckException", "Executor")
+__all__ = (
+    "Check",
+    "CheckBatch",
+    "ChildList",
+    "CheckException",
+    "Result",
+    "CheckException",
+    "Executor",
+    "Scheduler",
+)
+
+logger = logging.getLogger(__name__)
+
+#: Lock used to update the children and parents of results from executor threads
+_result_lock = threading.RLock()
 
 
 class CheckException(Exception):
@@ -28,7 +51,7 @@ class Result:
     """A Check's result with awareness of concurrent.futures and rich
     functionality"""
 
-    #: Result's status--e.g. 'passed', 'failed', 'pending
+    #: Result's status--e.g. 'passed', 'failed', 'pending', 'skipped'
     #: Only a status that **starts with** 'passed' is considered a passed result
     #: By convention, this string should start with 'passed', 'failed', 'warning'
     #: or 'pending'. e.g. 'failed to find file'
@@ -36,13 +59,18 @@ class Result:
 
     #: Regular expression to validate allowed statuses
     _allowed_re: t.Pattern[str] = field(
-        repr=False, default=re.compile(r"^(passed|failed|pending)( \([^\n]+\))?$")
+        repr=False,
+        default=re.compile(r"^(passed|failed|pending|skipped)( \([^\n]+\))?$"),
     )
 
     #: Result message used when displaying the result. This may include
     #: rich tags
     msg: str = ""
 
+    #: Whether this result was loaded from a cache of previous results
+    #: (see :class:`~geomancy.checks.cache.ResultCache`)
+    cached: bool = field(compare=False, default=False)
+
     #: The pass condition for children checks and their passed property values
     condition: t.Callable = field(repr=False, default=all)
 
@@ -52,6 +80,37 @@ class Result:
         default_factory=list,
     )
 
+    #: Keep this result from finishing, while children are added, until it's
+    #: released (see :meth:`add` and :meth:`release`)
+    held: bool = field(repr=False, compare=False, default=False)
+
+    #: The parent result, if this result is the child of another result
+    parent: t.Optional["Result"] = field(repr=False, compare=False, default=None)
+
+    #: Functions called with this result when it, or one of its children,
+    #: changes. (see :meth:`notify`)
+    listeners: t.List[t.Callable[["Result"], None]] = field(
+        repr=False, compare=False, default_factory=list
+    )
+
+    #: The number of finished results in this result's tree, including itself
+    done_count: int = field(init=False, repr=False, compare=False, default=0)
+
+    #: The number of finished results in this result's tree that passed
+    passed_count: int = field(init=False, repr=False, compare=False, default=0)
+
+    #: The number of finished results in this result's tree that didn't pass
+    failed_count: int = field(init=False, repr=False, compare=False, default=0)
+
+    #: The number of unfinished results and futures in this result's tree
+    pending_count: int = field(init=False, repr=False, compare=False, default=0)
+
+    #: Whether this result and all of its children are finished
+    _done: bool = field(init=False, repr=False, compare=False, default=False)
+
+    #: The number of children that aren't finished
+    _unfinished: int = field(init=False, repr=False, compare=False, default=0)
+
     def __post_init__(self):
         # Validate (on creation) that the status starts with an allowed value
         assert self._allowed_re.match(self.status), (
@@ -59,90 +118,217 @@ class Result:
             f"expression: '{self._allowed_re}'"
         )
 
-    @property
-    def passed(self) -> bool:
-        """Whether the check that generated this result passed.
+        # Link children results, count them and find the children futures
+        futures = []
+        with _result_lock:
+            self.pending_count = 1  # this result
+            self._unfinished += 1 if self.held else 0
+            for index, child in enumerate(self.children):
+                if isinstance(child, Result):
+                    child.parent = self
+                    self.done_count += child.done_count
+                    self.passed_count += child.passed_count
+                    self.failed_count += child.failed_count
+                    self.pending_count += child.pending_count
+                    self._unfinished += 0 if child.done else 1
+                else:
+                    self.pending_count += 1
+                    self._unfinished += 1
+                    futures.append((index, child))
+            self._update()
+
+        # Track children futures as they finish. The callback is called
+        # immediately for futures that are already finished
+        for index, future in futures:
+            future.add_done_callback(partial(self._child_finished, index))
+
+    def add(self, child: t.Union["Result", t.Awaitable["Result"]]) -> None:
+        """Add a child result, or a future for a child result, to this result.
+
+        Children can only be added to results that aren't done--e.g. a
+        :attr:`held` result.
 
-        Notes
-        -----
-        This function checks whether children results have passed, whether this
-        result has a non-pending status, and it updates "pending" status when
-        the children are done
+        Parameters
+        ----------
+        child
+            The child result or future to add
         """
-        # Determine whether the children have finished
-        done = True  # updated by loop below
-
-        # Get the pass conditions for children. This list should only comprise
-        # bools (True/False)
-        children_passed = []
-        for child in self.children:
+        with _result_lock:
+            assert not self._done, "Children can't be added to a finished result"
+            index = len(self.children)
+            self.children.append(child)
             if isinstance(child, Result):
-                # The child is a Result object
-                child_status = child.status.startswith("passed")
-                children_passed.append(child_status)
-            elif isinstance(child, Future) and child.done():
-                # The child is a future with a result
-                result = child.result()
-                child_status = result.status.startswith("passed")
-                children_passed.append(child_status)
+                child.parent = self
+                self._unfinished += 0 if child.done else 1
+                self._update(
+                    done=child.done_count,
+                    passed=child.passed_count,
+                    failed=child.failed_count,
+                    pending=child.pending_count,
+                )
             else:
-                # The child is a future that isn't done evaluating
-                done = False
-                children_passed.append(False)
+                self._unfinished += 1
+                self._update(pending=1)
+
+        if not isinstance(child, Result):
+            child.add_done_callback(partial(self._child_finished, index))
+        self.notify()
+
+    def release(self) -> None:
+        """Release a :attr:`held` result, so that it finishes once its children
+        are finished"""
+        with _result_lock:
+            assert self.held, "Only held results can be released"
+            self.held = False
+            self._update(child_done=True)
+        self.notify()
+
+    def _child_finished(self, index: int, future: Future) -> None:
+        """Replace a finished child future with its result and notify listeners.
+
+        Parameters
+        ----------
+        index
+            The index of the future in the children list
+        future
+            The finished future
+        """
+        try:
+            result = future.result()
+        except Exception as exc:
+            # Checks should return results rather than raise exceptions, but
+            # exceptions shouldn't leave a result that never finishes
+            logger.error(f"Check raised an exception: {exc!r}", exc_info=exc)
+            result = Result(status=f"failed ({exc.__class__.__name__})", msg=str(exc))
+
+        try:
+            with _result_lock:
+                result.parent = self
+                self.children[index] = result
+
+                # The future (1 pending) is replaced by the result's tree
+                self._update(
+                    done=result.done_count,
+                    passed=result.passed_count,
+                    failed=result.failed_count,
+                    pending=result.pending_count - 1,
+                    child_done=result.done,
+                )
+        finally:
+            # Listeners are always notified, even if the update failed
+            self.notify()
+
+    def _update(
+        self,
+        done: int = 0,
+        passed: int = 0,
+        failed: int = 0,
+        pending: int = 0,
+        child_done: bool = False,
+    ) -> None:
+        """Update the counts of this result and its parents, and finish the
+        results whose children are all finished.
+
+        Parameters
+        ----------
+        done, passed, failed, pending
+            The change in counts for this result
+        child_done
+            Whether a child of this result just finished
+        """
+        result = self
+        while result is not None:
+            result.done_count += done
+            result.passed_count += passed
+            result.failed_count += failed
+            result.pending_count += pending
+            result._unfinished -= 1 if child_done else 0
+
+            # Finish this result, if possible, and count it in the parents
+            child_done = result._finish()
+            if child_done:
+                result_passed = result.passed
+                result.done_count += 1
+                result.passed_count += 1 if result_passed else 0
+                result.failed_count += 0 if result_passed else 1
+                result.pending_count -= 1
+
+                done += 1
+                passed += 1 if result_passed else 0
+                failed += 0 if result_passed else 1
+                pending -= 1
+            elif not any((done, passed, failed, pending)):
+                # Nothing else to update in the parents
+                break
+
+            result = result.parent
+
+    def _finish(self) -> bool:
+        """Finish this result if its children are finished.
+
+        Returns
+        -------
+        finished
+            True if this result was just finished, False otherwise
+        """
+        if self._done or self._unfinished > 0:
+            return False
 
-        # Update the status from "pending" if this result is done (finished)
-        if self.status.startswith("pending") and done:
+        # Update the status from "pending" with the children's statuses
+        if self.status.startswith("pending"):
+            children_passed = [child.passed for child in self.children]
             self.status = "passed" if self.condition(children_passed) else "failed"
 
-        # Only a 'passed' status is considered a passed result
+        self._done = True
+        return True
+
+    def notify(self) -> None:
+        """Call the listeners of this result and its parents, up to the root
+        result"""
+        result = self
+        while result is not None:
+            for listener in tuple(result.listeners):
+                listener(result)
+            result = result.parent
+
+    @property
+    def passed(self) -> bool:
+        """Whether the check that generated this result passed.
+
+        Notes
+        -----
+        Only a 'passed' status is considered a passed result. A 'pending'
+        result is updated to 'passed' or 'failed', from the children results
+        and condition, when the children are done.
+        """
         return self.status.startswith("passed")
 
     @property
     def done(self) -> bool:
         """Whether the check that generated this result and children checks are
         done"""
-        # Get the done status for children. This list should only comprise
-        # bools (True/False)
-        children_done = []
-        for child in self.children:
-            if isinstance(child, Result):
-                # The child is a Result object
-                child_done = child.done  # This function
-                children_done.append(child_done)
-            elif isinstance(child, Future) and child.done():
-                # The child is a future with a result
-                result = child.result()
-                child_done = result.done  # This function
-                children_done.append(child_done)
-            else:
-                children_done.append(False)
-
-        if all(children_done) and not self.status.startswith("pending"):
-            # All children are done and this result has a non-pending status
-            return True
-        elif all(children_done) and self.status.startswith("pending"):
-            # All the children are done and this result's pending. This result's
-            # status can be updated/changed from 'pending'. The passed
-            # property will do this
-            _ = self.passed  # update status from "pending" to something else
-            return True
-        else:
-            return False
+        return self._done
 
     @property
     def finished(self) -> t.List["Result"]:
         """Return a flat list of currently finished results"""
-        finished = []
-        for child in self.children:
-            if isinstance(child, Result):
-                finished += child.finished  # this function
-            elif isinstance(child, Future) and child.done():
-                result = child.result()
-                finished += result.finished  # this function
-
-        if self.done:
-            finished = [self] + finished
-        return finished
+        return list(self.iter_finished())
+
+    def iter_finished(self) -> t.Iterator["Result"]:
+        """Iterate over the currently finished results in this result's tree,
+        starting with this result"""
+        stack = [self]
+        while stack:
+            result = stack.pop()
+            if result.done:
+                yield result
+
+            # Add children results in reverse so that they're yielded in order
+            stack += [
+                child
+                for child in reversed(result.children)
+                if isinstance(child, Result)
+            ]
 
     def rich_table(
         self, table: t.Optional[Table] = None, warning: bool = False, level: int = 0
@@ -181,6 +367,9 @@ class Result:
             checkbox = "[[green]:heavy_check_mark:[/green]]"
             status = f"[green]{self.status}[/green]"
             warning |= True  # All children should be marked as warnings
+        elif self.status.lower().startswith("skipped"):
+            checkbox = "[[dim]-[/dim]]"
+            status = f"[dim]{self.status}[/dim]"
         elif warning:
             checkbox = "[[yellow]![/yellow]]"
             status = f"[yellow]{self.status}[/yellow]"
@@ -188,6 +377,9 @@ class Result:
             checkbox = "[[red]x[/red]]"
             status = f"[red]{self.status}[/red]"
 
+        if self.cached:
+            status += " [dim](cached)[/dim]"
+
         # 1. Add a row for self
         table.add_row(checkbox, Padding(f"{self.msg}...{status}", (0, 0, 0, 2 * level)))
 
@@ -204,6 +396,137 @@ class Result:
         return table
 
 
+class ChildList(list):
+    """The list of children checks of a check group.
+
+    The children are linked to the check group, so that adding, removing or
+    reordering children only invalidates the cached counts of checks (see
+    :attr:`Check.count`) in the check group and its ancestors.
+    """
+
+    __slots__ = ("owner",)
+
+    #: The check group with these children
+    owner: t.Optional["Check"]
+
+    def __init__(
+        self, children: t.Iterable["Check"] = (), owner: t.Optional["Check"] = None
+    ):
+        super().__init__(children)
+        self.owner = owner
+        self._changed(added=self)
+
+    def __setstate__(self, state):
+        # Unpickled lists are filled before the owner is set
+        _, slots = state
+        self.owner = slots.get("owner")
+        self._changed(added=self)
+
+    def _changed(
+        self, added: t.Iterable["Check"] = (), removed: t.Iterable["Check"] = ()
+    ) -> None:
+        """Link the added children to the check group, unlink the removed
+        children that aren't in the list anymore, and invalidate the cached
+        counts of the check group and its ancestors"""
+        owner = getattr(self, "owner", None)
+        if owner is None:
+            return None
+
+        self._link(owner, added)
+        if removed:
+            remaining = set(map(id, self))
+            self._unlink(owner, [c for c in removed if id(c) not in remaining])
+        owner._invalidate_count()
+
+    @staticmethod
+    def _link(owner: "Check", children: t.Iterable["Check"]) -> None:
+        """Add a check group to the parents of checks"""
+        for child in children:
+            # Children that aren't checks are rejected by the check group
+            if not isinstance(child, Check):
+                continue
+            parents = child._parents
+            if not parents:
+                child._parent = owner
+            elif not any(p is owner for p in parents):
+                child._parent = parents + (owner,)
+
+    @staticmethod
+    def _unlink(owner: "Check", children: t.Iterable["Check"]) -> None:
+        """Remove a check group from the parents of checks"""
+        for child in children:
+            if not isinstance(child, Check):
+                continue
+            parents = tuple(p for p in child._parents if p is not owner)
+            child._parent = parents if len(parents) > 1 else next(iter(parents), None)
+
+    def append(self, child: "Check") -> None:
+        super().append(child)
+        self._changed(added=(child,))
+
+    def extend(self, children: t.Iterable["Check"]) -> None:
+        children = list(children)
+        super().extend(children)
+        self._changed(added=children)
+
+    def __iadd__(self, children: t.Iterable["Check"]) -> "ChildList":
+        self.extend(children)
+        return self
+
+    def insert(self, index: int, child: "Check") -> None:
+        super().insert(index, child)
+        self._changed(added=(child,))
+
+    def remove(self, child: "Check") -> None:
+        super().remove(child)
+        self._changed(removed=(child,))
+
+    def pop(self, index: int = -1) -> "Check":
+        child = super().pop(index)
+        self._changed(removed=(child,))
+        return child
+
+    def clear(self) -> None:
+        children = list(self)
+        super().clear()
+        self._changed(removed=children)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            added, removed = value, self[index]
+        else:
+            added, removed = (value,), (self[index],)
+        super().__setitem__(index, value)
+        self._changed(added=added, removed=removed)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else (self[index],)
+        super().__delitem__(index)
+        self._changed(removed=removed)
+
+    def __imul__(self, n: int) -> "ChildList":
+        removed = list(self) if n < 1 else ()
+        super().__imul__(n)
+        self._changed(removed=removed)
+        return self
+
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        super().sort(key=key, reverse=reverse)
+        self._changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._changed()
+
+    def detach(self) -> None:
+        """Unlink the children from the check group, once the check group's
+        children are replaced by another list"""
+        owner, self.owner = self.owner, None
+        if owner is not None:
+            self._unlink(owner, self)
+
+
 class Check:
     """Check base class and tree structure.
 
@@ -214,8 +537,35 @@ class Check:
         Switch to :meth:`environment.sub_env` for value substitutions, which
         require a '$' character  and allow different expansion rules like
         defaults, errors and replacements.
+
+    .. versionchanged:: 1.2.5
+        Checks store their attributes in slots, instead of a ``__dict__``, and
+        checks without children share an empty children tuple to reduce the
+        memory used by large check trees. Check subclasses with new instance
+        attributes should list them in ``__slots__``.
+
+    .. versionchanged:: 1.2.5
+        Values are compiled once into an :class:`EnvTemplate
+        <geomancy.environment.EnvTemplate>`, and their substitutions are reused
+        until the referenced environment variables change.
     """
 
+    __slots__ = (
+        "name",
+        "raw_value",
+        "_template",
+        "desc",
+        "_children",
+        "_parent",
+        "_count",
+        "condition",
+        "requires",
+        "timeout",
+        "deadline",
+        "env_substitute",
+        "short_circuit",
+    )
+
     #: The name for the check
     name: str
 
@@ -223,20 +573,61 @@ class Check:
     raw_value: str
 
     #: Description of the check
-    desc: str = ""
+    desc: str
 
     #: The default message to include in results
     msg: str = "{check.name}"
 
-    #: A list of children checks
-    children: t.List["Check"]
+    #: A list of children checks. Checks without children share an empty tuple
+    children: t.Sequence["Check"]
 
-    #: The condition function to use to evaluate whether children checks have passed
-    condition: t.Callable = all  # default all must pass
+    #: The condition function to use to evaluate whether children checks have
+    #: passed. By default, all must pass
+    condition: t.Callable
 
     #: Alternative parameter names (__init__ kwarg names) used to specify the condition
     condition_aliases = ("condition", "subchecks")  # other names for variable
 
+    #: The valid values of the condition (case-insensitive)
+    condition_options = ("all", "any")
+
+    #: The checks, or dot-separated name paths of checks, that must pass before
+    #: this check is run. e.g. 'Aws.Iam.Authentication'
+    #: (see :class:`Scheduler`)
+    requires: t.List[t.Union[str, "Check"]]
+
+    #: Alternative parameter names (__init__ kwarg names) for requires
+    requires_aliases = ("requires", "depends_on")
+
+    #: The maximum time, in seconds, for this check and its children to finish
+    timeout: t.Optional[float]
+
+    #: Alternative parameter names (__init__ kwarg names) for timeout
+    timeout_aliases = ("timeout",)
+
+    #: The time (see :func:`time.monotonic`) by which this check must finish, if
+    #: it has a deadline. This is set when the check is scheduled.
+    #: (see :class:`Scheduler`)
+    deadline: t.Optional[float]
+
+    #: The time, in seconds, that passed results of this check type are cached
+    #: between runs. Results aren't cached if 0.
+    #: (see :class:`~geomancy.checks.cache.ResultCache`)
+    cache_ttl = Setting(0)
+
+    #: The resource class used by this check type--e.g. 'subprocess', 'network',
+    #: 'filesystem' or 'aws'. The number of checks of a resource class that run
+    #: at once can be limited. (see :class:`Scheduler`)
+    resource: t.Optional[str] = None
+
+    #: Alternative key names used to include checks files in a group of checks
+    #: (see :meth:`load`)
+    include_aliases = ("include", "includes")
+
+    #: Alternative key names for a matrix of variables, which is expanded into
+    #: a list of values for a check (see :meth:`load`)
+    matrix_aliases = ("matrix",)
+
     #: Substitute environment variables in check values
     env_substitute: bool
 
@@ -246,6 +637,16 @@ class Check:
     #: Alternative parameter names (__init__ kwarg names) for env_substitute
     env_substitute_aliases = ("env_substitute", "substitute")
 
+    #: Skip the unfinished children checks once the condition decides whether
+    #: this check passes. e.g. after the first passed child for 'any'
+    short_circuit: bool
+
+    #: The default value for short_circuit
+    short_circuit_default = Setting(False)
+
+    #: Alternative parameter names (__init__ kwarg names) for short_circuit
+    short_circuit_aliases = ("short_circuit",)
+
     #: Default message and style of h1 headers
     h1_style = Setting("[dodger_blue1][bold]{self.name}[/bold][/dodger_blue1]")
 
@@ -279,6 +680,14 @@ class Check:
     #: Alternative names for the class (used by :meth:`~geomancy.checks.Check.types`)
     aliases: t.Optional[t.Tuple[str, ...]] = None
 
+    #: The registry of Check classes by class name and alias, which is updated
+    #: as Check subclasses are created (see :meth:`types`)
+    _types: t.Dict[str, t.Type["Check"]] = dict()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._register()
+
     def __init__(
         self,
         name: str,
@@ -291,17 +700,39 @@ class Check:
         self.name = name
         self.value = value
         self.desc = desc
-        self.children = list(children) if children is not None else []
+        self._parent = None
+        self._count = None
+        self.children = children
+        self.deadline = None
 
         # Parse kwargs, which may use different aliases
         condition = pop_first(kwargs, *self.condition_aliases, default=None)
         self.env_substitute = pop_first(
             kwargs, *self.env_substitute_aliases, default=self.env_substitute_default
         )
+        self.short_circuit = pop_first(
+            kwargs, *self.short_circuit_aliases, default=self.short_circuit_default
+        )
+        requires = pop_first(kwargs, *self.requires_aliases, default=None)
+        timeout = pop_first(kwargs, *self.timeout_aliases, default=None)
+        if requires is None:
+            self.requires = ()
+        elif isinstance(requires, (str, Check)):
+            self.requires = [requires]
+        else:
+            self.requires = list(requires)
+
+        # Make sure the timeout is a number of seconds
+        try:
+            self.timeout = float(timeout) if timeout is not None else None
+        except (TypeError, ValueError):
+            raise CheckException(
+                f"The timeout '{timeout}' should be a number of seconds."
+            )
 
         # Make sure the condition values are allowed
         if condition is None:
-            pass
+            self.condition = all
         elif condition.lower() == "all":
             self.condition = all
         elif condition.lower() == "any":
@@ -322,39 +753,187 @@ class Check:
     def __len__(self):
         return len(self.children)
 
+    def __getstate__(self):
+        # Checks are pickled without the check groups they're in, so that
+        # pickling a check doesn't pickle its whole check tree
+        state = super().__getstate__()
+        if isinstance(state, tuple) and "_parent" in state[1]:
+            state = (state[0], {**state[1], "_parent": None})
+        return state
+
+    @property
+    def _parents(self) -> t.Tuple["Check", ...]:
+        """The check groups this check is in.
+
+        Checks are usually in one check group, so the check group is stored
+        without a tuple, unless the check is in more than one check group.
+        """
+        parent = getattr(self, "_parent", None)
+        if parent is None:
+            return ()
+        return parent if isinstance(parent, tuple) else (parent,)
+
+    @property
+    def children(self) -> t.Sequence["Check"]:
+        """The children checks of this check"""
+        return self._children
+
+    @children.setter
+    def children(self, children: t.Optional[t.Iterable["Check"]]):
+        # Unlink the replaced children from this check
+        previous = getattr(self, "_children", ())
+        if isinstance(previous, ChildList):
+            previous.detach()
+
+        # Checks without children share an empty tuple
+        if children:
+            self._children = ChildList(children, owner=self)
+        else:
+            self._children = ()
+            self._invalidate_count()
+
+    @property
+    def template(self) -> t.Optional[EnvTemplate]:
+        """The raw value compiled for environment variable substitution"""
+        if self._template is None and self.raw_value is not None:
+            self._template = EnvTemplate(self.raw_value)
+        return self._template
+
     @property
     def value(self) -> t.Any:
         """Check's value with optional environment substitution"""
         if self.env_substitute and self.raw_value is not None:
-            subbed = sub_env(self.raw_value)
-            return subbed if subbed is not None else self.raw_value
+            return self.template.resolve()
         else:
             return self.raw_value
 
     @value.setter
     def value(self, v):
         self.raw_value = str(v) if v is not None else None
+        self._template = None
+
+    def time_left(self) -> t.Optional[float]:
+        """The time, in seconds, left before this check's deadline, or None if
+        it doesn't have a deadline.
+
+        Checks that wait on subprocesses or network requests can use this to
+        stop waiting once the deadline has passed.
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def check_values(self, values: t.Sequence[str]) -> t.List[str]:
+        """Check a list of values with this check's settings in one pass.
+
+        This is used by :class:`CheckBatch`. Check subclasses can override this
+        method to check many values more efficiently than one at a time--e.g.
+        with one directory listing for many paths.
+
+        Parameters
+        ----------
+        values
+            The unprocessed values to check
+
+        Returns
+        -------
+        statuses
+            The result status for each value
+        """
+        check = copy.copy(self)
+        statuses = []
+        for value in values:
+            check.value = value
+            statuses.append(check.check().status)
+        return statuses
+
+    def walk(self) -> t.Iterator[t.Tuple["Check", int, t.Tuple[str, ...]]]:
+        """Iterate over this check (first item) and its children checks,
+        depth-first and in order.
+
+        The tree is walked without recursion, so deep check trees don't reach
+        the recursion limit.
+
+        Returns
+        -------
+        walk
+            An iterator of each check with its depth, which is 0 for this check,
+            and the names of the checks from this check to it.
+        """
+        stack = [(self, 0, (self.name,))]
+        while stack:
+            check, depth, path = stack.pop()
+            yield check, depth, path
+            stack += [
+                (child, depth + 1, path + (child.name,))
+                for child in reversed(check.children)
+            ]
+
+    def iter_leaves(self) -> t.Iterator[t.Tuple["Check", int, t.Tuple[str, ...]]]:
+        """Iterate over the checks without children in this check's tree,
+        depth-first and in order (see :meth:`walk`)."""
+        return (item for item in self.walk() if not item[0].children)
 
     @property
     def flatten(self) -> t.List["Check"]:
         """Return a flattened list of this check (first item) and children
         checks"""
-        flattened = [self]
-        for child in self.children:
-            flattened += child.flatten
+        flattened = []
+        stack = [self]
+        while stack:
+            check = stack.pop()
+            flattened.append(check)
+            stack += reversed(check.children)
         return flattened
 
     @property
     def count(self) -> int:
-        """The number of children, sub-children, etc, including self"""
-        # flatten returns this check, so the count is subtracted by 1 to only
-        # count sub-checks
-        return len(self.flatten)
+        """The number of checks in this check's tree, including itself.
+
+        The counts of the checks in the tree are cached until children are
+        added to or removed from a check group in their trees (see
+        :class:`ChildList`).
+        """
+        if self._count is not None:
+            return self._count
+
+        # Find the checks without cached counts. Their children are counted
+        # before them, so that the counts of the whole tree are cached
+        uncounted = []
+        stack = [self]
+        while stack:
+            check = stack.pop()
+            if check._count is None:
+                uncounted.append(check)
+                stack += check.children
+        for check in reversed(uncounted):
+            check._count = 1 + sum(child._count for child in check.children)
+        return self._count
+
+    def _invalidate_count(self) -> None:
+        """Invalidate the cached counts of this check and its ancestors.
+
+        The checks in the tree of a check with a cached count have cached
+        counts too, so the ancestors are only invalidated up to the first
+        ancestor without a cached count.
+        """
+        self._count = None
+        stack = list(self._parents)
+        while stack:
+            check = stack.pop()
+            if getattr(check, "_count", None) is None:
+                continue
+            check._count = None
+            stack += check._parents
 
     @staticmethod
-    def types() -> t.Dict[str, t.Type]:
+    def types() -> t.Mapping[str, t.Type]:
         """The available types of Check classes, including aliases.
 
+        .. versionchanged:: 1.2.5
+            Return a read-only view of a registry that is updated as Check
+            subclasses are created, rather than rebuilding the dict each call.
+
         Returns
         -------
         types_dict
@@ -362,36 +941,68 @@ class Check:
             class or subclass as values. The key-value pairs are also populated
             with alias names for Checks
         """
-        # Retrieve the base class (Check) and children classes
-        cls_types = [Check] + list(all_subclasses(Check))
-
-        # Create a dict with the class name and type as key-value pairs
-        d = dict()
-        for cls_type in cls_types:
-            # Skip abstract classes, which can't be instantiated
-            if isabstract(cls_type):
-                continue
+        return _check_types
+
+    @classmethod
+    def _register(cls) -> None:
+        """Add this class, and its aliases, to the registry of Check types"""
+        # Skip abstract classes, which can't be instantiated
+        if isabstract(cls):
+            return None
+
+        types = Check._types
+        names = (cls.__name__,) + (cls.aliases if cls.aliases is not None else ())
 
-            # Make sure class name isn't already in the dict
+        # A class that is defined again (e.g. a module is reloaded) replaces its
+        # previous definition
+        location = (cls.__module__, cls.__qualname__)
+        for name, cls_type in list(types.items()):
+            if (cls_type.__module__, cls_type.__qualname__) == location:
+                del types[name]
+
+        # Make sure class name isn't already in the dict
+        assert (
+            cls.__name__ not in types
+        ), f"class {cls.__name__} already registered class"
+
+        for alias in names[1:]:
+            # Aliases should not create name collisions
             assert (
-                cls_type.__name__ not in d
-            ), f"class {cls_type.__name__} already registered class"
+                alias not in types
+            ), f"Alias '{alias}' already matches '{types[alias]}'."
 
-            # Add the class name directly
-            d[cls_type.__name__] = cls_type
+        for name in names:
+            types[name] = cls
 
-            # Add class name aliases
-            aliases = cls_type.aliases if cls_type.aliases is not None else ()
-            for alias in aliases:
-                # Aliases should not create name collisions
-                assert alias not in d, f"Alias '{alias}' already matches '{d[alias]}'."
+    def header(self, level: int = 0) -> str:
+        """The message for results of this check as a group header.
 
-                d[alias] = cls_type
-        return d
+        Parameters
+        ----------
+        level
+            The depth level of the check in the check tree
+        """
+        if level == 0:
+            return self.h1_style.format(self=self)
+        elif level == 1:
+            return self.h2_style.format(self=self)
+        elif level == 2:
+            return self.h3_style.format(self=self)
+        elif level == 3:
+            return self.h4_style.format(self=self)
+        elif level == 4:
+            return self.h5_style.format(self=self)
+        else:
+            return self.h6_style.format(self=self)
 
     @classmethod
     def load(
-        cls, d: dict, name: str, level: int = 1, max_level: t.Optional[int] = None
+        cls,
+        d: dict,
+        name: str,
+        level: int = 1,
+        max_level: t.Optional[int] = None,
+        include: t.Optional[t.Callable[[t.Any], t.List["Check"]]] = None,
     ) -> t.Union["Check", None]:
         """Load checks from a dict.
 
@@ -405,11 +1016,22 @@ class Check:
             The current recursion depth of this load
         max_level
             The maximum recursion depth allowed
+        include
+            A function that returns the checks for the value of an 'include'
+            key (see :attr:`include_aliases`)--e.g. the checks loaded from the
+            included checks files. Included checks are added to the group with
+            the 'include' key.
 
         Returns
         -------
         root_check
             The loaded root Check instance
+
+        Raises
+        ------
+        CheckException
+            Raised if checks are included without an include function or in a
+            check that isn't a group
         """
         # Check that the maximum recursion level hasn't been reached
         max_level = max_level if max_level is not None else cls.max_level
@@ -430,6 +1052,11 @@ class Check:
 
         # Parse the check if a single check was given
         if len(matching_keys) == 1:
+            if any(key in d for key in cls.include_aliases):
+                raise CheckException(
+                    f"Checks can only be included in groups, not in '{name}'."
+                )
+
             # Get the check class
             check_type = matching_keys[0]
             matching_cls = check_types[check_type]
@@ -440,6 +1067,23 @@ class Check:
             # Get the other kwargs
             kwargs = {k: v for k, v in d.items() if k != check_type}
 
+            # Expand a matrix of variables into a list of values
+            matrix = pop_first(kwargs, *cls.matrix_aliases, default=None)
+            if matrix is not None:
+                value = cls.expand_matrix(name, value, matrix)
+
+            # A list of values is checked in one batched check
+            if isinstance(value, (list, tuple)):
+                template = matching_cls(name, None, **kwargs)
+                return CheckBatch(
+                    name,
+                    value,
+                    template=template,
+                    desc=template.desc,
+                    requires=template.requires,
+                    timeout=template.timeout,
+                )
+
             # Create and return the check_type
             return matching_cls(name, value, **kwargs)
 
@@ -448,12 +1092,21 @@ class Check:
         found_checks = []  # Values parsed into Check objects
         other_d = dict()  # All other values
         for key, value in items:
+            if key in cls.include_aliases:
+                if include is None:
+                    raise CheckException(
+                        f"Checks can only be included from checks files, not in "
+                        f"'{name}'."
+                    )
+                found_checks += include(value)
+                continue
+
             if not isinstance(value, dict):
                 other_d[key] = value
                 continue
 
             return_value = cls.load(
-                d=value, name=key, level=level + 1, max_level=max_level
+                d=value, name=key, level=level + 1, max_level=max_level, include=include
             )
 
             # Replace the value withe Check instance, if it was parsed correctly
@@ -470,6 +1123,61 @@ class Check:
         # Create a check grouping, first, by parsing the other arguments
         return Check(name=name, children=found_checks, **other_d)
 
+    @staticmethod
+    def expand_matrix(
+        name: str, value: t.Union[str, t.List[str]], matrix: t.Any
+    ) -> t.List[str]:
+        """Expand a matrix of variables into a list of check values.
+
+        Parameters
+        ----------
+        name
+            The name of the check with the matrix
+        value
+            The value, or list of values, with '{variable}' placeholders for
+            the matrix variables
+        matrix
+            A dict of variable names and their lists of values. A value is
+            created for each combination of variable values.
+
+        Returns
+        -------
+        values
+            The expanded values
+
+        Raises
+        ------
+        CheckException
+            Raised if the matrix isn't a dict of lists or a placeholder isn't a
+            matrix variable
+
+        Examples
+        --------
+        >>> Check.expand_matrix("Packages", "{pkg}>={version}",
+        ...                     {"pkg": ["rich", "click"], "version": ["1.0"]})
+        ['rich>=1.0', 'click>=1.0']
+        """
+        if not isinstance(matrix, dict):
+            raise CheckException(
+                f"The matrix for '{name}' should be a dict of variables and lists "
+                f"of values."
+            )
+        names = list(matrix.keys())
+        lists = [v if isinstance(v, (list, tuple)) else [v] for v in matrix.values()]
+        templates = value if isinstance(value, (list, tuple)) else [value]
+
+        values = []
+        for template in map(str, templates):
+            for combination in itertools.product(*lists):
+                try:
+                    values.append(template.format(**dict(zip(names, combination))))
+                except (KeyError, IndexError, ValueError) as exc:
+                    raise CheckException(
+                        f"Could not expand the matrix for '{name}' in value "
+                        f"'{template}': {exc}"
+                    )
+        return values
+
     @classmethod
     def import_modules(
         cls, *names: str
@@ -514,7 +1222,8 @@ class Check:
         ----------
         executor
             An object to submit or map calls asynchronously.
-            See concurrent.futures.
+            See concurrent.futures. Executors that aren't a :class:`Scheduler`
+            are wrapped in one for this check's tree.
         level
             The current depth level of the check tree
 
@@ -527,23 +1236,689 @@ class Check:
             executor is not None
         ), "An executor must be specified to run children checks"
 
+        # Run children checks once their required checks pass
+        if not isinstance(executor, Scheduler):
+            executor = Scheduler(root=self, executor=executor)
+
         # check children
         child_results = []
         for child in self.children:
-            result = executor.submit(child.check, executor, level + 1)
+            result = executor.schedule(child, level + 1)
             child_results.append(result)
 
-        if level == 0:
-            msg = self.h1_style.format(self=self)
-        elif level == 1:
-            msg = self.h2_style.format(self=self)
-        elif level == 2:
-            msg = self.h3_style.format(self=self)
-        elif level == 3:
-            msg = self.h4_style.format(self=self)
-        elif level == 4:
-            msg = self.h5_style.format(self=self)
+        result = Result(
+            msg=self.header(level), children=child_results, condition=self.condition
+        )
+
+        if self.short_circuit:
+            executor.short_circuit(self, level, result)
+        return result
+
+    async def acheck(
+        self, executor: t.Optional[Executor] = None, level: int = 0
+    ) -> Result:
+        """Performs this check and the children checks in an asyncio event loop.
+
+        Check subclasses with checks that wait on I/O, like subprocesses or
+        network requests, can override this coroutine to run natively in the
+        event loop. By default, :meth:`check` is run in a separate thread.
+        (see :class:`~geomancy.checks.executors.AsyncExecutor`)
+
+        Parameters
+        ----------
+        executor
+            An object to submit or map calls asynchronously.
+            See concurrent.futures.
+        level
+            The current depth level of the check tree
+
+        Returns
+        -------
+        result
+            The result of the check
+        """
+        return await asyncio.to_thread(self.check, executor, level)
+
+
+# Register the base Check class. Subclasses are registered as they're created
+Check._register()
+
+#: A read-only view of the registry of Check classes (see :meth:`Check.types`)
+_check_types = MappingProxyType(Check._types)
+
+
+class CheckBatch(Check):
+    """A check for a list of values of another check type, which are checked
+    together in one pass.
+
+    Lists of values (e.g. ``checkPath: [a, b, c]``) or a matrix of variables are
+    loaded into a batched check (see :meth:`Check.load`), instead of a check for
+    each value. A batched check is run and reported as one check, and its
+    message lists the values that failed.
+    """
+
+    __slots__ = ("template", "values", "resource")
+
+    #: The check with the settings for each of the values
+    template: Check
+
+    #: The unprocessed values to check
+    values: t.List[str]
+
+    #: The message for results of batched checks
+    msg = Setting("{check.name} ({count} values)")
+
+    #: The maximum number of failed values listed for each failed status
+    max_failed = Setting(5)
+
+    def __init__(
+        self,
+        name: str,
+        value: t.Optional[t.Sequence[str]] = None,
+        *args,
+        template: Check,
+        **kwargs,
+    ):
+        super().__init__(name, None, *args, **kwargs)
+        self.template = template
+        self.values = [str(v) for v in value] if value is not None else []
+        self.resource = template.resource
+
+    @classmethod
+    def _register(cls) -> None:
+        # Batched checks are created from lists of values, not by name
+        return None
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        """Check the values with the template check"""
+        self.template.deadline = self.deadline
+        statuses = self.template.check_values(self.values)
+
+        # Group the failed values by status
+        failed = defaultdict(list)
+        for value, status in zip(self.values, statuses):
+            if not status.startswith("passed"):
+                failed[status].append(value)
+
+        msg = self.msg.format(check=self, count=len(self.values))
+        if not failed:
+            return Result(msg=msg, status="passed")
+
+        details = []
+        for status, values in failed.items():
+            reason = (
+                status[status.find("(") + 1 : -1] if status.endswith(")") else status
+            )
+            listed = ", ".join(f"'{v}'" for v in values[: self.max_failed])
+            more = len(values) - self.max_failed
+            details.append(
+                f"{reason} {listed}" + (f" and {more} more" if more > 0 else "")
+            )
+        count = sum(map(len, failed.values()))
+        return Result(
+            msg=f"{msg}: {'; '.join(details)}",
+            status=f"failed ({count} of {len(self.values)})",
+        )
+
+
+class Scheduler(Executor):
+    """An executor that runs checks as soon as the checks they require pass.
+
+    Checks without requirements are submitted to the wrapped executor right away,
+    so independent branches of the check tree run concurrently. Checks with
+    requirements (see :attr:`Check.requires`) wait until the required checks
+    and their children are done, and they're skipped if a required check
+    doesn't pass.
+
+    Required checks are given as :class:`Check` instances or dot-separated name
+    paths--e.g. 'Aws.Iam.Authentication'. Name paths are searched from the
+    parent of the requiring check, then from each ancestor up to the root check.
+
+    Checks with a :attr:`Check.timeout`, or a parent with a deadline, get a
+    'failed (timeout)' result if they haven't finished by their deadline, and
+    their calls are cancelled if they haven't started.
+
+    Leaf checks with a result in the :attr:`cache` aren't run.
+
+    The number of checks that run at once for a resource class (see
+    :attr:`Check.resource`) is capped by the :attr:`limits`. Checks over the
+    limit wait, in the order they were scheduled, for a running check of the
+    same resource class to finish.
+    """
+
+    #: The executor used to run checks
+    executor: Executor
+
+    #: The cache for the results of leaf checks, if results are cached
+    #: (see :class:`~geomancy.checks.cache.ResultCache`)
+    cache: t.Optional["ResultCache"]
+
+    #: The maximum number of checks that run at once, by resource class
+    limits: t.Dict[str, int]
+
+    #: The time (see :func:`time.monotonic`) by which all checks should be
+    #: finished, if there is a timeout
+    deadline: t.Optional[float]
+
+    def __init__(
+        self,
+        root: t.Optional[Check],
+        executor: Executor,
+        timeout: t.Optional[float] = None,
+        cache: t.Optional["ResultCache"] = None,
+        limits: t.Optional[t.Mapping[str, t.Optional[int]]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        root
+            The root check of the check tree to run. Trees of checks can also
+            be added later (see :meth:`add`).
+        executor
+            The executor used to run checks
+        timeout
+            The maximum time, in seconds, for all checks to finish
+        cache
+            The cache used to load and store the results of leaf checks
+        limits
+            The maximum number of checks that run at once, by resource class.
+            Resource classes without a limit (None) aren't limited.
+        """
+        self.executor = executor
+        self.cache = cache
+        self.limits = {k: v for k, v in (limits or dict()).items() if v is not None}
+
+        # The number of running checks and the (check, level) of checks waiting
+        # to run, by resource class
+        self._running: t.Dict[str, int] = defaultdict(int)
+        self._queued: t.Dict[str, t.Deque[t.Tuple[Check, int]]] = defaultdict(deque)
+
+        # Scheduled checks and their levels, and the submitted futures of
+        # scheduled checks, by check id
+        self._scheduled: t.Dict[int, t.Tuple[Check, int]] = dict()
+        self._submitted: t.Dict[int, Future] = dict()
+
+        # A heap of (deadline, count, check, level) for scheduled checks
+        self._deadlines: t.List[t.Tuple] = []
+        self._counter = itertools.count()
+        self._watchdog: t.Optional[threading.Thread] = None
+
+        # Futures for the results of scheduled checks, by check id
+        self._futures: t.Dict[int, Future] = dict()
+
+        # The required checks and their names, by check id
+        self._requires: t.Dict[int, t.List[t.Tuple[str, Check]]] = dict()
+
+        # The number of required checks that aren't done and the names of the
+        # required checks that didn't pass, by check id
+        self._waiting: t.Dict[int, t.List] = dict()
+
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
+
+        # The deadline for all checks to finish
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+        # The parents of checks in the tree, by check id
+        self._parents: t.Dict[int, Check] = dict()
+        if root is not None:
+            self.add(root)
+
+    def add(self, check: Check, parent: t.Optional[Check] = None) -> None:
+        """Add a tree of checks to the checks that can be scheduled.
+
+        The root check's tree is added when the scheduler is created. Trees
+        added later, as children of a check in the tree or as new roots, can be
+        scheduled while other checks are running--e.g. the checks of checks
+        files as they're loaded.
+
+        Parameters
+        ----------
+        check
+            The root check of the tree to add
+        parent
+            The parent check of the tree's root check
+
+        Raises
+        ------
+        CheckException
+            Raised if a required check could not be found or if required checks
+            create a cycle
+        """
+        # Set the deadline of the tree's root check from its timeout and its
+        # parent's deadline
+        deadlines = [parent.deadline if parent is not None else self.deadline]
+        if check.timeout is not None:
+            deadlines.append(time.monotonic() + check.timeout)
+        deadlines = [d for d in deadlines if d is not None]
+        check.deadline = min(deadlines) if deadlines else None
+
+        with self._lock:
+            # Find the parents of checks in the tree
+            if parent is not None:
+                self._parents[id(check)] = parent
+            stack = [check]
+            while stack:
+                node = stack.pop()
+                for child in node.children:
+                    self._parents[id(child)] = node
+                    stack.append(child)
+
+            # Resolve the required checks
+            stack = [check]
+            while stack:
+                node = stack.pop()
+                stack += node.children
+                if node.requires:
+                    self._requires[id(node)] = [
+                        self._resolve(node, required) for required in node.requires
+                    ]
+
+            self._check_cycles(check)
+
+    def _resolve(self, check: Check, required: t.Union[str, Check]) -> t.Tuple:
+        """Find the (name, check) for a check required by the given check.
+
+        Raises
+        ------
+        CheckException
+            Raised if the required check could not be found
+        """
+        if isinstance(required, Check):
+            return required.name, required
+
+        names = required.split(".")
+        ancestor = self._parents.get(id(check))
+        while ancestor is not None:
+            found = ancestor
+            for name in names:
+                found = next((c for c in found.children if c.name == name), None)
+                if found is None:
+                    break
+            if found is not None:
+                return required, found
+            ancestor = self._parents.get(id(ancestor))
+
+        raise CheckException(
+            f"Could not find the check '{required}' required by '{check.name}'."
+        )
+
+    def _check_cycles(self, root: Check) -> None:
+        """Check that required checks don't create a cycle, which would leave
+        checks waiting on each other forever.
+
+        A check starts after its parent has started, and a required check is
+        done after it and all of its children have started.
+
+        Raises
+        ------
+        CheckException
+            Raised if a cycle of required checks was found
+        """
+        if not self._requires:
+            return None
+
+        def starts_after(check: Check) -> t.Iterator[Check]:
+            """The checks that must start before the given check starts"""
+            parent = self._parents.get(id(check))
+            if parent is not None:
+                yield parent
+            for _, required in self._requires.get(id(check), ()):
+                stack = [required]
+                while stack:
+                    node = stack.pop()
+                    stack += node.children
+                    yield node
+
+        # Depth-first search for cycles
+        visiting, visited = set(), set()
+        stack = [root]
+        while stack:
+            check = stack.pop()
+            stack += check.children
+            if id(check) in visited:
+                continue
+
+            path = [(check, starts_after(check))]
+            visiting.add(id(check))
+            while path:
+                node, edges = path[-1]
+                edge = next(edges, None)
+                if edge is None:
+                    path.pop()
+                    visiting.discard(id(node))
+                    visited.add(id(node))
+                elif id(edge) in visiting:
+                    raise CheckException(
+                        f"The checks required by '{node.name}' depend on "
+                        f"'{node.name}' itself."
+                    )
+                elif id(edge) not in visited:
+                    visiting.add(id(edge))
+                    path.append((edge, starts_after(edge)))
+
+    def _future(self, check: Check) -> Future:
+        """The future for the result of a check, which may not be scheduled yet"""
+        with self._lock:
+            future = self._futures.get(id(check))
+            if future is None:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._futures[id(check)] = future
+            return future
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Submit a callable to the wrapped executor"""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Shut down the wrapped executor"""
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def schedule(self, check: Check, level: int = 0) -> Future:
+        """Schedule a check to run once its required checks pass.
+
+        Parameters
+        ----------
+        check
+            The check to run
+        level
+            The depth level of the check in the check tree
+
+        Returns
+        -------
+        future
+            The future for the check's result
+        """
+        future = self._future(check)
+        requires = self._requires.get(id(check))
+        with self._lock:
+            self._scheduled[id(check)] = (check, level)
+
+        # Set the deadline from the check's timeout and its parent's deadline
+        parent = self._parents.get(id(check))
+        deadlines = [parent.deadline] if parent is not None else []
+        if check.timeout is not None:
+            deadlines.append(time.monotonic() + check.timeout)
+        deadlines = [d for d in deadlines if d is not None]
+        check.deadline = min(deadlines) if deadlines else None
+        if check.deadline is not None:
+            self._watch(check, level)
+
+        if not requires:
+            self._run(check, level)
+            return future
+
+        with self._lock:
+            self._waiting[id(check)] = [len(requires), []]
+        for name, required in requires:
+            self._when_done(required, partial(self._required_done, check, level, name))
+        return future
+
+    def _msg(self, check: Check, level: int) -> str:
+        """The message for results of a check that wasn't run"""
+        return check.header(level) if check.children else check.msg.format(check=check)
+
+    def _set_result(self, check: Check, result: Result) -> bool:
+        """Set the result of a check, if it doesn't have one already.
+
+        Returns
+        -------
+        set
+            True if the result was set, False otherwise
+        """
+        try:
+            self._future(check).set_result(result)
+            return True
+        except InvalidStateError:
+            return False
+
+    def _run(self, check: Check, level: int) -> None:
+        """Run a check, unless it has a cached result, once its resource class
+        is under its limit"""
+        future = self._future(check)
+        if future.done():
+            # The check timed out or was cancelled before it was submitted
+            return None
+
+        # Use the cached result, if available
+        cache = self.cache if not check.children else None
+        cached = cache.get(check) if cache is not None else None
+        if cached is not None:
+            self._set_result(check, cached)
+            return None
+
+        # Wait for a running check to finish if the resource class is at its limit
+        resource = check.resource
+        if resource is not None and resource in self.limits:
+            with self._lock:
+                if self._running[resource] >= self.limits[resource]:
+                    self._queued[resource].append((check, level))
+                    return None
+                self._running[resource] += 1
+
+        self._submit_check(check, level)
+
+    def _submit_check(self, check: Check, level: int) -> None:
+        """Submit a check to the executor and pass on its result"""
+        future = self._future(check)
+        cache = self.cache if not check.children else None
+
+        def finished(submitted: Future):
+            self._release(check.resource)
+
+            try:
+                result = submitted.result()
+            except TimeoutError:
+                result = Result(status="failed (timeout)", msg=self._msg(check, level))
+            except Exception as exc:
+                try:
+                    future.set_exception(exc)
+                except InvalidStateError:
+                    pass
+                return None
+            if self._set_result(check, result) and cache is not None:
+                cache.set(check, result)
+
+        # Executors may run checks in different ways. e.g. as coroutines
+        # (see geomancy.checks.executors)
+        submit_check = getattr(self.executor, "submit_check", None)
+
+        try:
+            if submit_check is not None:
+                submitted = submit_check(check, self, level)
+            else:
+                submitted = self.submit(check.check, self, level)
+        except Exception as exc:
+            self._release(check.resource)
+            try:
+                future.set_exception(exc)
+            except InvalidStateError:
+                pass
         else:
-            msg = self.h6_style.format(self=self)
+            with self._lock:
+                self._submitted[id(check)] = submitted
+            submitted.add_done_callback(finished)
+
+    def _release(self, resource: t.Optional[str]) -> None:
+        """Pass the slot of a finished check on to the next waiting check of the
+        same resource class"""
+        if resource is None or resource not in self.limits:
+            return None
+
+        with self._lock:
+            queued = self._queued[resource]
+
+            # Skip the waiting checks that timed out or were cancelled
+            while queued and self._future(queued[0][0]).done():
+                queued.popleft()
+
+            if not queued:
+                self._running[resource] -= 1
+                return None
+            check, level = queued.popleft()
+
+        self._submit_check(check, level)
+
+    def _watch(self, check: Check, level: int) -> None:
+        """Time out the check if it hasn't finished by its deadline"""
+        with self._condition:
+            item = (check.deadline, next(self._counter), check, level)
+            heapq.heappush(self._deadlines, item)
+            self._condition.notify()
+
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(
+                    target=self._watch_deadlines, name="Scheduler", daemon=True
+                )
+                self._watchdog.start()
+
+    def _watch_deadlines(self) -> None:
+        """Time out checks as their deadlines pass (run in a separate thread)"""
+        while True:
+            with self._condition:
+                if not self._deadlines:
+                    self._watchdog = None
+                    return None
 
-        return Result(msg=msg, children=child_results, condition=self.condition)
+                deadline = self._deadlines[0][0]
+                now = time.monotonic()
+                if deadline > now:
+                    self._condition.wait(deadline - now)
+                    continue
+
+                _, _, check, level = heapq.heappop(self._deadlines)
+
+            self._stop_tree(check, level, status="failed (timeout)")
+
+    def _stop(self, check: Check, level: int, status: str) -> bool:
+        """Give an unfinished check a failed result and cancel its call, if it
+        hasn't started.
+
+        Returns
+        -------
+        stopped
+            True if the check was given a failed result, False if it already
+            had a result
+        """
+        result = Result(status=status, msg=self._msg(check, level))
+        if not self._set_result(check, result):
+            return False
+
+        with self._lock:
+            submitted = self._submitted.get(id(check))
+        if submitted is not None:
+            submitted.cancel()
+        return True
+
+    def _stop_tree(self, check: Check, level: int, status: str) -> None:
+        """Give an unfinished check, and the unfinished checks in its tree, a
+        failed result.
+
+        The children of stopped checks are stopped too, so that they aren't
+        run if the stopped check is already running.
+        """
+        stack = [(check, level)]
+        while stack:
+            check, level = stack.pop()
+            if not self._stop(check, level, status=status):
+                # The check has a result. Skip the children if it's done
+                future = self._future(check)
+                result = future.result() if future.exception() is None else None
+                if not isinstance(result, Result) or result.done:
+                    continue
+            stack += [(child, level + 1) for child in check.children]
+
+    def short_circuit(self, check: Check, level: int, result: Result) -> None:
+        """Skip the unfinished children of a check once its condition decides
+        the result--i.e. after a child passed for 'any' or after a child failed
+        for 'all'.
+
+        Parameters
+        ----------
+        check
+            The check with children checks
+        level
+            The depth level of the check in the check tree
+        result
+            The result of the check
+        """
+        if check.condition not in (any, all):
+            return None
+        decided_by = True if check.condition is any else False
+        stopped = []
+
+        def listener(r: Result):
+            finished = [
+                c.passed for c in r.children if isinstance(c, Result) and c.done
+            ]
+            with self._lock:
+                if stopped or decided_by not in finished:
+                    return None
+                stopped.append(True)
+
+            r.listeners.remove(listener)
+            for child in check.children:
+                self._stop_tree(child, level + 1, status="skipped (short-circuit)")
+
+        result.listeners.append(listener)
+        listener(result)
+
+    def cancel(self) -> None:
+        """Cancel all unfinished checks.
+
+        Unfinished checks get a 'failed (cancelled)' result, and their calls
+        are cancelled if they haven't started. Running checks can't be stopped,
+        but their results are ignored.
+        """
+        with self._lock:
+            scheduled = list(self._scheduled.values())
+
+        for check, level in scheduled:
+            self._stop_tree(check, level, status="failed (cancelled)")
+
+    def _when_done(self, check: Check, callback: t.Callable[[bool], None]) -> None:
+        """Call the callback, with whether the check passed, once the check and
+        its children are done"""
+        called = []
+
+        def listener(result: Result):
+            with self._lock:
+                if called or not result.done:
+                    return
+                called.append(True)
+            callback(result.passed)
+
+        def finished(future: Future):
+            try:
+                result = future.result()
+            except Exception:
+                # Exceptions are reported by the result of the check's parent
+                return callback(False)
+            result.listeners.append(listener)
+            listener(result)
+
+        self._future(check).add_done_callback(finished)
+
+    def _required_done(self, check: Check, level: int, name: str, passed: bool):
+        """Run or skip a check after one of its required checks is done"""
+        with self._lock:
+            waiting = self._waiting[id(check)]
+            waiting[0] -= 1
+            if not passed:
+                waiting[1].append(name)
+            if waiting[0] > 0:
+                return
+            failed = waiting[1]
+            del self._waiting[id(check)]
+
+        if not failed:
+            self._run(check, level)
+            return
+
+        # Skip the check
+        names = ", ".join(f"'{name}'" for name in failed)
+        result = Result(
+            status=f"skipped (requires {names})", msg=self._msg(check, level)
+        )
+        self._set_result(check, result)
@@ -0,0 +1,183 @@
+"""
+A persistent cache for the results of leaf checks.
+"""
+import typing as t
+import os
+import json
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+
+from thatway import Setting
+
+from .base import Check, Result
+from ..environment import current_env
+from .utils import attributes
+
+__all__ = ("ResultCache",)
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """An on-disk cache for the results of leaf checks (checks without
+    children).
+
+    Results are cached for :attr:`Check.cache_ttl <geomancy.checks.Check.cache_ttl>`
+    seconds, which is 0 (not cached) by default and set for check types that
+    are slow and stable between runs--e.g. executable versions. Results are
+    keyed by the check's type, resolved value, other attributes and a
+    fingerprint of the environment variables and current directory, so a
+    change in any of these is a cache miss.
+
+    Only passed results are cached so that fixing a failed check is reflected
+    in the next run.
+    """
+
+    #: The directory with the cached results
+    path: Path
+
+    #: The fingerprint of the environment for this cache's results
+    fingerprint: str
+
+    #: Environment variables that change between shells without changing the
+    #: results of checks
+    env_exclude = Setting(("_", "SHLVL", "OLDPWD", "TERM_SESSION_ID", "WINDOWID"))
+
+    #: Check attributes that don't change the result of a check, including
+    #: private slots that cache values or link the check tree
+    check_exclude = (
+        "desc",
+        "_template",
+        "children",
+        "_children",
+        "_parent",
+        "_count",
+        "requires",
+        "timeout",
+        "deadline",
+    )
+
+    def __init__(
+        self,
+        path: t.Union[str, Path],
+        environ: t.Optional[t.Mapping[str, str]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        path
+            The directory for the cached results
+        environ
+            The environment variables used for the fingerprint. Defaults to the
+            current environment (see :func:`current_env
+            <geomancy.environment.current_env>`)
+        """
+        self.path = Path(path)
+        self.fingerprint = self.env_fingerprint(environ)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path})"
+
+    def env_fingerprint(self, environ: t.Optional[t.Mapping[str, str]] = None) -> str:
+        """A hash of the environment variables and current directory"""
+        environ = environ if environ is not None else current_env()
+        items = sorted((k, v) for k, v in environ.items() if k not in self.env_exclude)
+        data = json.dumps([os.getcwd(), items])
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def key(self, check: Check) -> t.Optional[str]:
+        """The cache key for the result of a check, or None if the check's
+        results aren't cached"""
+        if not check.cache_ttl or check.children:
+            return None
+
+        # Checks with values that can't be resolved aren't cached
+        try:
+            value = check.value
+        except Exception:
+            return None
+
+        cls = check.__class__
+        attrs = {
+            k: v for k, v in attributes(check).items() if k not in self.check_exclude
+        }
+        data = json.dumps(
+            [f"{cls.__module__}.{cls.__qualname__}", repr(value), attrs],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256((self.fingerprint + data).encode()).hexdigest()
+
+    def get(self, check: Check) -> t.Optional[Result]:
+        """Get the cached result of a check.
+
+        Returns
+        -------
+        result
+            The cached result, or None if the check's result isn't cached or
+            it expired
+        """
+        key = self.key(check)
+        if key is None:
+            return None
+
+        try:
+            data = json.loads((self.path / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if time.time() - data["time"] > check.cache_ttl:
+                return None
+            return Result(status=data["status"], msg=data["msg"], cached=True)
+        except (KeyError, TypeError, AssertionError):
+            logger.debug(f"Ignoring an invalid cached result for {check}")
+            return None
+
+    def set(self, check: Check, result: Result) -> bool:
+        """Cache the passed result of a check.
+
+        Returns
+        -------
+        cached
+            True if the result was cached, False otherwise
+        """
+        key = self.key(check)
+        if key is None or not result.passed or result.cached or result.children:
+            return False
+
+        data = json.dumps(
+            {"status": result.status, "msg": result.msg, "time": time.time()}
+        )
+
+        # Write to a temporary file first so that readers never see a partial file
+        filepath = self.path / f"{key}.json"
+        tmp = filepath.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(data)
+            os.replace(tmp, filepath)
+        except OSError as exc:
+            logger.debug(f"Could not cache the result for {check}: {exc}")
+            return False
+        return True
+
+    def clear(self) -> int:
+        """Remove the cached results.
+
+        Returns
+        -------
+        count
+            The number of cached results removed
+        """
+        count = 0
+        for filepath in self.path.glob("*.json"):
+            try:
+                filepath.unlink()
+                count += 1
+            except OSError:
+                pass
+        return count
@@ -7,14 +7,15 @@ import re
 from thatway import Setting
 
 from .base import Check, Result, Executor
-from ..environment import sub_env
 
 
 class CheckEnv(Check):
     """Check the current environment variables."""
 
+    __slots__ = ("regex",)
+
     #: (Optional) regex to match the environment variable value
-    regex: t.Optional[t.Tuple[str, ...]] = None
+    regex: t.Optional[t.Tuple[str, ...]]
 
     msg = Setting("Check environment variable '{check.raw_value}'")
 
@@ -27,7 +28,7 @@ class CheckEnv(Check):
     def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
         """Check the environment variable value."""
         # Substitute environment variables, if needed
-        value = sub_env(self.raw_value) if self.raw_value is not None else None
+        value = self.template.resolve() if self.raw_value is not None else None
 
         if value is None:
             # If the value is None, the environment variable doesn't exist.
@@ -3,13 +3,18 @@ Check the existence and, optionally, the version of available executables or
 commands.
 """
 import typing as t
+import asyncio
+import os
+import signal
 from shutil import which
 import subprocess
 
 from thatway import Setting
 
+from .base import Result, Executor
 from .version import CheckVersion
 from .utils import version_to_tuple
+from ..environment import current_env
 
 __all__ = ("CheckExec",)
 
@@ -17,12 +22,22 @@ __all__ = ("CheckExec",)
 class CheckExec(CheckVersion):
     """Check for the presence and version of executables"""
 
+    __slots__ = ()
+
+    #: The flags to try for printing the version of the executable
+    version_flags = ("-V", "--version")
+
     #: The executable may exist and be installed, but get_current_version
     #: may not be able to identify the current version
     require_current_version = False
 
     msg = Setting("Check executable '{check.raw_value}'")
 
+    #: Executable versions are slow to check and rarely change between runs
+    cache_ttl = Setting(600)
+
+    resource = "subprocess"
+
     aliases = ("checkExec",)
 
     @property
@@ -34,8 +49,10 @@ class CheckExec(CheckVersion):
         """Get the package name, comparison operator and version tuple."""
         cmd_name, op, version = CheckVersion.value.fget(self)
 
-        # Check to see if the cmd_name exists. Returns None if it doesn't
-        cmd_name = which(cmd_name) if cmd_name is not None else cmd_name
+        # Check to see if the cmd_name exists in the PATH of the current
+        # environment, which may be a snapshot. Returns None if it doesn't
+        if cmd_name is not None:
+            cmd_name = which(cmd_name, path=current_env().get("PATH"))
 
         return cmd_name, op, version
 
@@ -50,26 +67,27 @@ class CheckExec(CheckVersion):
         if cmd_name is None:  # command not found
             return None
 
-        for args in (  # Different commands to try for versions
-            (cmd_name, "-V"),
-            (cmd_name, "--version"),
-        ):
+        for flag in self.version_flags:  # Different commands to try for versions
             try:
-                proc = subprocess.run(args, capture_output=True)
+                proc = subprocess.run(
+                    (cmd_name, flag),
+                    capture_output=True,
+                    stdin=subprocess.DEVNULL,
+                    timeout=self.time_left(),
+                    env=dict(current_env()),
+                )
             except FileNotFoundError:
                 # Couldn't find the executable
                 continue
+            except subprocess.TimeoutExpired as exc:
+                # The process is killed by subprocess.run
+                raise TimeoutError(f"'{cmd_name} {flag}' timed out") from exc
 
             if proc.returncode != 0:  # Wasn't a success
                 continue
 
             # Try to parse the current version string
-            current_version = version_to_tuple(proc.stdout.decode("UTF-8"))
-            current_version = (
-                current_version
-                if current_version is not None
-                else version_to_tuple(proc.stderr.decode("UTF-8"))
-            )
+            current_version = self.parse_version(proc.stdout, proc.stderr)
 
             if current_version is not None:
                 # Current version found! We're done
@@ -77,3 +95,77 @@ class CheckExec(CheckVersion):
 
         # Not found
         return None
+
+    async def aget_current_version(self) -> t.Union[None, t.Tuple[int]]:
+        """Try to get the version tuple for the executable with asyncio
+        subprocesses."""
+        cmd_name, op, version = self.value
+
+        if cmd_name is None:  # command not found
+            return None
+
+        for flag in self.version_flags:  # Different commands to try for versions
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    cmd_name,
+                    flag,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=dict(current_env()),
+                    start_new_session=True,
+                )
+            except FileNotFoundError:
+                # Couldn't find the executable
+                continue
+
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(), timeout=self.time_left()
+                )
+            except (TimeoutError, asyncio.CancelledError):
+                # Kill the process if it timed out or the check was cancelled,
+                # and the processes it started, which may hold its pipes open
+                self.kill_process(proc)
+                await proc.wait()
+                raise
+
+            if proc.returncode != 0:  # Wasn't a success
+                continue
+
+            # Try to parse the current version string
+            current_version = self.parse_version(stdout, stderr)
+
+            if current_version is not None:
+                # Current version found! We're done
+                return current_version
+
+        # Not found
+        return None
+
+    @staticmethod
+    def kill_process(proc: asyncio.subprocess.Process) -> None:
+        """Kill a process started in a new session and its process group"""
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass  # the process already exited
+
+    @staticmethod
+    def parse_version(stdout: bytes, stderr: bytes) -> t.Union[None, t.Tuple[int]]:
+        """Parse the version tuple from the output of an executable"""
+        current_version = version_to_tuple(stdout.decode("UTF-8"))
+        return (
+            current_version
+            if current_version is not None
+            else version_to_tuple(stderr.decode("UTF-8"))
+        )
+
+    async def acheck(
+        self, executor: t.Optional[Executor] = None, level: int = 0
+    ) -> Result:
+        """Check the executable and its version in an asyncio event loop."""
+        return self.version_result(await self.aget_current_version())
@@ -0,0 +1,292 @@
+"""
+Executors for running checks
+"""
+import typing as t
+import asyncio
+import inspect
+import logging
+import pickle
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+)
+from concurrent.futures import wait as wait_futures
+
+from ..environment import EnvSnapshot, current_env, set_env
+
+__all__ = ("AsyncExecutor", "ProcessExecutor")
+
+logger = logging.getLogger(__name__)
+
+
+class CheckExecutor(Executor):
+    """Base class for executors that track their submitted calls.
+
+    Running checks submit their children checks, so these executors wait for
+    the submitted calls, and the calls they submit, to finish when shutting
+    down.
+    """
+
+    def __init__(self):
+        # Futures for calls that haven't finished
+        self._futures: t.Set[Future] = set()
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def _submit(self, fn: t.Callable[[], Future]) -> Future:
+        """Track the future returned by a call to fn"""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = fn()
+            self._futures.add(future)
+
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: Future) -> None:
+        """Stop tracking a finished future"""
+        with self._lock:
+            self._futures.discard(future)
+
+    def submit_check(self, check, executor: Executor, level: int = 0) -> Future:
+        """Submit a check to run.
+
+        Parameters
+        ----------
+        check
+            The :class:`~geomancy.checks.base.Check` to run
+        executor
+            The executor passed to the check to run its children checks
+        level
+            The depth level of the check in the check tree
+
+        Returns
+        -------
+        future
+            The future for the check's result
+        """
+        return self.submit(check.check, executor, level)
+
+    def _wait_pending(self, cancel_futures: bool = False) -> None:
+        """Stop accepting calls once the submitted calls have finished"""
+        if cancel_futures:
+            with self._lock:
+                futures = list(self._futures)
+            for future in futures:
+                future.cancel()
+
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+                if not futures:
+                    self._shutdown = True
+                    break
+            wait_futures(futures)
+
+
+class AsyncExecutor(CheckExecutor):
+    """An executor that runs calls in an asyncio event loop.
+
+    Coroutine functions--like :meth:`Check.acheck
+    <geomancy.checks.base.Check.acheck>`--are run as tasks in the event loop,
+    which runs in a background thread, and other functions are run in the
+    loop's default thread pool with :func:`asyncio.to_thread`.
+
+    Calls can be submitted from any thread, and they return
+    :class:`concurrent.futures.Future` objects.
+    """
+
+    #: The event loop that runs the submitted calls
+    loop: asyncio.AbstractEventLoop
+
+    #: The loop's default thread pool, which runs functions that aren't
+    #: coroutine functions
+    threads: ThreadPoolExecutor
+
+    def __init__(self, max_workers: t.Optional[int] = None):
+        """
+        Parameters
+        ----------
+        max_workers
+            The maximum number of threads used to run functions that aren't
+            coroutine functions
+        """
+        super().__init__()
+        self.loop = asyncio.new_event_loop()
+        self.threads = ThreadPoolExecutor(max_workers=max_workers)
+        self.loop.set_default_executor(self.threads)
+
+        # Run the event loop in a separate thread
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="AsyncExecutor", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Submit a coroutine function or function to run in the event loop"""
+
+        def run():
+            if inspect.iscoroutinefunction(fn):
+                coroutine = fn(*args, **kwargs)
+            else:
+                coroutine = asyncio.to_thread(fn, *args, **kwargs)
+            return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+        return self._submit(run)
+
+    def submit_check(self, check, executor: Executor, level: int = 0) -> Future:
+        """Submit a check to run as a coroutine (see :meth:`Check.acheck
+        <geomancy.checks.base.Check.acheck>`)"""
+        return self.submit(check.acheck, executor, level)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting calls and stop the event loop.
+
+        Parameters
+        ----------
+        wait
+            Wait for the submitted calls, and the calls they submit, to finish
+        cancel_futures
+            Cancel the calls that haven't finished
+        """
+        if wait:
+            self._wait_pending(cancel_futures=cancel_futures)
+
+            # Stop the loop's thread pool
+            asyncio.run_coroutine_threadsafe(
+                self.loop.shutdown_default_executor(), self.loop
+            ).result()
+        else:
+            with self._lock:
+                self._shutdown = True
+
+            # Don't wait for the functions running in threads, and cancel the
+            # tasks, so that cancelled checks kill their subprocesses and their
+            # transports are closed while the loop is still running
+            self.threads.shutdown(wait=False, cancel_futures=True)
+            asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self.loop).result()
+
+        # Stop the event loop, then close it
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    @staticmethod
+    async def _cancel_tasks() -> None:
+        """Cancel the other tasks of the running loop and wait for them to
+        finish"""
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Let the callbacks of the finished tasks, like closing transports, run
+        await asyncio.sleep(0)
+
+
+def run_pickled_check(data: bytes, level: int = 0):
+    """Unpickle and run a check (in a separate process).
+
+    Parameters
+    ----------
+    data
+        The pickled check
+    level
+        The depth level of the check in the check tree
+
+    Returns
+    -------
+    result
+        The :class:`~geomancy.checks.base.Result` of the check
+    """
+    check = pickle.loads(data)
+    return check.check(None, level)
+
+
+class ProcessExecutor(CheckExecutor):
+    """An executor that runs checks in a pool of processes.
+
+    Checks without children (leaf checks) are pickled and run in the process
+    pool, and their results are pickled back. Group checks, checks that can't be
+    pickled and other calls are run in a thread pool in this process.
+
+    Notes
+    -----
+    Checks run in processes use the configuration of this process when the
+    process pool was started (or forked), and they substitute the environment
+    snapshot that was current when the executor was created.
+    """
+
+    #: The pool of processes used to run leaf checks
+    processes: ProcessPoolExecutor
+
+    #: The pool of threads used to run other calls
+    threads: ThreadPoolExecutor
+
+    def __init__(self, max_workers: t.Optional[int] = None):
+        """
+        Parameters
+        ----------
+        max_workers
+            The maximum number of processes used to run leaf checks
+        """
+        super().__init__()
+        environ = current_env()
+        snapshot = environ if isinstance(environ, EnvSnapshot) else None
+        self.processes = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=set_env, initargs=(snapshot,)
+        )
+        self.threads = ThreadPoolExecutor()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Submit a function to run in the thread pool"""
+        return self._submit(lambda: self.threads.submit(fn, *args, **kwargs))
+
+    def submit_check(self, check, executor: Executor, level: int = 0) -> Future:
+        """Submit a leaf check to run in the process pool, if it can be
+        pickled, or to the thread pool otherwise."""
+        if check.children:
+            return self.submit(check.check, executor, level)
+
+        try:
+            data = pickle.dumps(check)
+        except Exception as exc:
+            logger.debug(f"Running {check} in a thread. It can't be pickled: {exc}")
+            return self.submit(check.check, executor, level)
+
+        return self._submit(
+            lambda: self.processes.submit(run_pickled_check, data, level)
+        )
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting calls and shut down the pools.
+
+        Parameters
+        ----------
+        wait
+            Wait for the submitted calls, and the calls they submit, to finish
+        cancel_futures
+            Cancel the calls that haven't finished
+        """
+        if wait:
+            self._wait_pending(cancel_futures=cancel_futures)
+            self.threads.shutdown(cancel_futures=cancel_futures)
+            self.processes.shutdown(cancel_futures=cancel_futures)
+            return None
+
+        with self._lock:
+            self._shutdown = True
+        self.threads.shutdown(wait=False, cancel_futures=cancel_futures)
+
+        # Terminate the processes, which may be running checks that timed out,
+        # then join the pool. Otherwise, the pool's thread may use its closed
+        # pipes when the interpreter exits
+        processes = getattr(self.processes, "_processes", None) or {}
+        for process in list(processes.values()):
+            process.terminate()
+        self.processes.shutdown(wait=True, cancel_futures=cancel_futures)
@@ -2,6 +2,9 @@
 Check the existence and, optionally, the type of path.
 """
 import typing as t
+import copy
+import os
+from collections import defaultdict
 from pathlib import Path
 
 from thatway import Setting
@@ -14,8 +17,10 @@ __all__ = ("CheckPath",)
 class CheckPath(Check):
     """Check paths for valid files and directories"""
 
+    __slots__ = ("type",)
+
     #: (Optional) the type of path expected
-    type: t.Optional[str] = None
+    type: t.Optional[str]
 
     #: The valid values of path types
     type_options = (None, "dir", "file")
@@ -24,6 +29,8 @@ class CheckPath(Check):
 
     aliases = ("checkPath",)
 
+    resource = "filesystem"
+
     def __init__(self, *args, type: t.Optional[str] = None, **kwargs):
         super().__init__(*args, **kwargs)
         if type not in self.type_options:
@@ -33,19 +40,73 @@ class CheckPath(Check):
             )
         self.type = type
 
-    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
-        """Check paths"""
-        value = self.value
-        path = Path(value)
-
+    def path_status(self, path: Path) -> str:
+        """The result status for a path"""
         if not path.exists():
-            status = "failed (missing)"
+            return "failed (missing)"
         elif self.type == "dir" and not path.is_dir():
-            status = "failed (not dir)"
+            return "failed (not dir)"
         elif self.type == "file" and not path.is_file():
-            status = "failed (not file)"
+            return "failed (not file)"
+        else:
+            return "passed"
+
+    def entry_status(self, entry: os.DirEntry) -> str:
+        """The result status for a directory entry from a directory listing"""
+        # Listings have the types of entries, but symlinks are followed with a
+        # stat to find whether their target exists
+        if entry.is_symlink():
+            try:
+                entry.stat()
+            except OSError:
+                return "failed (missing)"
+
+        if self.type == "dir" and not entry.is_dir():
+            return "failed (not dir)"
+        elif self.type == "file" and not entry.is_file():
+            return "failed (not file)"
         else:
-            status = "passed"
+            return "passed"
 
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        """Check paths"""
+        status = self.path_status(Path(self.value))
         msg = self.msg.format(check=self, status=status)
         return Result(msg=msg, status=status)
+
+    def check_values(self, values: t.Sequence[str]) -> t.List[str]:
+        """Check paths, with one directory listing for directories that have
+        more than one of the paths"""
+        check = copy.copy(self)
+        paths = []
+        for value in values:
+            check.value = value
+            paths.append(Path(check.value))
+
+        # Find the directories with more than one path
+        counts = defaultdict(int)
+        for path in paths:
+            if path.name not in ("", ".", ".."):
+                counts[path.parent] += 1
+
+        # List the directories
+        listings = dict()
+        for parent, count in counts.items():
+            if count < 2:
+                continue
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = {entry.name: entry for entry in entries}
+            except OSError:
+                listings[parent] = dict()
+
+        statuses = []
+        for path in paths:
+            entry = listings.get(path.parent, dict()).get(path.name)
+            if entry is not None:
+                statuses.append(self.entry_status(entry))
+            else:
+                # Paths that aren't listed may still exist--e.g. on
+                # case-insensitive filesystems
+                statuses.append(self.path_status(path))
+        return statuses
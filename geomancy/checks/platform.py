@@ -19,6 +19,8 @@ logger = logging.getLogger(__name__)
 class CheckPlatform(CheckVersion):
     """Check the availability and version of a python package"""
 
+    __slots__ = ()
+
     # The message for checking python packages
     msg = Setting("Check platform '{check.raw_value}'")
 
@@ -3,7 +3,9 @@ Checks whether the python package is installed and, optionally, check its
 version.
 """
 import typing as t
+import copy
 import logging
+import re
 import importlib.metadata  # python >= 3.8
 
 from thatway import Setting
@@ -19,11 +21,15 @@ logger = logging.getLogger(__name__)
 class CheckPythonPackage(CheckVersion):
     """Check the availability and version of a python package"""
 
+    __slots__ = ()
+
     # The message for checking python packages
     msg = Setting("Check python package '{check.raw_value}'")
 
     aliases = ("checkPythonPackage", "checkPythonPkg", "CheckPythonPkg")
 
+    resource = "filesystem"
+
     def get_current_version(self) -> t.Union[None, t.Tuple[int]]:
         # Get the package name, operator and version to check against (the last
         # 2 aren't used here)
@@ -42,3 +48,32 @@ class CheckPythonPackage(CheckVersion):
             return version_to_tuple(version_string) if version_string else None
         except importlib.metadata.PackageNotFoundError:
             return None
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """The normalized name of a python package (PEP 503)"""
+        return re.sub(r"[-_.]+", "-", name).lower()
+
+    def check_values(self, values: t.Sequence[str]) -> t.List[str]:
+        """Check python packages with one scan of the installed packages"""
+        # Get the installed package versions. The first package found on the
+        # path is the one imported
+        versions = dict()
+        for dist in importlib.metadata.distributions():
+            name = dist.metadata["Name"]
+            if name:
+                versions.setdefault(self.normalize(name), dist.version)
+
+        check = copy.copy(self)
+        statuses = []
+        for value in values:
+            check.value = value
+            pkg_name = check.value[0]
+            version_string = (
+                versions.get(self.normalize(pkg_name)) if pkg_name else None
+            )
+            current_version = (
+                version_to_tuple(version_string) if version_string else None
+            )
+            statuses.append(check.version_result(current_version).status)
+        return statuses
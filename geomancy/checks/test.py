@@ -8,8 +8,10 @@ from .base import Check, Result, Executor
 class CheckSleep(Check):
     """A check that sleeps for a specified about of time"""
 
+    __slots__ = ("sleep",)
+
     #: Time in seconds to sleep the check
-    sleep: int = 3
+    sleep: int
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3,7 +3,13 @@ import typing as t
 import operator
 import re
 
-__all__ = ("all_subclasses", "pop_first", "version_to_tuple", "name_and_version")
+__all__ = (
+    "all_subclasses",
+    "attributes",
+    "pop_first",
+    "version_to_tuple",
+    "name_and_version",
+)
 
 __missing__ = object()  # used an argument for missing values
 
@@ -34,6 +40,40 @@ def all_subclasses(cls) -> t.List[t.Type]:
     ]
 
 
+def attributes(obj: t.Any) -> t.Dict[str, t.Any]:
+    """The instance attributes of an object, including attributes in slots.
+
+    Parameters
+    ----------
+    obj
+        The object to inspect for attributes
+
+    Returns
+    -------
+    attrs
+        The attribute names and values. Slots that aren't set are skipped.
+
+    Examples
+    --------
+    >>> class A:
+    ...     __slots__ = ("a", "b")
+    >>> class B(A):
+    ...     pass
+    >>> obj = B()
+    >>> obj.a, obj.c = 1, 3
+    >>> attributes(obj)
+    {'a': 1, 'c': 3}
+    """
+    attrs = dict()
+    for cls in reversed(type(obj).__mro__):
+        slots = cls.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                attrs[name] = getattr(obj, name)
+    attrs.update(getattr(obj, "__dict__", dict()))
+    return attrs
+
+
 def pop_first(d: dict, *keys, del_remaining: bool = True, default: t.Any = __missing__):
     """Pop the first key found in the dict.
 
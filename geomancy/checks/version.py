@@ -11,6 +11,8 @@ __all__ = ("CheckVersion",)
 class CheckVersion(Check):
     """An abstract Check for package and program versions"""
 
+    __slots__ = ()
+
     #: If true, the result of get_current_version must not be None
     #: Set to True if get_current_version should return a version if the command
     #: or package exists
@@ -39,11 +41,15 @@ class CheckVersion(Check):
         be found."""
         return None
 
-    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
-        """Check whether the current version is compatible with the version
-        specified in the value."""
+    def version_result(self, current_version: t.Union[None, t.Tuple[int]]) -> Result:
+        """Create the result for the current version.
+
+        Parameters
+        ----------
+        current_version
+            The current version, or None if it couldn't be found.
+        """
         name, op, version = self.value
-        current_version = self.get_current_version()
 
         if name is None:
             status = "failed (missing)"
@@ -66,3 +72,8 @@ class CheckVersion(Check):
                 status = "passed"
 
         return Result(msg=self.msg.format(check=self), status=status)
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        """Check whether the current version is compatible with the version
+        specified in the value."""
+        return self.version_result(self.get_current_version())
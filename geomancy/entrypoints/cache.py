@@ -0,0 +1,185 @@
+"""
+The 'cache' subcommand and the cache of checks loaded from checks files
+"""
+import typing as t
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import click
+from thatway import config
+
+from .loader import ChecksFile
+from .utils import cache_dir
+from .. import get_version
+from ..checks.cache import ResultCache
+from ..environment.cache import EnvCache
+
+__all__ = ("PlanCache", "cache_dir", "cache_cmd")
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCache:
+    """An on-disk cache of the checks and configuration sections loaded from
+    checks files (plans), so that unchanged checks files aren't parsed again.
+
+    Plans are stored by the checks file's path, and they're only used if the
+    size, modification time and contents of the file and the files it includes,
+    the geomancy version and the configuration before the file was loaded are
+    unchanged.
+
+    Notes
+    -----
+    Plans are pickled, so the cache directory should only be writable by the
+    user.
+    """
+
+    #: The directory with the cached plans
+    path: Path
+
+    def __init__(self, path: t.Union[str, Path]):
+        """
+        Parameters
+        ----------
+        path
+            The directory for the cached plans
+        """
+        self.path = Path(path)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path})"
+
+    def filepath(self, checks_file: Path) -> Path:
+        """The path of the cached plan for a checks file"""
+        name = hashlib.sha256(str(checks_file.resolve()).encode()).hexdigest()
+        return self.path / f"{name}.pickle"
+
+    @staticmethod
+    def signature(checks_file: Path, data: t.Optional[bytes] = None) -> str:
+        """The path, size, modification time and content hash of a checks file.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the checks file
+        data
+            The contents of the checks file, if it was already read
+        """
+        stat = checks_file.stat()
+        data = data if data is not None else checks_file.read_bytes()
+        items = (
+            str(checks_file.resolve()),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            hashlib.sha256(data).hexdigest(),
+        )
+        return "\n".join(items)
+
+    def key(self, checks_file: Path, data: bytes) -> str:
+        """The key that validates the cached plan for a checks file.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the checks file
+        data
+            The contents of the checks file
+        """
+        items = (self.signature(checks_file, data), get_version(), config.dumps_yaml())
+        return hashlib.sha256("\n".join(items).encode()).hexdigest()
+
+    def get(self, checks_file: Path, key: str) -> t.Optional[ChecksFile]:
+        """Get the cached plan for a checks file.
+
+        Returns
+        -------
+        plan
+            The checks and config sections of the checks file, or None if a
+            valid plan isn't cached. Plans are invalid if the checks file or the
+            checks files it includes have changed.
+        """
+        try:
+            with open(self.filepath(checks_file), "rb") as f:
+                plan = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.debug(f"Ignoring an invalid cached plan for {checks_file}: {exc}")
+            return None
+
+        if not isinstance(plan, dict) or plan.get("key") != key:
+            return None
+
+        # Check that the included checks files haven't changed
+        loaded = plan["loaded"]
+        try:
+            signatures = [self.signature(path) for path in loaded.includes]
+        except OSError:
+            return None
+        return loaded if signatures == plan["includes"] else None
+
+    def set(self, checks_file: Path, key: str, loaded: ChecksFile) -> bool:
+        """Cache the plan for a checks file.
+
+        Returns
+        -------
+        cached
+            True if the plan was cached, False otherwise
+        """
+        try:
+            signatures = [self.signature(path) for path in loaded.includes]
+            plan = {"key": key, "loaded": loaded, "includes": signatures}
+            data = pickle.dumps(plan)
+        except Exception as exc:
+            logger.debug(f"Could not cache the plan for {checks_file}: {exc}")
+            return False
+
+        # Write to a temporary file first so that readers never see a partial file
+        filepath = self.filepath(checks_file)
+        tmp = filepath.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, filepath)
+        except OSError as exc:
+            logger.debug(f"Could not cache the plan for {checks_file}: {exc}")
+            return False
+        return True
+
+    def clear(self) -> int:
+        """Remove the cached plans.
+
+        Returns
+        -------
+        count
+            The number of cached plans removed
+        """
+        count = 0
+        for filepath in self.path.glob("*.pickle"):
+            try:
+                filepath.unlink()
+                count += 1
+            except OSError:
+                pass
+        return count
+
+
+@click.group(name="cache")
+def cache_cmd():
+    """Cached check results, checks files and environment files"""
+
+
+@cache_cmd.command(name="clear")
+def clear_cmd():
+    """Remove cached check results, checks files and environment files"""
+    results = ResultCache(cache_dir("results")).clear()
+    plans = PlanCache(cache_dir("plans")).clear()
+    envs = EnvCache(cache_dir("env")).clear()
+    click.echo(
+        f"Removed {results} cached results, {plans} cached checks files and "
+        f"{envs} cached environment files"
+    )
@@ -3,13 +3,12 @@ The 'check' subcommand
 """
 import typing as t
 import logging
-import tomllib
-import time
-from concurrent.futures import ThreadPoolExecutor
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import ExitStack
+from pathlib import Path
 
 import click
-import yaml
 from rich.live import Live
 from rich.console import Group
 from rich.rule import Rule
@@ -18,8 +17,14 @@ import rich.progress as progress
 from thatway import config, Setting
 
 from .environment import env_options
-from .utils import filepaths
-from ..checks import Check
+from .cache import PlanCache
+from .loader import ChecksFile, ChecksLoader, validate_checks_files
+from .utils import cpu_count, cache_dir
+from ..checks import Check, CheckException, Result
+from ..checks.base import Scheduler
+from ..checks.cache import ResultCache
+from ..checks.executors import AsyncExecutor, ProcessExecutor
+from ..environment import use_env
 
 __all__ = ("check_cmd",)
 
@@ -32,114 +37,288 @@ class MissingChecks(click.ClickException):
     """No checks were found in the checks files"""
 
 
-#: Default paths for checks files
-config.cli.checks_paths = Setting(
-    (
-        "pyproject.toml",
-        ".geomancy.??ml",
-        "geomancy.??ml",
-        "geomancy.yml",
-        ".geomancy.yml",
-    )
-)
-
-#: Default file extensions for TOML files
-config.cli.toml_exts = Setting((".toml",))
-
-#: Default file extensions for YAML files
-config.cli.yaml_exts = Setting((".yml", ".yaml"))
-
-#: Names for the config section in checks files
-config.cli.config_sections = Setting(("config", "Config"))
-
-
-def validate_checks_files(
-    ctx: click.Context, param: click.Parameter, values: t.Tuple[str]
-):
-    """Validate the checks files arguments and convert to valid paths"""
-    # Convert filepath strings into Path objects. Use default locations if
-    # no checks_files were specified (i.e. it is an empty list)
-    existing_files = []
-    for path in values or config.cli.checks_paths:
-        existing_files += filepaths(path)
+#: The default executor used to run checks (see 'executors')
+config.cli.executor = Setting("thread")
+
+#: The maximum number of workers (threads or processes) used to run checks.
+#: Defaults to a number based on the CPUs available, including cgroup CPU quotas
+config.cli.max_workers = Setting(None, allowed_types=(None, int))
+
+#: The maximum number of checks that run at once, by resource class
+#: (see 'Check.resource'). Resource classes without a limit (None) are only
+#: limited by the number of workers. Subprocesses default to the CPUs available
+config.cli.limits.subprocess = Setting(None, allowed_types=(None, int))
+config.cli.limits.network = Setting(16, allowed_types=(None, int))
+config.cli.limits.filesystem = Setting(32, allowed_types=(None, int))
+config.cli.limits.aws = Setting(10, allowed_types=(None, int))  # botocore pool size
+
+#: The resource classes with limits
+resources = ("subprocess", "network", "filesystem", "aws")
+
+#: The executors available to run checks
+executors = {
+    "thread": ThreadPoolExecutor,
+    "async": AsyncExecutor,
+    "process": ProcessExecutor,
+}
+
+
+def stream_checks_file(
+    loaded: ChecksFile,
+    plans: t.Optional[PlanCache] = None,
+    loader: t.Optional[ChecksLoader] = None,
+) -> t.Iterator[Check]:
+    """Load the checks from a checks file while it's parsed, and update the
+    configuration from its config sections.
+
+    Parameters
+    ----------
+    loaded
+        The checks file to load, which is updated with the checks loaded
+        (see :meth:`ChecksLoader.stream`)
+    plans
+        The cache of checks files, which is used instead of parsing checks files
+        that haven't changed
+    loader
+        The loader for checks files and the checks files they include
+
+    Returns
+    -------
+    checks
+        An iterator of the checks of the checks file's root check, as they're
+        loaded. Checks files loaded whole, like cached checks files, don't
+        yield checks.
+    """
+    loader = loader if loader is not None else ChecksLoader()
+    checks_file = loaded.path
+    data = checks_file.read_bytes()
+    if plans is None:
+        yield from loader.stream(loaded, data)
+        return None
+
+    key = plans.key(checks_file, data)
+    cached = plans.get(checks_file, key)
+    if cached is not None:
+        logger.debug(f"Using the cached checks for '{checks_file}'")
+        for config_section in cached.config_sections:
+            config.update(config_section)
+        loaded.check = cached.check
+        loaded.config_sections = cached.config_sections
+        loaded.includes = cached.includes
+        return None
+
+    yield from loader.stream(loaded, data)
+    plans.set(checks_file, key, loaded)
+
+
+def load_checks_file(
+    checks_file: Path,
+    plans: t.Optional[PlanCache] = None,
+    loader: t.Optional[ChecksLoader] = None,
+) -> t.Optional[Check]:
+    """Load the checks from a checks file, and update the configuration from its
+    config sections.
+
+    Parameters
+    ----------
+    checks_file
+        The path of the checks file
+    plans
+        The cache of checks files (see :func:`stream_checks_file`)
+    loader
+        The loader for checks files and the checks files they include
+
+    Returns
+    -------
+    check
+        The root check of the checks file, if it has checks
+    """
+    loaded = ChecksFile(path=checks_file)
+    for _ in stream_checks_file(loaded, plans=plans, loader=loader):
+        pass
+    return loaded.check
+
+
+def run_checks_file(
+    checks_file: Path,
+    scheduler: Scheduler,
+    parent: t.Optional[Check] = None,
+    level: int = 0,
+    plans: t.Optional[PlanCache] = None,
+    loader: t.Optional[ChecksLoader] = None,
+    listener: t.Optional[t.Callable[[Result], None]] = None,
+) -> t.Tuple[t.Optional[Check], t.Union[Result, Future, None]]:
+    """Run the checks of a checks file as they're loaded.
+
+    The checks of YAML checks files are scheduled as soon as they're parsed
+    (see :func:`stream_checks_file`), so that they run while the rest of the
+    checks file is parsed. Other checks files are scheduled once they're
+    loaded.
+
+    Parameters
+    ----------
+    checks_file
+        The path of the checks file
+    scheduler
+        The scheduler used to run the checks
+    parent
+        The parent check of the checks file's root check, or None if the root
+        check is a root of the scheduler
+    level
+        The depth level of the checks file's root check
+    plans
+        The cache of checks files (see :func:`stream_checks_file`)
+    loader
+        The loader for checks files and the checks files they include
+    listener
+        A function called with the result when it, or one of its children,
+        changes (see :attr:`Result.listeners`). It's registered before the
+        checks are scheduled, so that no change is missed. Only used if the
+        root check doesn't have a parent.
+
+    Returns
+    -------
+    check, result
+        The root check of the checks file and its result, or the future for
+        its result. These are None if the checks file doesn't have checks.
+    """
+    loaded = ChecksFile(path=checks_file)
+    check = result = None
+    waiting = []  # checks waiting for the checks they require to be loaded
+
+    for child in stream_checks_file(loaded, plans=plans, loader=loader):
+        if check is None:
+            # Create the result of the root check, which finishes once all of
+            # its children are loaded and finished
+            check = loaded.check
+            scheduler.add(check, parent=parent)
+            result = Result(
+                msg=check.header(level), condition=check.condition, held=True
+            )
+            if listener is not None and parent is None:
+                result.listeners.append(listener)
+            if check.short_circuit:
+                scheduler.short_circuit(check, level, result)
 
-    # Nothing to do if no checks files were found
-    if len(existing_files) == 0:
-        raise click.MissingParameter(
-            "Could not find a checks file.", ctx=ctx, param=param
-        )
-    logging.debug(f"Checking the following files: {existing_files}")
-    return existing_files
+        if check.children:
+            check.children.append(child)
+        else:
+            check.children = [child]
+        if not waiting:
+            try:
+                scheduler.add(child, parent=check)
+            except CheckException:
+                # The checks it requires may be loaded later. The following
+                # checks wait too, so that the results stay in order
+                waiting.append(child)
+                continue
+            result.add(scheduler.schedule(child, level=level + 1))
+        else:
+            waiting.append(child)
+
+    if check is None:
+        # The checks file was loaded whole
+        check = loaded.check
+        if check is None:
+            return None, None
+        scheduler.add(check, parent=parent)
+        if parent is not None:
+            return check, scheduler.schedule(check, level=level)
+        result = check.check(executor=scheduler, level=level)
+        if listener is not None:
+            # The result is created as its checks are scheduled, so the
+            # listener is called for the changes made before it's registered
+            result.listeners.append(listener)
+            listener(result)
+        return check, result
+
+    for child in waiting:
+        scheduler.add(child, parent=check)
+        result.add(scheduler.schedule(child, level=level + 1))
+
+    # Options in the root of the checks file may follow its checks
+    result.msg = check.header(level)
+    result.condition = check.condition
+    result.release()
+    return check, result
 
 
 # Setup 'check' command
 @click.command(name="check")
 @env_options
+@click.option(
+    "--executor",
+    type=click.Choice(tuple(executors)),
+    default=None,
+    help="The executor used to run checks (default: 'thread')",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0.0, min_open=True),
+    default=None,
+    help="The maximum time, in seconds, for all checks to finish",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Run all checks and parse all checks files instead of using the cache",
+)
 @click.argument("checks_files", nargs=-1, type=str, callback=validate_checks_files)
-def check_cmd(checks_files, env):
+def check_cmd(checks_files, env, executor, timeout, no_cache):
     """Run checks"""
-    logger.debug(f"check_files={checks_files}, env={env}")
-
-    # Convert the checks_files into checks
-    checks = []
-    for checks_file in checks_files:
-        # Parse the file by filetype
-        if checks_file.suffix in config.cli.toml_exts:
-            with open(checks_file, "rb") as f:
-                d = tomllib.load(f)
-
-        elif checks_file.suffix in config.cli.yaml_exts:
-            with open(checks_file, "r") as f:
-                d = yaml.load(f, Loader=yaml.SafeLoader)
+    logger.debug(
+        f"check_files={checks_files}, env={env}, executor={executor}, "
+        f"timeout={timeout}, no_cache={no_cache}"
+    )
 
-        else:
-            continue
-
-        # pyproject.toml files have their items placed under the [tool.geomancy]
-        # section
-        if checks_file.name == "pyproject.toml":
-            d = d.get("tool", dict()).get("geomancy", dict())
-
-        # Load config section, if available
-        for config_name in config.cli.config_sections:
-            config_section = d.pop(config_name, None)
-            if isinstance(config_section, dict):
-                config.update(config_section)
-
-        # Load the rest into a root CheckBase
-        check = Check.load(d, name=str(checks_file))
-        if check is not None:
-            checks.append(check)
-
-    # Create a root check, if there are a lot of checks
-    if len(checks) > 1:
-        check = Check(name=f"Checking {len(checks)} files", children=checks)
-    elif len(checks) == 1:
-        check = checks[0]
-    else:
-        plural = True if len(checks_files) > 1 else False
-        raise MissingChecks(
-            f"No checks were found in the file{'s' if plural else ''}: "
-            f"{', '.join(map(str, checks_files))}."
-        )
+    use_cache = config.cli.cache and not no_cache
+    plans = PlanCache(cache_dir("plans")) if use_cache else None
+    missing = MissingChecks(
+        f"No checks were found in the file{'s' if len(checks_files) > 1 else ''}: "
+        f"{', '.join(map(str, checks_files))}."
+    )
 
     # Set up a console for rendering to the terminal
     console = Console(theme=Theme({"repr.number": ""}))
 
     with ExitStack() as stack:
-        # Context manager for running checks in multiple threads
-        executor = stack.enter_context(ThreadPoolExecutor())
+        # Checks substitute the environment variables of the snapshot taken
+        # before they're run, including the variables from environment files
+        stack.enter_context(use_env(env))
+
+        # Checks files, and the checks files they include, are parsed
+        # concurrently
+        pool = stack.enter_context(ThreadPoolExecutor())
+        loader = ChecksLoader(executor=pool)
+
+        # Executor for running checks concurrently. The results are done when
+        # the executor is shut down, so it doesn't wait for calls of checks that
+        # timed out or were cancelled
+        executor_name = executor if executor else config.cli.executor
+        cpus = cpu_count()
+        if config.cli.max_workers is not None:
+            max_workers = config.cli.max_workers
+        elif executor_name == "process":
+            max_workers = cpus
+        else:
+            # Checks in threads mostly wait on I/O (see ThreadPoolExecutor)
+            max_workers = min(32, cpus + 4)
+        executor = executors[executor_name](max_workers=max_workers)
+        stack.callback(executor.shutdown, wait=False, cancel_futures=True)
 
         # Context manager for rendering live to the terminal (rich)
         live = stack.enter_context(Live(refresh_per_second=4, console=console))
 
-        # Run the checks, display the results to the terminal
-        result = check.check(executor=executor)
-
-        # Get the total number of checks
-        check_total = len(check.flatten)
-
-        # Set up a progress bar and render group
+        # Run the checks, display the results to the terminal. Changes to the
+        # results are pushed to the 'changes' queue as the checks finish
+        changes = queue.SimpleQueue()
+        cache = ResultCache(cache_dir("results")) if use_cache else None
+        limits = {name: getattr(config.cli.limits, name) for name in resources}
+        if limits["subprocess"] is None:
+            limits["subprocess"] = cpus
+        # Set up a progress bar and render group. The elapsed time includes
+        # loading checks files, since checks start running as they're loaded
         pbar = progress.Progress(
             progress.SpinnerColumn(),
             progress.BarColumn(),
@@ -147,25 +326,94 @@ def check_cmd(checks_files, env):
             progress.MofNCompleteColumn(),
             progress.TimeRemainingColumn(),
         )
-        task1 = pbar.add_task("checking...", total=check_total)
-
-        # Update the display until the checks are done
-        while not result.done:
-            time.sleep(0.5)
-
-            # Update progress
-            pbar.update(task1, completed=len(result.finished))
-
-            # Update group
-            group = Group(
-                result.rich_table(),
-                pbar.make_tasks_table(tasks=pbar.tasks),
+        task1 = pbar.add_task("checking...", total=None)
+
+        scheduler = Scheduler(
+            root=None,
+            executor=executor,
+            timeout=timeout,
+            cache=cache,
+            limits=limits,
+        )
+        if len(checks_files) == 1:
+            # Run the checks of the checks file as they're loaded
+            check, result = run_checks_file(
+                checks_files[0],
+                scheduler,
+                plans=plans,
+                loader=loader,
+                listener=changes.put,
             )
-            live.update(group)
+            if check is None:
+                raise missing
+        else:
+            # Create a root check for the checks files. The checks of each
+            # checks file start running as it's loaded, while the rest of the
+            # checks files are loaded
+            check = Check(name=f"Checking {len(checks_files)} files")
+            scheduler.add(check)
+            result = Result(msg=check.header(), condition=check.condition, held=True)
+            result.listeners.append(changes.put)
+
+            # Start parsing the checks files concurrently. The first checks file
+            # is streamed, if it's a YAML file, while the rest are parsed
+            for i, checks_file in enumerate(checks_files):
+                if i == 0 and checks_file.suffix in config.cli.yaml_exts:
+                    continue
+                if plans is None or not plans.filepath(checks_file).exists():
+                    loader.parse(checks_file)
+
+            checks = []
+            for checks_file in checks_files:
+                child, child_result = run_checks_file(
+                    checks_file,
+                    scheduler,
+                    parent=check,
+                    level=1,
+                    plans=plans,
+                    loader=loader,
+                )
+                if child is not None:
+                    checks.append(child)
+                    result.add(child_result)
+            if not checks:
+                raise missing
+
+            # The root check is named for the checks files with checks
+            check.children = checks
+            check.name = f"Checking {len(checks)} file{'s' if len(checks) > 1 else ''}"
+            result.msg = check.header()
+            result.release()
+
+        # Get the total number of checks
+        pbar.update(task1, total=check.count)
+
+        # Update the display until the checks are done. Interrupting (Ctrl-C)
+        # cancels the unfinished checks
+        try:
+            while not result.done:
+                # Wait for a result to change, and handle all queued changes at once.
+                # The listener is registered before the checks are scheduled, so
+                # the result finishing is always pushed
+                changes.get()
+                while not changes.empty():
+                    changes.get_nowait()
+
+                # Update progress
+                pbar.update(task1, completed=result.done_count)
+
+                # Update group
+                group = Group(
+                    result.rich_table(),
+                    pbar.make_tasks_table(tasks=pbar.tasks),
+                )
+                live.update(group)
+        except KeyboardInterrupt:
+            scheduler.cancel()
 
         # Create a summary line to render
-        passed_total = len([r for r in result.finished if r.passed])
-        failed_total = check_total - passed_total
+        passed_total = result.passed_count
+        failed_total = result.failed_count
         elapsed = sum(task.elapsed for task in pbar.tasks if task.elapsed is not None)
 
         if result.passed:
@@ -7,6 +7,9 @@ from thatway import config
 
 import click
 
+# Import the modules with settings so that they're in the config
+from . import check  # noqa
+
 __all__ = ("config_cmd",)
 
 logger = logging.getLogger(__name__)
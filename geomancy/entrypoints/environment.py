@@ -3,11 +3,17 @@ Options and settings for environment files
 """
 import typing as t
 import logging
+from pathlib import Path
 
 import click
 
-from .utils import filepaths
-from ..environment import load_env
+from ..environment import EnvSnapshot
+from ..environment.dotenv import (
+    EnvSyntaxError,
+    EnvToken,
+    layer_env,
+    tokenize_env_file,
+)
 
 __all__ = ("env_options",)
 
@@ -53,50 +59,90 @@ class RequiredOther(click.Option):
 
 
 class EnvOption(click.Option):
-    """Generate an environment variable dict from environment files"""
+    """Generate a snapshot of environment variables from environment files"""
 
     # Whether to overwrite new values over existing values in the environment
     # (i.e. os.environ dict).
     overwrite = False
 
+    # Whether to tokenize all environment files instead of using the cache
+    no_cache = False
+
     def handle_parse_result(
         self, ctx: click.Context, opts: t.Mapping[str, t.Any], args: t.List[str]
     ) -> t.Tuple[t.Any, t.List[str]]:
-        """Set the overwrite attribute if the --overwrite flag was set"""
-        # Get options
-        if "overwrite" in opts:
-            self.overwrite = opts["overwrite"]
-            logger.debug(f"Environment overwrite set to: {self.overwrite}")
+        """Set the overwrite and no_cache attributes from the --overwrite and
+        --no-cache flags"""
+        # The flags are only in the options when they're set, and the option
+        # may be reused by later invocations
+        self.overwrite = opts.get("overwrite", False)
+        self.no_cache = opts.get("no_cache", False)
+        logger.debug(f"Environment overwrite set to: {self.overwrite}")
 
         # Return as normal
         return super().handle_parse_result(ctx, opts, args)
 
     def process_value(self, ctx: click.Context, value: t.Any) -> t.Any:
-        """Process the environment files (-e) option strings into an env dict.
+        """Process the environment files (-e) option strings into a snapshot
+        of the environment variables.
 
         Returns
         -------
         env
-            The processed env dict
+            The snapshot of the environment variables (os.environ) with the
+            variables loaded from the environment files. The environment
+            variables of this process are not changed.
         """
-        # Set a default, if it's not specified
-        value = tuple() if value is None else value
+        # Without environment files, the snapshot has the current environment
+        if not value:
+            return EnvSnapshot()
+
+        # The configuration, cache and executor are only imported for environment
+        # files, which keeps the startup of the 'run' subcommand fast
+        from concurrent.futures import ThreadPoolExecutor
+        from thatway import config
+        from .utils import filepaths, cpu_count, cache_dir
+        from ..environment.cache import EnvCache
 
         # Retrieve the env_files from the arguments
         existing_paths = []
         for path in value:
             existing_paths += filepaths(path)
 
-        # Load the environment files and keep track of the number of variables
+        # Tokenize the environment files concurrently. Tokens don't depend on
+        # the environment variables, so the files are independent until they're
         # substituted
-        env = dict()
-        for filepath in existing_paths:
-            returned_dict = load_env(filepath, overwrite=self.overwrite)
-            env.update(returned_dict)
+        use_cache = config.cli.cache and not self.no_cache
+        cache = EnvCache(cache_dir("env")) if use_cache else None
+        tokenize = cache.tokenize if cache is not None else _tokenize_file
+        if len(existing_paths) > 1:
+            max_workers = min(len(existing_paths), cpu_count())
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                tokenized = list(pool.map(tokenize, existing_paths))
+        else:
+            tokenized = list(map(tokenize, existing_paths))
+
+        # Substitute and load the environment files in order. Later files are
+        # substituted with the variables of earlier files
+        env = EnvSnapshot()
+        for filepath, (tokens, errors) in zip(existing_paths, tokenized):
+            for exc in errors:
+                logger.warning(str(exc))
+            env = layer_env(env, tokens, overwrite=self.overwrite)
+            logger.debug(f"Loaded '{filepath}' into {env}")
         return env
 
 
-# An option group that returns an env dict
+def _tokenize_file(
+    filepath: Path,
+) -> t.Tuple[t.List[EnvToken], t.List[EnvSyntaxError]]:
+    """Tokenize an environment file without the cache, and return its tokens and
+    syntax errors"""
+    errors = []
+    return tokenize_env_file(filepath, errors=errors), errors
+
+
+# An option group that returns an environment snapshot
 def env_options(func=None):
     """Options for loading and using environment files"""
     opts = [
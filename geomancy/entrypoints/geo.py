@@ -1,14 +1,13 @@
 """The geo CLI entrypoint"""
+import typing as t
 import logging, logging.config
+import importlib
 import os
 from pathlib import Path
 
 import click
 from click_default_group import DefaultGroup
 
-from .check import check_cmd
-from .run import run_cmd
-from .config import config_cmd
 from .. import get_version
 
 logger = logging.getLogger(__name__)
@@ -16,6 +15,35 @@ logger = logging.getLogger(__name__)
 description = (Path(__file__).parent / ".." / "__description__.txt").read_text().strip()
 
 
+class LazyGroup(DefaultGroup):
+    """A command group with subcommands that are imported when they're used, so
+    that the subcommands' dependencies don't slow down other subcommands."""
+
+    #: The subcommands to import by name. The values are 'module:attribute'
+    #: strings for the subcommands
+    lazy_commands: t.Dict[str, str]
+
+    def __init__(
+        self, *args, lazy_commands: t.Optional[t.Mapping[str, str]] = None, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or dict())
+
+    def list_commands(self, ctx: click.Context) -> t.List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(
+        self, ctx: click.Context, cmd_name: str
+    ) -> t.Optional[click.Command]:
+        # Import the subcommand or, if no subcommand matches, the default command
+        name = cmd_name if cmd_name in self.lazy_commands else self.default_cmd_name
+        if name in self.lazy_commands and name not in self.commands:
+            module_name, attribute = self.lazy_commands[name].split(":")
+            module = importlib.import_module(module_name, package=__package__)
+            self.add_command(getattr(module, attribute), name=name)
+        return super().get_command(ctx, cmd_name)
+
+
 def print_version(context, parameter, value):
     """Print the version"""
     if not value or context.resilient_parsing:
@@ -25,7 +53,17 @@ def print_version(context, parameter, value):
 
 
 @click.group(
-    cls=DefaultGroup, default="check", default_if_no_args=True, help=description
+    cls=LazyGroup,
+    default="check",
+    default_if_no_args=True,
+    help=description,
+    lazy_commands={
+        "check": ".check:check_cmd",
+        "run": ".run:run_cmd",
+        "config": ".config:config_cmd",
+        "cache": ".cache:cache_cmd",
+        "validate": ".validate:validate_cmd",
+    },
 )
 @click.option("--debug", "-d", is_flag=True, help="Enable debugging information")
 @click.option(
@@ -74,9 +112,3 @@ def geo_cli(ctx, debug, disable_color):
             },
         }
     )
-
-
-# Add sub-commands
-geo_cli.add_command(check_cmd)  # noqa
-geo_cli.add_command(run_cmd)  # noqa
-geo_cli.add_command(config_cmd)  # noqa
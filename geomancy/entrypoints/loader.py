@@ -0,0 +1,753 @@
+"""
+Load checks from checks files and the checks files they include
+"""
+import typing as t
+import logging
+import math
+import os
+import re
+import threading
+import tomllib
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from functools import partial
+from glob import glob
+from pathlib import Path
+
+import click
+import yaml
+from thatway import config, Setting
+
+from .utils import filepaths
+from ..checks import Check, CheckException
+
+__all__ = (
+    "ChecksFile",
+    "ChecksLoader",
+    "iter_yaml",
+    "read_checks_file",
+    "validate_checks_files",
+)
+
+logger = logging.getLogger(__name__)
+
+#: Default paths for checks files
+config.cli.checks_paths = Setting(
+    (
+        "pyproject.toml",
+        ".geomancy.??ml",
+        "geomancy.??ml",
+        "geomancy.yml",
+        ".geomancy.yml",
+    )
+)
+
+#: Default file extensions for TOML files
+config.cli.toml_exts = Setting((".toml",))
+
+#: Default file extensions for YAML files
+config.cli.yaml_exts = Setting((".yml", ".yaml"))
+
+#: Names for the config section in checks files
+config.cli.config_sections = Setting(("config", "Config"))
+
+#: The line numbers of the keys in a checks file, by the path of keys
+Lines = t.Dict[t.Tuple[t.Any, ...], int]
+
+#: The loader for YAML checks files. The libyaml loader is much faster than the
+#: pure-python loader, and it's available if PyYAML was built with libyaml
+yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def validate_checks_files(
+    ctx: click.Context, param: click.Parameter, values: t.Tuple[str]
+):
+    """Validate the checks files arguments and convert to valid paths"""
+    # Convert filepath strings into Path objects. Use default locations if
+    # no checks_files were specified (i.e. it is an empty list)
+    existing_files = []
+    for path in values or config.cli.checks_paths:
+        existing_files += filepaths(path)
+
+    # Nothing to do if no checks files were found
+    if len(existing_files) == 0:
+        raise click.MissingParameter(
+            "Could not find a checks file.", ctx=ctx, param=param
+        )
+    logger.debug(f"Checking the following files: {existing_files}")
+    return existing_files
+
+
+def read_checks_file(
+    checks_file: Path, data: t.Optional[bytes] = None
+) -> t.Optional[dict]:
+    """Parse a checks file.
+
+    Parameters
+    ----------
+    checks_file
+        The path of the checks file
+    data
+        The contents of the checks file, if it was already read
+
+    Returns
+    -------
+    checks_dict
+        The parsed dict of the checks file, or None if it isn't a TOML or YAML
+        file
+    """
+    # Parse the file by filetype
+    if checks_file.suffix in config.cli.toml_exts:
+        data = data if data is not None else checks_file.read_bytes()
+        d = tomllib.loads(data.decode())
+
+    elif checks_file.suffix in config.cli.yaml_exts:
+        data = data if data is not None else checks_file.read_bytes()
+        logger.debug(f"Parsing '{checks_file}' with {yaml_loader.__name__}")
+        d = yaml.load(data, Loader=yaml_loader)
+
+    else:
+        return None
+
+    # pyproject.toml files have their items placed under the [tool.geomancy]
+    # section
+    if checks_file.name == "pyproject.toml":
+        d = d.get("tool", dict()).get("geomancy", dict())
+
+    return d if isinstance(d, dict) else dict()
+
+
+class _Frame:
+    """A YAML sequence or mapping being built from parser events"""
+
+    __slots__ = ("value", "keys", "key", "has_key", "merges", "item")
+
+    def __init__(self, value: t.Union[list, dict], keys: t.Optional[tuple]):
+        self.value = value
+        self.keys = keys  # the path of keys of a mapping, if it's known
+        self.key = None  # the key waiting for its value in a mapping
+        self.has_key = False
+        self.merges = []  # the mappings merged into a mapping with '<<'
+        self.item = None  # the (key,) of this value in the root mapping
+
+
+def iter_yaml(
+    data: t.Union[bytes, str], lines: t.Optional[Lines] = None
+) -> t.Iterator[t.Tuple[t.Any, t.Any]]:
+    """Parse a YAML document and yield the items of its root mapping as soon as
+    each item is parsed.
+
+    The document is built directly from parser events, which skips composing
+    nodes and constructing the document--the slowest steps for large checks
+    files. Only plain scalars that aren't strings, and collections with tags
+    like '!!set', are passed to the loader's resolver and constructor.
+
+    Parameters
+    ----------
+    data
+        The YAML document
+    lines
+        A dict to fill with the line numbers of the keys of mappings, by the
+        path of keys from the root mapping
+
+    Returns
+    -------
+    items
+        An iterator of the (key, value) items of the root mapping, which is
+        empty if the root of the document isn't a mapping. Items merged with
+        a '<<' key are yielded last.
+
+    Raises
+    ------
+    yaml.MarkedYAMLError
+        Raised if the document is invalid
+    """
+    str_tag = "tag:yaml.org,2002:str"
+    merge_tag = "tag:yaml.org,2002:merge"
+    default_tags = (None, "!", "tag:yaml.org,2002:map", "tag:yaml.org,2002:seq")
+    merge = object()  # marks merge keys
+
+    loader = yaml_loader(data)
+    lines = lines if lines is not None else dict()
+    anchors = dict()
+    scalars = dict()  # converted plain scalars, by value
+    stack = []
+    item = None  # a finished item of the root mapping
+
+    def add(
+        value: t.Any, event: yaml.Event, done: bool = True
+    ) -> t.Tuple[t.Optional[tuple], tuple]:
+        """Add a value to the current sequence or mapping, and return the path
+        of keys for the value, if it's known, and its (key,) in the root
+        mapping, if it's a value of the root mapping. Values that aren't done
+        are collections that are still being built."""
+        nonlocal item
+        if not stack:
+            return (), ()
+
+        frame = stack[-1]
+        if isinstance(frame.value, list):
+            frame.value.append(value)
+            return None, ()
+
+        if not frame.has_key:
+            try:
+                hash(value)
+            except TypeError:
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    None,
+                    "found unhashable key",
+                    event.start_mark,
+                )
+            frame.key, frame.has_key = value, True
+            if frame.keys is not None and value is not merge:
+                lines.setdefault(frame.keys + (value,), event.start_mark.line + 1)
+            return None, ()
+
+        key, frame.key, frame.has_key = frame.key, None, False
+        if key is merge:
+            frame.merges.append(value)
+            return None, ()
+        frame.value[key] = value
+        root_item = (key,) if len(stack) == 1 else ()
+        if root_item and done:
+            item = (key, value)
+        return (frame.keys + (key,) if frame.keys is not None else None), root_item
+
+    def compose(event: yaml.Event, nodes: t.Dict[str, yaml.Node]) -> yaml.Node:
+        """Compose the node for an event, and the events of its items if it's a
+        collection, so that it can be constructed by the loader"""
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor in nodes:
+                return nodes[event.anchor]
+            if event.anchor not in anchors:
+                raise yaml.composer.ComposerError(
+                    None,
+                    None,
+                    f"found undefined alias {event.anchor!r}",
+                    event.start_mark,
+                )
+            # Aliases to values outside of the collection are already built
+            node = yaml.ScalarNode(None, None, event.start_mark, event.end_mark)
+            loader.constructed_objects[node] = anchors[event.anchor]
+            return node
+
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if tag in (None, "!"):
+                tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(
+                tag, event.value, event.start_mark, event.end_mark, event.style
+            )
+        else:
+            is_mapping = isinstance(event, yaml.MappingStartEvent)
+            node_type = yaml.MappingNode if is_mapping else yaml.SequenceNode
+            tag = event.tag
+            if tag in (None, "!"):
+                tag = loader.resolve(node_type, None, event.implicit)
+            node = node_type(tag, [], event.start_mark, None, event.flow_style)
+            if event.anchor is not None:
+                nodes[event.anchor] = node
+            items = []
+            while not isinstance(loader.peek_event(), yaml.CollectionEndEvent):
+                items.append(compose(loader.get_event(), nodes))
+            node.end_mark = loader.get_event().end_mark
+            node.value = list(zip(items[::2], items[1::2])) if is_mapping else items
+
+        if event.anchor is not None:
+            nodes[event.anchor] = node
+        return node
+
+    try:
+        while loader.check_event():
+            event = loader.get_event()
+
+            if isinstance(event, yaml.ScalarEvent):
+                if event.tag not in (None, "!") or not event.implicit[0]:
+                    tag = event.tag if event.tag not in (None, "!") else str_tag
+                    if tag == str_tag:
+                        value = event.value
+                    else:
+                        node = yaml.ScalarNode(tag, event.value, style=event.style)
+                        value = loader.construct_object(node)
+                elif event.value in scalars:
+                    value = scalars[event.value]
+                else:
+                    tag = loader.resolve(yaml.ScalarNode, event.value, (True, False))
+                    if tag == merge_tag:
+                        value = merge
+                    elif tag == str_tag:
+                        value = event.value
+                    else:
+                        node = yaml.ScalarNode(tag, event.value)
+                        value = loader.construct_object(node)
+                    scalars[event.value] = value
+                if event.anchor is not None:
+                    anchors[event.anchor] = value
+                add(value, event)
+
+            elif isinstance(event, yaml.AliasEvent):
+                add(anchors[event.anchor], event)
+
+            elif (
+                isinstance(event, yaml.CollectionStartEvent)
+                and event.tag not in default_tags
+            ):
+                # Tagged collections, like sets and ordered maps, are composed
+                # and constructed by the loader
+                value = loader.construct_object(compose(event, {}), deep=True)
+                loader.constructed_objects.clear()
+                if event.anchor is not None:
+                    anchors[event.anchor] = value
+                add(value, event)
+
+            elif isinstance(event, yaml.CollectionStartEvent):
+                is_mapping = isinstance(event, yaml.MappingStartEvent)
+                value = dict() if is_mapping else []
+                if event.anchor is not None:
+                    anchors[event.anchor] = value
+                keys, root_item = add(value, event, done=False)
+                frame = _Frame(value, keys if is_mapping else None)
+                frame.item = root_item
+                stack.append(frame)
+
+            elif isinstance(event, yaml.CollectionEndEvent):
+                frame = stack.pop()
+                merged = dict()
+                for merge_value in frame.merges:
+                    if not isinstance(merge_value, list):
+                        merge_value = [merge_value]
+                    for mapping in merge_value:
+                        for key, value in mapping.items():
+                            if key not in frame.value and key not in merged:
+                                merged[key] = value
+                if merged:
+                    frame.value.update(merged)
+                if frame.item:
+                    item = (frame.item[0], frame.value)
+                elif not stack:
+                    # Yield the items merged into the root mapping last
+                    yield from merged.items()
+
+            elif isinstance(event, yaml.DocumentEndEvent):
+                if loader.check_event(yaml.DocumentStartEvent):
+                    event = loader.get_event()
+                    raise yaml.composer.ComposerError(
+                        "expected a single document in the stream",
+                        None,
+                        "but found another document",
+                        event.start_mark,
+                    )
+
+            if item is not None:
+                yield item
+                item = None
+    finally:
+        loader.dispose()
+
+
+def _last_config_line(data: bytes) -> float:
+    """The last line of a YAML checks file that may start a config section.
+
+    Only keys of the root mapping, which are indented like its first key, can
+    start config sections. If the root of the checks file isn't a block
+    mapping, every line may start a config section.
+    """
+    root = re.search(
+        rb"^(?![ \t]*(?:#|%|\.\.\.|---[ \t]*$|---[ \t]+#))([ \t]*)(\S+)", data, re.M
+    )
+    if root is None:
+        return 0
+    indent, start = root.groups()
+    if start.startswith((b"{", b"[", b"-", b"?", b"!", b"&", b"*", b"---")):
+        return math.inf
+
+    names = "|".join(re.escape(name) for name in config.cli.config_sections)
+    pattern = rf"^{re.escape(indent.decode())}[\"']?(?:{names})[\"']?[ \t]*:"
+    config_re = re.compile(pattern.encode(), re.M)
+    return max(
+        (data.count(b"\n", 0, m.start()) + 1 for m in config_re.finditer(data)),
+        default=0,
+    )
+
+
+@dataclass
+class ChecksFile:
+    """The checks and configuration loaded from a checks file"""
+
+    #: The path of the checks file
+    path: Path
+
+    #: The root check of the checks file, if it has checks
+    check: t.Optional[Check] = None
+
+    #: The config sections of the checks file and the files it includes, in the
+    #: order they were applied
+    config_sections: t.List[dict] = field(default_factory=list)
+
+    #: The paths of the checks files included by the checks file
+    includes: t.List[Path] = field(default_factory=list)
+
+
+class ChecksLoader:
+    """Load checks from checks files, and the checks files they include.
+
+    Checks files are included in a group of checks with an 'include' key (see
+    :attr:`Check.include_aliases <geomancy.checks.Check.include_aliases>`) with
+    a path, glob or list of paths and globs, relative to the including file:
+
+    .. code-block:: yaml
+
+        Services:
+          include: [base.yaml, "services/*.yaml"]
+
+    Included files are parsed concurrently as soon as they're found, and each
+    unique file is only parsed once. A file included more than once by a
+    checks file, directly or through other included files, is only loaded the
+    first time.
+    """
+
+    #: The executor used to parse checks files concurrently, if available
+    executor: t.Optional[Executor]
+
+    def __init__(self, executor: t.Optional[Executor] = None):
+        """
+        Parameters
+        ----------
+        executor
+            The executor used to parse checks files concurrently. Checks files
+            are parsed when they're loaded if it isn't specified.
+        """
+        self.executor = executor
+
+        # The futures for the parsed dicts of checks files, by resolved path
+        self._parsed: t.Dict[Path, Future] = dict()
+        self._lock = threading.Lock()
+
+    def parse(self, checks_file: Path, data: t.Optional[bytes] = None) -> Future:
+        """Parse a checks file, if it hasn't been parsed, and start parsing the
+        checks files it includes.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the checks file
+        data
+            The contents of the checks file, if it was already read
+
+        Returns
+        -------
+        future
+            The future for the parsed dict of the checks file
+            (see :func:`read_checks_file`)
+        """
+        key = checks_file.resolve()
+        with self._lock:
+            future = self._parsed.get(key)
+            if future is not None:
+                return future
+
+            if self.executor is not None:
+                future = self.executor.submit(self._parse, checks_file, data)
+                self._parsed[key] = future
+                return future
+
+            future = Future()
+            self._parsed[key] = future
+
+        try:
+            future.set_result(self._parse(checks_file, data))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def is_parsed(self, checks_file: Path) -> bool:
+        """Whether a checks file was parsed, or is being parsed, with
+        :meth:`parse`"""
+        with self._lock:
+            return checks_file.resolve() in self._parsed
+
+    def _parse(self, checks_file: Path, data: t.Optional[bytes] = None):
+        """Parse a checks file and start parsing the checks files it includes"""
+        d = read_checks_file(checks_file, data)
+
+        # Find the included files
+        stack = [d] if d is not None else []
+        while stack:
+            item = stack.pop()
+            for key, value in item.items():
+                if key in Check.include_aliases:
+                    try:
+                        paths = self.resolve(checks_file, value)
+                    except CheckException:
+                        continue  # raised when the checks file is loaded
+                    for path in paths:
+                        self.parse(path)
+                elif isinstance(value, dict):
+                    stack.append(value)
+        return d
+
+    @staticmethod
+    def resolve(checks_file: Path, value: t.Union[str, t.List[str]]) -> t.List[Path]:
+        """Find the paths of the checks files included by a checks file.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the including checks file
+        value
+            The path or glob, or list of paths and globs, to include. Relative
+            paths are relative to the directory of the including checks file.
+
+        Returns
+        -------
+        paths
+            The paths of the included checks files
+
+        Raises
+        ------
+        CheckException
+            Raised if an included checks file doesn't exist
+        """
+        patterns = [value] if isinstance(value, str) else value
+        if not isinstance(patterns, (list, tuple)):
+            raise CheckException(
+                f"The checks files included by '{checks_file}' should be a path "
+                f"or list of paths, not '{value}'."
+            )
+
+        paths = []
+        for pattern in map(str, patterns):
+            path = Path(os.path.normpath(checks_file.parent / pattern))
+
+            if any(c in pattern for c in ("*", "?", "[", "]")):
+                paths += sorted(map(Path, glob(str(path))))
+            elif path.is_file():
+                paths.append(path)
+            else:
+                raise CheckException(
+                    f"Could not find the checks file '{pattern}' included by "
+                    f"'{checks_file}'."
+                )
+        return [path for path in paths if path.is_file()]
+
+    def load(self, checks_file: Path, data: t.Optional[bytes] = None) -> ChecksFile:
+        """Load the checks from a checks file and the checks files it includes,
+        and update the configuration from their config sections.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the checks file
+        data
+            The contents of the checks file, if it was already read
+
+        Returns
+        -------
+        loaded
+            The checks and config sections loaded
+
+        Raises
+        ------
+        CheckException
+            Raised if an included checks file doesn't exist or if checks files
+            include each other (a cycle)
+        """
+        loaded = ChecksFile(path=checks_file)
+        key = checks_file.resolve()
+        loaded.check = self._load(checks_file, data, (key,), {key}, loaded)
+        return loaded
+
+    def stream(
+        self, loaded: ChecksFile, data: t.Optional[bytes] = None
+    ) -> t.Iterator[Check]:
+        """Load the checks of a YAML checks file while it's parsed.
+
+        The checks of each item in the root of the checks file are loaded, and
+        yielded, as soon as the item is parsed, so that they can run while the
+        rest of the checks file is parsed. Items are only loaded once the
+        config sections of the checks file have been applied.
+
+        Before the first check is yielded, the root check of the checks file,
+        without children, is set in the loaded checks file. Its children are
+        set once the checks file is loaded. Options in the root of the checks
+        file, like 'condition', are set in the root check when they're parsed.
+
+        Checks files that aren't YAML files, YAML checks files that were
+        already parsed (see :meth:`parse`), and YAML checks files with a check
+        at their root, are loaded whole without yielding checks.
+
+        Parameters
+        ----------
+        loaded
+            The checks file to load, which is updated with the checks, config
+            sections and included checks files loaded
+        data
+            The contents of the checks file, if it was already read
+
+        Returns
+        -------
+        checks
+            An iterator of the checks of the root check
+
+        Raises
+        ------
+        CheckException
+            Raised if an included checks file doesn't exist, if checks files
+            include each other (a cycle) or if a check type is found in the root
+            of a checks file after its checks were yielded
+        """
+        checks_file = loaded.path
+        key = checks_file.resolve()
+        chain, seen = (key,), {key}
+        if checks_file.suffix not in config.cli.yaml_exts or self.is_parsed(
+            checks_file
+        ):
+            loaded.check = self._load(checks_file, data, chain, seen, loaded)
+            return None
+        data = data if data is not None else checks_file.read_bytes()
+
+        # Find the last line that may start a config section. Items are held
+        # until they're past it, so that the config sections are applied first
+        config_line = _last_config_line(data)
+
+        logger.debug(f"Streaming '{checks_file}' with {yaml_loader.__name__}")
+        include = partial(self._include, checks_file, chain, seen, loaded)
+        check_types = Check.types()
+        lines = dict()
+        d = dict()  # the items parsed
+        held = []  # the names of items that aren't loaded yet
+        streamed = []  # the checks yielded
+        options = dict()  # the options of the root check
+        whole = False  # whether the checks file has a check at its root
+
+        def load_held() -> t.Iterator[Check]:
+            """Load the checks of the held items"""
+            for name in held:
+                value = d[name]
+                if name in Check.include_aliases:
+                    checks = include(value)
+                elif isinstance(value, dict):
+                    check = Check.load(value, name=name, level=2, include=include)
+                    checks = [check] if check is not None else []
+                else:
+                    checks = []
+
+                if not checks:
+                    options[name] = value
+                    if loaded.check is not None:
+                        set_options(loaded.check)
+                    continue
+
+                for check in checks:
+                    if loaded.check is None:
+                        loaded.check = Check(name=str(checks_file), **dict(options))
+                    streamed.append(check)
+                    yield check
+            held.clear()
+
+        def set_options(root: Check):
+            """Set the options of the root check"""
+            template = Check(name=root.name, **dict(options))
+            for attr in ("desc", "condition", "short_circuit", "requires", "timeout"):
+                setattr(root, attr, getattr(template, attr))
+
+        for name, value in iter_yaml(data, lines=lines):
+            d[name] = value
+            if name in config.cli.config_sections:
+                if isinstance(value, dict):
+                    config.update(value)
+                    loaded.config_sections.append(value)
+                continue
+
+            if name in check_types:
+                if loaded.check is not None:
+                    raise CheckException(
+                        f"The checks file '{checks_file}' has a check type "
+                        f"('{name}') in its root after other checks."
+                    )
+                whole = True
+            if whole:
+                continue
+
+            held.append(name)
+            if lines.get((name,), 0) >= config_line:
+                yield from load_held()
+
+        if whole:
+            # The checks file is a single check
+            d = {k: v for k, v in d.items() if k not in config.cli.config_sections}
+            loaded.check = Check.load(d, name=str(checks_file), include=include)
+        else:
+            yield from load_held()
+            if loaded.check is not None:
+                loaded.check.children = streamed
+
+    def _load(
+        self,
+        checks_file: Path,
+        data: t.Optional[bytes],
+        chain: t.Tuple[Path, ...],
+        seen: t.Set[Path],
+        loaded: ChecksFile,
+    ) -> t.Optional[Check]:
+        """Load the checks of a checks file.
+
+        Parameters
+        ----------
+        checks_file
+            The path of the checks file
+        data
+            The contents of the checks file, if it was already read
+        chain
+            The resolved paths of the checks files that include this file, and
+            this file
+        seen
+            The resolved paths of the checks files already loaded
+        loaded
+            The loaded checks file to add config sections and includes to
+        """
+        d = self.parse(checks_file, data).result()
+        if d is None:
+            return None
+        d = dict(d)  # the parsed dict may be loaded again by other loads
+
+        # Load config section, if available
+        for config_name in config.cli.config_sections:
+            config_section = d.pop(config_name, None)
+            if isinstance(config_section, dict):
+                config.update(config_section)
+                loaded.config_sections.append(config_section)
+
+        # Load the rest into a root CheckBase
+        include = partial(self._include, checks_file, chain, seen, loaded)
+        return Check.load(d, name=str(checks_file), include=include)
+
+    def _include(
+        self,
+        checks_file: Path,
+        chain: t.Tuple[Path, ...],
+        seen: t.Set[Path],
+        loaded: ChecksFile,
+        value: t.Union[str, t.List[str]],
+    ) -> t.List[Check]:
+        """Load the checks of the checks files included by a checks file"""
+        checks = []
+        for path in self.resolve(checks_file, value):
+            key = path.resolve()
+            if key in chain:
+                raise CheckException(
+                    f"The checks file '{path}' includes itself through "
+                    f"'{checks_file}'."
+                )
+            if key in seen:
+                logger.debug(f"Skipping '{path}', which was already included")
+                continue
+
+            seen.add(key)
+            loaded.includes.append(path)
+            check = self._load(path, None, chain + (key,), seen, loaded)
+            if check is not None:
+                checks.append(check)
+        return checks
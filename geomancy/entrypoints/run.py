@@ -20,6 +20,6 @@ def run_cmd(args, env):
     """Run command within environment"""
     logger.debug(f"args={args}, env={env}")
 
-    # Run the command
-    result = subprocess.run(args, env=env)
+    # Run the command with the environment variables of the snapshot
+    result = subprocess.run(args, env=dict(env))
     return result.returncode
@@ -1,12 +1,24 @@
 """CLI utils"""
 import typing as t
+import os
+import math
 from pathlib import Path
 import logging
 
-__all__ = ("filepaths",)
+from thatway import config, Setting
+
+__all__ = ("filepaths", "cpu_count", "cache_dir")
 
 logger = logging.getLogger(__name__)
 
+#: Cache the results of checks, the checks files and the environment files
+#: parsed between runs (see 'Check.cache_ttl')
+config.cli.cache = Setting(True)
+
+#: The directory for cached data. Defaults to '$XDG_CACHE_HOME/geomancy' or
+#: '~/.cache/geomancy'
+config.cli.cache_dir = Setting(None, allowed_types=(None, str))
+
 
 def filepaths(string: str) -> t.List[Path]:
     """Given a string for a filepath or file glob, verifies that the path(s)
@@ -36,3 +48,67 @@ def filepaths(string: str) -> t.List[Path]:
             existing_paths.append(path)
 
     return existing_paths
+
+
+def cpu_count(cgroup_root: t.Union[str, Path] = "/sys/fs/cgroup") -> int:
+    """The number of CPUs available to this process.
+
+    This is the smallest of the CPUs this process can be scheduled on and the
+    CPU quota of its cgroup (v2 'cpu.max' or v1 'cpu.cfs_quota_us'), which
+    containers use to limit CPUs.
+
+    Parameters
+    ----------
+    cgroup_root
+        The mount point of the cgroup filesystem
+
+    Returns
+    -------
+    count
+        The number of CPUs available, which is at least 1
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on some platforms, like macOS
+        count = os.cpu_count() or 1
+
+    # Find the cgroup CPU quota and period, in microseconds
+    root = Path(cgroup_root)
+    try:
+        quota, period = (root / "cpu.max").read_text().split()  # cgroup v2
+    except (OSError, ValueError):
+        try:
+            quota = (root / "cpu" / "cpu.cfs_quota_us").read_text()  # cgroup v1
+            period = (root / "cpu" / "cpu.cfs_period_us").read_text()
+        except OSError:
+            quota, period = "max", "0"
+
+    try:
+        if quota.strip() not in ("max", "-1") and int(period) > 0:
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except ValueError:
+        logger.debug(f"Could not parse the cgroup CPU quota '{quota}/{period}'")
+
+    return max(count, 1)
+
+
+def cache_dir(*names: str) -> Path:
+    """The directory for cached data.
+
+    Parameters
+    ----------
+    names
+        The names of sub-directories in the cache directory
+
+    Returns
+    -------
+    path
+        The path of the cache directory, which may not exist yet
+    """
+    if config.cli.cache_dir is not None:
+        path = Path(config.cli.cache_dir).expanduser()
+    else:
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+        path = Path(xdg_cache_home) if xdg_cache_home else Path("~/.cache").expanduser()
+        path /= "geomancy"
+    return path.joinpath(*names)
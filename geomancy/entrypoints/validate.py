@@ -0,0 +1,458 @@
+"""
+The 'validate' subcommand, which checks the format of checks files without
+creating or running their checks
+"""
+import typing as t
+import inspect
+import logging
+import re
+import time
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+
+import click
+import yaml
+from thatway import config
+
+from .loader import ChecksLoader, Lines, iter_yaml, validate_checks_files
+from ..checks import Check, CheckException
+
+__all__ = ("Issue", "Schema", "parse_checks_file", "validate_checks_file")
+
+logger = logging.getLogger(__name__)
+
+#: A TOML key, which may be bare or quoted
+toml_key = r"""(?:[A-Za-z0-9_-]+|"[^"]*"|'[^']*')"""
+
+#: TOML table headers--e.g. '[tool.geomancy.Checks]'
+toml_header_re = re.compile(
+    rf"^\s*\[\[?\s*({toml_key}(?:\s*\.\s*{toml_key})*)\s*\]\]?\s*(?:#.*)?$"
+)
+
+#: TOML key/value pairs--e.g. 'checkPath = "README.md"'
+toml_pair_re = re.compile(rf"^\s*({toml_key}(?:\s*\.\s*{toml_key})*)\s*=")
+
+
+@dataclass(frozen=True)
+class Issue:
+    """An error found in a checks file"""
+
+    #: The path of the checks file
+    path: Path
+
+    #: The line number of the error, if it's known
+    line: t.Optional[int]
+
+    #: The error message
+    msg: str
+
+    def __str__(self):
+        location = self.path if self.line is None else f"{self.path}:{self.line}"
+        return f"{location}: {self.msg}"
+
+
+class Schema:
+    """The options and option values accepted by check types, derived once from
+    the registered check classes (see :meth:`Check.types
+    <geomancy.checks.Check.types>`).
+
+    The options of a check class are the keyword arguments of its
+    ``__init__`` methods and the names listed in its ``*_aliases`` attributes--
+    e.g. 'subchecks' in :attr:`Check.condition_aliases
+    <geomancy.checks.Check.condition_aliases>`. Options with a limited set of
+    values list them in a ``*_options`` or ``allowed_*s`` attribute--e.g.
+    'dir' and 'file' in :attr:`CheckPath.type_options
+    <geomancy.checks.CheckPath.type_options>`.
+    """
+
+    #: The check classes, by check type name
+    types: t.Dict[str, t.Type[Check]]
+
+    #: The options accepted by each check class. The values are the option
+    #: names that aliases set--e.g. 'subchecks' sets 'condition'
+    options: t.Dict[t.Type[Check], t.Dict[str, str]]
+
+    #: The allowed values of options, by check class and option name
+    values: t.Dict[t.Type[Check], t.Dict[str, tuple]]
+
+    #: Aliases attributes that aren't options of the check
+    alias_exclude = ("aliases", "include_aliases", "matrix_aliases")
+
+    #: Arguments of __init__ methods that aren't options in checks files
+    init_exclude = ("self", "name", "value", "children")
+
+    #: Options with string values that are compared without case
+    case_insensitive = ("condition",)
+
+    def __init__(self, types: t.Optional[t.Mapping[str, t.Type[Check]]] = None):
+        """
+        Parameters
+        ----------
+        types
+            The check classes by check type name. Defaults to the registered
+            check types.
+        """
+        self.types = dict(types if types is not None else Check.types())
+        self.options = dict()
+        self.values = dict()
+        for cls in {Check, *self.types.values()}:
+            self.options[cls], self.values[cls] = self.class_options(cls)
+
+    @classmethod
+    def class_options(
+        cls, check_cls: t.Type[Check]
+    ) -> t.Tuple[t.Dict[str, str], t.Dict[str, tuple]]:
+        """The options and allowed option values of a check class.
+
+        Returns
+        -------
+        options, values
+            The option names set by each option and alias, and the allowed
+            values of options that have them
+        """
+        options = dict()
+
+        # Find the keyword arguments of the __init__ methods
+        for klass in reversed(check_cls.__mro__):
+            init = klass.__dict__.get("__init__")
+            if init is None or klass is object:
+                continue
+            for param in inspect.signature(init).parameters.values():
+                if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                    continue
+                if param.name not in cls.init_exclude:
+                    options[param.name] = param.name
+
+        # Find the aliases of options
+        for attr in dir(check_cls):
+            if not attr.endswith("_aliases") or attr in cls.alias_exclude:
+                continue
+            name = attr[: -len("_aliases")]
+            options.update({alias: name for alias in getattr(check_cls, attr)})
+
+        # Find the allowed values of options
+        values = dict()
+        for name in set(options.values()):
+            allowed = getattr(check_cls, f"{name}_options", None)
+            if allowed is None:
+                allowed = getattr(check_cls, f"allowed_{name}s", None)
+            if isinstance(allowed, (list, tuple)):
+                values[name] = tuple(allowed)
+        return options, values
+
+    def option_error(
+        self, check_cls: t.Type[Check], name: str, key: str, value: t.Any
+    ) -> t.Optional[str]:
+        """Validate an option of a check.
+
+        Parameters
+        ----------
+        check_cls
+            The class of the check
+        name
+            The name of the check
+        key
+            The option or alias
+        value
+            The value of the option
+
+        Returns
+        -------
+        error
+            The error message, or None if the option is valid
+        """
+        option = self.options[check_cls].get(key)
+        if option is None:
+            kind = "group" if check_cls is Check else check_cls.__name__
+            return f"Unknown option '{key}' in '{name}' ({kind})"
+
+        if value is None:
+            return None
+
+        allowed = self.values[check_cls].get(option)
+        if allowed is not None:
+            compare = (
+                value.lower()
+                if isinstance(value, str) and option in self.case_insensitive
+                else value
+            )
+            if compare not in allowed:
+                allowed = tuple(v for v in allowed if v is not None)
+                return f"The {key} '{value}' of '{name}' should be one of {allowed}"
+
+        if option == "timeout":
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                return (
+                    f"The timeout '{value}' of '{name}' should be a number of "
+                    f"seconds"
+                )
+
+        if option == "requires":
+            names = [value] if isinstance(value, str) else value
+            if not isinstance(names, list) or not all(
+                isinstance(n, str) for n in names
+            ):
+                return (
+                    f"The checks required by '{name}' should be a check name or "
+                    f"list of check names"
+                )
+        return None
+
+    def validate(
+        self,
+        d: dict,
+        checks_file: Path,
+        lines: Lines,
+        prefix: t.Tuple[str, ...] = (),
+        include: t.Optional[t.Callable[[t.Any], t.Optional[str]]] = None,
+    ) -> t.List[Issue]:
+        """Validate the parsed dict of a checks file in a single pass, following
+        the rules of :meth:`Check.load <geomancy.checks.Check.load>`.
+
+        Parameters
+        ----------
+        d
+            The parsed dict of checks, without config sections
+        checks_file
+            The path of the checks file, for the issues found
+        lines
+            The line numbers of keys in the checks file
+        prefix
+            The keys of the parsed dict in the checks file--e.g.
+            ('tool', 'geomancy') for pyproject.toml files
+        include
+            A function that validates the value of an include key and returns
+            an error message, if it's invalid
+
+        Returns
+        -------
+        issues
+            The issues found, ordered by line number
+        """
+        issues = []
+        max_level = Check.max_level
+        stack = [(d, prefix, 1)]
+
+        while stack:
+            item, keys, level = stack.pop()
+            name = keys[-1] if len(keys) > len(prefix) else str(checks_file)
+
+            def add(msg: str, key: t.Optional[str] = None):
+                line = lines.get(keys + (key,)) if key is not None else None
+                line = line if line is not None else lines.get(keys)
+                issues.append(Issue(path=checks_file, line=line, msg=msg))
+
+            if level >= max_level:
+                add(f"'{name}' exceeds the maximum level of {max_level}")
+                continue
+
+            check_types = [k for k in item if k in self.types]
+
+            if len(check_types) > 1:
+                add(f"More than 1 check type specified in '{name}': {check_types}")
+                continue
+
+            # Validate a check
+            if len(check_types) == 1:
+                check_type = check_types[0]
+                check_cls = self.types[check_type]
+                value = item[check_type]
+                values = value if isinstance(value, list) else [value]
+                if any(isinstance(v, (dict, list)) for v in values):
+                    add(
+                        f"The value of '{check_type}' in '{name}' should be a value "
+                        f"or a list of values",
+                        check_type,
+                    )
+
+                for key, option in item.items():
+                    if key == check_type:
+                        continue
+                    elif key in Check.include_aliases:
+                        add(
+                            f"Checks can only be included in groups, not in '{name}'",
+                            key,
+                        )
+                    elif key in Check.matrix_aliases:
+                        try:
+                            Check.expand_matrix(name, value, option)
+                        except (CheckException, TypeError) as exc:
+                            add(str(exc).rstrip("."), key)
+                    else:
+                        msg = self.option_error(check_cls, name, key, option)
+                        if msg is not None:
+                            add(msg, key)
+                continue
+
+            # Validate a group of checks
+            for key, value in item.items():
+                if key in Check.include_aliases:
+                    msg = include(value) if include is not None else None
+                    if msg is not None:
+                        add(msg, key)
+                elif isinstance(value, dict):
+                    stack.append((value, keys + (key,), level + 1))
+                else:
+                    msg = self.option_error(Check, name, key, value)
+                    if msg is not None:
+                        add(msg, key)
+
+        issues.sort(key=lambda issue: issue.line or 0)
+        return issues
+
+
+def toml_lines(text: str) -> Lines:
+    """The line numbers of the keys in a TOML document.
+
+    Examples
+    --------
+    >>> toml_lines('[Checks]\\ncheckPath = "a"\\n[Checks."Sub group"]\\nx.y = 1')
+    {('Checks',): 1, ('Checks', 'checkPath'): 2, ('Checks', 'Sub group'): 3, \
+('Checks', 'Sub group', 'x'): 4, ('Checks', 'Sub group', 'x', 'y'): 4}
+    """
+    lines = dict()
+    table = ()
+    for number, line in enumerate(text.splitlines(), 1):
+        header = toml_header_re.match(line)
+        pair = toml_pair_re.match(line) if header is None else None
+        if header is not None:
+            table = ()
+            keys = re.findall(toml_key, header.group(1))
+        elif pair is not None:
+            keys = re.findall(toml_key, pair.group(1))
+        else:
+            continue
+
+        path = table
+        for key in keys:
+            path += (key[1:-1] if key[0] in "\"'" else key,)
+            lines.setdefault(path, number)
+        if header is not None:
+            table = path
+    return lines
+
+
+def parse_checks_file(
+    checks_file: Path,
+) -> t.Tuple[t.Optional[dict], Lines, t.Tuple[str, ...]]:
+    """Parse a checks file and find the line numbers of its keys.
+
+    Returns
+    -------
+    d, lines, prefix
+        The parsed dict (or None if the checks file isn't a TOML or YAML file),
+        the line numbers of its keys and the keys of the parsed dict in the
+        checks file
+
+    Raises
+    ------
+    CheckException
+        Raised if the checks file has a syntax error
+    """
+    data = checks_file.read_bytes()
+
+    if checks_file.suffix in config.cli.toml_exts:
+        text = data.decode()
+        try:
+            d = tomllib.loads(text)
+        except tomllib.TOMLDecodeError as exc:
+            raise CheckException(f"Invalid TOML: {exc}")
+        lines = toml_lines(text)
+
+    elif checks_file.suffix in config.cli.yaml_exts:
+        lines = dict()
+        try:
+            d = dict(iter_yaml(data, lines=lines))
+        except yaml.MarkedYAMLError as exc:
+            mark = exc.problem_mark or exc.context_mark
+            line = f"line {mark.line + 1}: " if mark is not None else ""
+            raise CheckException(f"Invalid YAML: {line}{exc.problem}")
+
+    else:
+        return None, dict(), ()
+
+    # pyproject.toml files have their items placed under the [tool.geomancy]
+    # section
+    prefix = ()
+    if checks_file.name == "pyproject.toml":
+        d = d.get("tool", dict()).get("geomancy", dict())
+        prefix = ("tool", "geomancy")
+
+    return (d if isinstance(d, dict) else dict()), lines, prefix
+
+
+def validate_checks_file(
+    checks_file: Path, schema: t.Optional[Schema] = None
+) -> t.Tuple[t.List[Issue], t.List[Path]]:
+    """Validate a checks file.
+
+    Parameters
+    ----------
+    checks_file
+        The path of the checks file
+    schema
+        The schema of check types. Defaults to the registered check types.
+
+    Returns
+    -------
+    issues, includes
+        The issues found and the paths of the checks files it includes
+    """
+    schema = schema if schema is not None else Schema()
+    try:
+        d, lines, prefix = parse_checks_file(checks_file)
+    except CheckException as exc:
+        return [Issue(path=checks_file, line=None, msg=str(exc))], []
+    if d is None:
+        return [], []
+
+    # Config sections aren't checks
+    d = {k: v for k, v in d.items() if k not in config.cli.config_sections}
+
+    includes = []
+
+    def include(value: t.Any) -> t.Optional[str]:
+        try:
+            includes.extend(ChecksLoader.resolve(checks_file, value))
+        except CheckException as exc:
+            return str(exc).rstrip(".")
+        return None
+
+    issues = schema.validate(d, checks_file, lines, prefix=prefix, include=include)
+    return issues, includes
+
+
+@click.command(name="validate")
+@click.argument("checks_files", nargs=-1, type=str, callback=validate_checks_files)
+def validate_cmd(checks_files):
+    """Validate checks files without running their checks"""
+    start = time.perf_counter()
+    schema = Schema()
+
+    # Validate the checks files and the checks files they include, once each
+    queue = list(checks_files)
+    seen = set()
+    issues = []
+    while queue:
+        checks_file = queue.pop(0)
+        key = checks_file.resolve()
+        if key in seen:
+            continue
+        seen.add(key)
+
+        file_issues, includes = validate_checks_file(checks_file, schema)
+        issues += file_issues
+        queue += includes
+
+    for issue in issues:
+        click.echo(str(issue))
+
+    elapsed = time.perf_counter() - start
+    logger.debug(f"Validated {len(seen)} checks files in {elapsed:.3f}s")
+    if issues:
+        click.echo(f"Found {len(issues)} error(s) in {len(seen)} checks file(s)")
+        exit(1)
+    click.echo(f"Validated {len(seen)} checks file(s)")
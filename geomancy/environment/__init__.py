@@ -1,4 +1,15 @@
 """Classes and utilities for load and modifying environment variables"""
-from .dotenv import sub_env, parse_env, load_env
+from .snapshot import EnvSnapshot, current_env, set_env, use_env
+from .dotenv import EnvTemplate, sub_env, parse_env, load_snapshot, load_env
 
-__all__ = (sub_env, parse_env, load_env)
+__all__ = (
+    EnvSnapshot,
+    current_env,
+    set_env,
+    use_env,
+    EnvTemplate,
+    sub_env,
+    parse_env,
+    load_snapshot,
+    load_env,
+)
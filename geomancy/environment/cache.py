@@ -0,0 +1,216 @@
+"""An on-disk cache of the tokens parsed from environment files"""
+import typing as t
+import gc
+import hashlib
+import logging
+import marshal
+import os
+import threading
+from pathlib import Path
+
+from .dotenv import EnvRef, EnvSyntaxError, EnvToken, tokenize_env_file
+from .. import get_version
+
+__all__ = ("EnvCache",)
+
+logger = logging.getLogger(__name__)
+
+
+class EnvCache:
+    """An on-disk cache of the tokens parsed from environment files, so that
+    unchanged environment files aren't tokenized again.
+
+    Tokens are stored by the environment file's path, and they're only used if
+    the content hash of the file and the geomancy version are unchanged.
+    Substitution isn't cached, since the substituted values depend on the
+    environment variables and the environment files loaded before.
+
+    Notes
+    -----
+    Tokens are stored as plain tuples with :mod:`marshal`, which is compact and
+    fast to load, and which can't run code when loaded, unlike pickle.
+    """
+
+    #: The directory with the cached tokens
+    path: Path
+
+    #: The version of the format for the cached tokens
+    format_version: int = 1
+
+    #: The size of the chunks read to hash environment files
+    chunk_size: int = 1024 * 1024
+
+    def __init__(self, path: t.Union[str, Path]):
+        """
+        Parameters
+        ----------
+        path
+            The directory for the cached tokens
+        """
+        self.path = Path(path)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path})"
+
+    def filepath(self, env_file: Path) -> Path:
+        """The path of the cached tokens for an environment file"""
+        name = hashlib.sha256(str(Path(env_file).resolve()).encode()).hexdigest()
+        return self.path / f"{name}.marshal"
+
+    def key(self, env_file: Path) -> str:
+        """The key that validates the cached tokens for an environment file.
+
+        This is a hash of the contents of the environment file, which is read
+        in chunks, the geomancy version and the format version.
+        """
+        digest = hashlib.sha256(f"{get_version()}\n{self.format_version}\n".encode())
+        with open(env_file, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(
+        self, env_file: Path, key: str
+    ) -> t.Optional[t.Tuple[t.List[EnvToken], t.List[EnvSyntaxError]]]:
+        """Get the cached tokens for an environment file.
+
+        Returns
+        -------
+        tokens, errors
+            The tokens and the syntax errors of the environment file, or None
+            if valid tokens aren't cached.
+        """
+        # marshal.loads is much faster than marshal.load with a file. The
+        # tokens are tuples that can't have reference cycles, so the garbage
+        # collector, which would repeatedly traverse them, is paused while
+        # they're created
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._load(env_file, key)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _load(
+        self, env_file: Path, key: str
+    ) -> t.Optional[t.Tuple[t.List[EnvToken], t.List[EnvSyntaxError]]]:
+        """Load the cached tokens for an environment file"""
+        try:
+            cached = marshal.loads(self.filepath(env_file).read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.debug(f"Ignoring invalid cached tokens for {env_file}: {exc}")
+            return None
+
+        if not isinstance(cached, dict) or cached.get("key") != key:
+            return None
+
+        try:
+            make_ref = EnvRef._make
+            tokens = [
+                (
+                    EnvToken(name, value, quote, tuple(map(make_ref, refs)), line)
+                    if refs
+                    else EnvToken(name, value, quote, refs, line)
+                )
+                for name, value, quote, refs, line in cached["tokens"]
+            ]
+            errors = [
+                EnvSyntaxError(msg, line=line, column=column, source=str(env_file))
+                for msg, line, column in cached["errors"]
+            ]
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.debug(f"Ignoring invalid cached tokens for {env_file}: {exc}")
+            return None
+        return tokens, errors
+
+    def set(
+        self,
+        env_file: Path,
+        key: str,
+        tokens: t.Sequence[EnvToken],
+        errors: t.Sequence[EnvSyntaxError] = (),
+    ) -> bool:
+        """Cache the tokens for an environment file.
+
+        Returns
+        -------
+        cached
+            True if the tokens were cached, False otherwise
+        """
+        # marshal only stores built-in types, so named tuples are stored as tuples
+        try:
+            cached = {
+                "key": key,
+                "tokens": [
+                    (
+                        token.name,
+                        token.value,
+                        token.quote,
+                        tuple(map(tuple, token.refs)),
+                        token.line,
+                    )
+                    for token in tokens
+                ],
+                "errors": [(exc.msg, exc.line, exc.column) for exc in errors],
+            }
+            data = marshal.dumps(cached)
+        except Exception as exc:
+            logger.debug(f"Could not cache the tokens for {env_file}: {exc}")
+            return False
+
+        # Write to a temporary file first so that readers never see a partial file
+        filepath = self.filepath(env_file)
+        tmp = filepath.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, filepath)
+        except OSError as exc:
+            logger.debug(f"Could not cache the tokens for {env_file}: {exc}")
+            return False
+        return True
+
+    def tokenize(
+        self, env_file: Path
+    ) -> t.Tuple[t.List[EnvToken], t.List[EnvSyntaxError]]:
+        """Tokenize an environment file, or get its cached tokens if the file
+        hasn't changed.
+
+        Returns
+        -------
+        tokens, errors
+            The tokens and the syntax errors of the environment file. The
+            lines with syntax errors are skipped.
+        """
+        key = self.key(env_file)
+        cached = self.get(env_file, key)
+        if cached is not None:
+            return cached
+
+        errors = []
+        tokens = tokenize_env_file(env_file, errors=errors)
+
+        # Only cache the tokens if the file didn't change while it was tokenized
+        if self.key(env_file) == key:
+            self.set(env_file, key, tokens, errors)
+        return tokens, errors
+
+    def clear(self) -> int:
+        """Remove the cached tokens.
+
+        Returns
+        -------
+        count
+            The number of cached environment files removed
+        """
+        count = 0
+        for filepath in self.path.glob("*.marshal"):
+            try:
+                filepath.unlink()
+                count += 1
+            except OSError:
+                pass
+        return count
@@ -2,11 +2,26 @@
 import typing as t
 import os
 import re
-import codecs
 import logging
 from pathlib import Path
 
-__all__ = ("sub_env", "parse_env", "load_env")
+from .snapshot import EnvSnapshot, current_env
+
+__all__ = (
+    "EnvSyntaxError",
+    "EnvRef",
+    "EnvToken",
+    "EnvTemplate",
+    "tokenize_env",
+    "tokenize_env_file",
+    "scan_refs",
+    "sub_env",
+    "parse_env",
+    "stream_env",
+    "layer_env",
+    "load_snapshot",
+    "load_env",
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,35 +44,543 @@ sub_alt_re = re.compile(
 )
 
 #: Regex to match environment variable names
-env_name = r"(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)"  # env variable name
-env_name_re = re.compile(env_name)
-
-#: Regex to match environment variable values with substitution
-env_value = (
-    # Quoted value--e.g. "My $VAR" or 'My $VAR'--allowing for escaped quotes
-    r"""((?P<quote>["|']{1,3})(?P<qvalue>(?:\\.|[^"'\\])+)(?P=quote)[^'"\n]*|"""
-    # Unquoted value--e.g. My $VAR
-    r"""(?P<value>[^'"\n]+))"""
-)
-env_value_re = re.compile(
-    env_value,
-    re.MULTILINE | re.DOTALL,
-)
+env_name_re = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
 
-#: Regex to match "name=value" pairs from an env file
-env_name_value_re = re.compile(
-    r"^\s*{env_name}\s*=\s*{env_value}\s*$".format(
-        env_name=env_name, env_value=env_value
-    ),
-    re.MULTILINE | re.DOTALL,
-)
+#: Regex to match escape sequences in double-quoted values--e.g. \t or \x41
+escape_re = re.compile(r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|.)", re.DOTALL)
+
+#: The characters for escape sequences in double-quoted values
+escape_chars = {
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "0": "\0",
+    "\\": "\\",
+    '"': '"',
+    "'": "'",
+}
+
+
+class EnvSyntaxError(ValueError):
+    """A syntax error in a string or file in env format"""
+
+    #: The description of the error
+    msg: str
+
+    #: The line and column numbers of the error, starting from 1
+    line: int
+    column: int
+
+    #: The name of the string or file with the error
+    source: str
+
+    def __init__(self, msg: str, line: int, column: int, source: str = "<string>"):
+        super().__init__(msg)
+        self.msg = msg
+        self.line = line
+        self.column = column
+        self.source = source
+
+    def __str__(self):
+        return f"{self.source}:{self.line}:{self.column}: {self.msg}"
+
+
+class EnvRef(t.NamedTuple):
+    """A reference to an environment variable in a value--e.g. ${NAME:-default}"""
+
+    #: The position of the reference's '$' in the value
+    start: int
+
+    #: The position after the end of the reference in the value
+    end: int
+
+    #: The name of the referenced environment variable
+    name: str
+
+    #: The directive for the alternative value: '-' (default), '?' (error),
+    #: '+' (replace) or an empty string. The ':-', ':?' and ':+' directives
+    #: are the same as '-', '?' and '+'
+    directive: str
 
-#: Regex to strip comments to the end of a line--# and not escaped values, \#
-comment_re = re.compile(r"(^|\s+)(#.+)$")
+    #: The alternative value for the directive
+    alt: str
 
-#: Regex to strip backslashes from escaped quotes.
-#: e.g. r"Let\'s go" -> r"Let's go"
-escaped_quote_re = re.compile(r"\\(['\"])")
+
+class EnvToken(t.NamedTuple):
+    """A name-value pair tokenized from a string in env format"""
+
+    #: The environment variable name
+    name: str
+
+    #: The value without quotes, comments and escape sequences--i.e. before
+    #: substitution
+    value: str
+
+    #: The quotes of the value: '"', "'", '"""', "'''" or an empty string for
+    #: unquoted values
+    quote: str
+
+    #: The references to substitute in the value
+    refs: t.Tuple[EnvRef, ...]
+
+    #: The line number for the name
+    line: int
+
+    def substitute(
+        self,
+        missing_default: str = "",
+        strip_values: bool = True,
+        variables: t.Optional[t.Mapping[str, str]] = None,
+        environ: t.Optional[t.Mapping[str, str]] = None,
+    ) -> str:
+        """The value with environment variables substituted.
+
+        See :func:`sub_env` and :func:`substitute` for details on the
+        parameters.
+        """
+        value = substitute(self.value, self.refs, missing_default, variables, environ)
+        return value.strip() if strip_values and not self.quote else value
+
+
+def scan_refs(value: str) -> t.Tuple[EnvRef, ...]:
+    """Find the references to environment variables in a value.
+
+    Examples
+    --------
+    >>> scan_refs("My ${NAME:-default} at $HOME/bin")
+    (EnvRef(start=3, end=19, name='NAME', directive='-', alt='default'), \
+EnvRef(start=23, end=28, name='HOME', directive='', alt=''))
+    """
+    refs = []
+    pos = value.find("$")
+    while pos != -1:
+        m = sub_re.match(value, pos)
+        if m is None:
+            pos = value.find("$", pos + 1)
+            continue
+
+        # Parse the variable name, which may include alternates identified by
+        # :-/-/:?/?/:+/+
+        body = m.group("name_brace") or m.group("name_nobrace")
+        alt_m = sub_alt_re.match(body)
+        directive = alt_m["default"] or alt_m["error"] or alt_m["replace"] or ""
+        directive = directive[-1:]
+        alt = alt_m.group("alt") if directive else ""
+        refs.append(EnvRef(m.start(), m.end(), alt_m.group("name"), directive, alt))
+
+        pos = value.find("$", m.end())
+    return tuple(refs)
+
+
+def resolve_ref(
+    ref: EnvRef,
+    missing_default: str = "",
+    variables: t.Optional[t.Mapping[str, str]] = None,
+    environ: t.Optional[t.Mapping[str, str]] = None,
+) -> str:
+    """Resolve the value for a reference to an environment variable.
+
+    See :func:`sub_env` and :func:`substitute` for details on the parameters.
+    """
+    name, directive = ref.name, ref.directive
+    environ = environ if environ is not None else current_env()
+
+    if name in environ:
+        # found match in environment variables ('replace' will
+        # replace the returned value)
+        return environ[name] if directive != "+" else ref.alt
+    elif variables and name in variables and directive != "+":
+        # found match in the passed variables
+        return variables[name]
+    elif directive == "-":  # Not found, use the default
+        return ref.alt
+    elif directive == "?":  # Not found, raise exception
+        raise EnvironmentError(ref.alt)
+    else:
+        return missing_default
+
+
+def substitute(
+    value: str,
+    refs: t.Sequence[EnvRef],
+    missing_default: str = "",
+    variables: t.Optional[t.Mapping[str, str]] = None,
+    environ: t.Optional[t.Mapping[str, str]] = None,
+) -> str:
+    """Substitute the references to environment variables in a value.
+
+    See :func:`sub_env` for details on the other parameters.
+
+    Parameters
+    ----------
+    environ
+        The environment variables to substitute. Defaults to the current
+        environment (see :func:`current_env
+        <geomancy.environment.current_env>`)
+    """
+    if not refs:
+        return value
+
+    environ = environ if environ is not None else current_env()
+    parts = []
+    pos = 0
+    for ref in refs:
+        parts.append(value[pos : ref.start])
+        parts.append(resolve_ref(ref, missing_default, variables, environ))
+        pos = ref.end
+    parts.append(value[pos:])
+    return "".join(parts)
+
+
+class EnvTemplate:
+    """A string compiled for environment variable substitution.
+
+    The string is parsed once like an environment variable value (see
+    :func:`sub_env`) into literal segments and the references between them.
+    Resolved values are memoized by the version of the environment's
+    :class:`EnvSnapshot <geomancy.environment.EnvSnapshot>`, or by the values of
+    the referenced environment variables for os.environ, so resolving a template
+    again is a lookup.
+
+    Examples
+    --------
+    >>> template = EnvTemplate("${MISSING:-default}/bin")
+    >>> template.segments, template.refs
+    (('', '/bin'), (EnvRef(start=0, end=19, name='MISSING', directive='-', \
+alt='default'),))
+    >>> template.resolve()
+    'default/bin'
+    """
+
+    __slots__ = ("string", "quote", "segments", "refs", "_memo")
+
+    #: The compiled string
+    string: str
+
+    #: The quotes of the string. See :attr:`EnvToken.quote`
+    quote: str
+
+    #: The literal segments before, between and after the references
+    segments: t.Tuple[str, ...]
+
+    #: The references to environment variables
+    refs: t.Tuple[EnvRef, ...]
+
+    #: The version of the environment, or the values of the referenced
+    #: environment variables, and the resolved value
+    _memo: t.Optional[t.Tuple[tuple, str]]
+
+    def __init__(self, string: str):
+        self.string = string
+        self._memo = None
+
+        # Parse the string like an environment variable value, which may contain
+        # single quotes, double quotes or may be unquoted. Strings with unclosed
+        # quotes are used unchanged.
+        scanned = _scan_value(string)
+        value, quote = scanned if scanned is not None else (string, "'")
+        self.quote = quote
+        self.refs = scan_refs(value) if quote[:1] != "'" and "$" in value else ()
+
+        # Split the value into the literal segments around the references
+        starts = [ref.start for ref in self.refs] + [len(value)]
+        ends = [0] + [ref.end for ref in self.refs]
+        self.segments = tuple(value[end:start] for end, start in zip(ends, starts))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.string!r})"
+
+    def __getstate__(self):
+        # Resolved values aren't pickled
+        return self.string
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def substitute(
+        self,
+        missing_default: str = "",
+        strip_values: bool = True,
+        variables: t.Optional[t.Mapping[str, str]] = None,
+        environ: t.Optional[t.Mapping[str, str]] = None,
+    ) -> str:
+        """Substitute environment variables in the template.
+
+        See :func:`sub_env` and :func:`substitute` for details on the
+        parameters.
+        """
+        segments = self.segments
+        if self.refs:
+            environ = environ if environ is not None else current_env()
+            parts = [segments[0]]
+            for ref, segment in zip(self.refs, segments[1:]):
+                parts.append(resolve_ref(ref, missing_default, variables, environ))
+                parts.append(segment)
+            value = "".join(parts)
+        else:
+            value = segments[0]
+        return value.strip() if strip_values and not self.quote else value
+
+    def resolve(self, environ: t.Optional[t.Mapping[str, str]] = None) -> str:
+        """Substitute environment variables in the template with the default
+        :meth:`substitute` parameters, and memoize the result.
+
+        Parameters
+        ----------
+        environ
+            The environment variables to substitute. Defaults to the current
+            environment (see :func:`current_env
+            <geomancy.environment.current_env>`)
+        """
+        environ = environ if environ is not None else current_env()
+        if isinstance(environ, EnvSnapshot):
+            key = environ.version
+        else:
+            key = tuple(environ.get(ref.name) for ref in self.refs)
+
+        memo = self._memo
+        if memo is None or memo[0] != key:
+            memo = self._memo = (key, self.substitute(environ=environ))
+        return memo[1]
+
+
+def _unescape(m: re.Match) -> str:
+    """Replace an escape sequence match from :data:`escape_re`"""
+    seq = m.group(1)
+    if len(seq) > 1:  # \xhh or \uhhhh
+        return chr(int(seq[1:], 16))
+    return escape_chars.get(seq, m.group(0))
+
+
+def _find_quote(text: str, quote: str, pos: int) -> int:
+    """Find the position of the closing quote that isn't escaped, or -1."""
+    start = pos
+    while True:
+        end = text.find(quote, pos)
+        if end == -1:
+            return -1
+
+        # Count the backslashes before the quote. Quotes after an odd number
+        # of backslashes are escaped
+        i = end
+        while i > start and text[i - 1] == "\\":
+            i -= 1
+        if (end - i) % 2 == 0:
+            return end
+        pos = end + 1
+
+
+def _unquote(value: str, quote: str) -> str:
+    """Process the escape sequences of a quoted value"""
+    if "\\" not in value:
+        return value
+    elif quote[:1] == '"':
+        # process escape characters, e.g. \\t -> \t
+        return escape_re.sub(_unescape, value)
+    else:
+        # Single-quoted values only have escaped quotes
+        return value.replace("\\'", "'").replace('\\"', '"')
+
+
+def _strip_comment(value: str) -> str:
+    """Remove the comment from an unquoted value. Comments start with a '#' at
+    the start of the value or after whitespace"""
+    i = value.find("#")
+    while i != -1:
+        if i == 0 or value[i - 1] in " \t":
+            return value[:i]
+        i = value.find("#", i + 1)
+    return value
+
+
+def _scan_value(string: str) -> t.Optional[t.Tuple[str, str]]:
+    """Scan a string as an environment variable value.
+
+    Returns
+    -------
+    value, quote
+        The value without quotes, comments and escape sequences and the quote
+        of the value, or None if the value's quote wasn't closed. Quoted values
+        may span multiple lines, and unquoted values end at the first line.
+    """
+    first = string[:1]
+    if first == '"' or first == "'":
+        quote = first * 3 if string.startswith(first * 3) else first
+        end = _find_quote(string, quote, len(quote))
+        if end == -1:
+            return None
+        return _unquote(string[len(quote) : end], quote), quote
+
+    eol = string.find("\n")
+    return _strip_comment(string if eol == -1 else string[:eol]), ""
+
+
+def _iter_lines(string: str) -> t.Iterator[str]:
+    """Iterate the lines of a string, without copying the string"""
+    pos, size = 0, len(string)
+    while pos < size:
+        eol = string.find("\n", pos)
+        eol = size if eol == -1 else eol
+        yield string[pos:eol]
+        pos = eol + 1
+
+
+def _syntax_error(
+    msg: str,
+    line: int,
+    column: int,
+    source: str,
+    strict: bool,
+    errors: t.Optional[t.List[EnvSyntaxError]],
+):
+    """Raise a syntax error, if strict, or add it to the errors list or log it
+    as a warning"""
+    exc = EnvSyntaxError(msg, line=line, column=column, source=source)
+    if strict:
+        raise exc
+    elif errors is not None:
+        errors.append(exc)
+    else:
+        logger.warning(str(exc))
+
+
+def tokenize_env(
+    lines: t.Union[str, t.Iterable[str]],
+    source: str = "<string>",
+    strict: bool = False,
+    errors: t.Optional[t.List[EnvSyntaxError]] = None,
+) -> t.Iterator[EnvToken]:
+    """Tokenize the name-value pairs of a string or lines in env format.
+
+    The lines are read and tokenized one at a time, so the lines of a file
+    can be streamed. Only the lines of quoted values that span multiple lines
+    are held.
+
+    Parameters
+    ----------
+    lines
+        The string, or the lines (e.g. an open file), in env format to tokenize
+    source
+        The name of the string or file for syntax errors
+    strict
+        If True, raise an exception for syntax errors. If False (default), log
+        syntax errors as warnings and skip the lines with syntax errors.
+    errors
+        If specified and not strict, syntax errors are added to this list
+        instead of being logged.
+
+    Yields
+    ------
+    token
+        The name, value, quote, references and line number of each name-value
+        pair
+
+    Raises
+    ------
+    EnvSyntaxError
+        If strict and a line isn't a comment, a blank line or a 'name=value'
+        pair, or a quote isn't closed
+
+    Examples
+    --------
+    >>> for token in tokenize_env('# comment\\nA=1 # comment\\nB="$A\\\\t2"'):
+    ...     print(token.name, repr(token.value), repr(token.quote), token.line)
+    A '1 ' '' 2
+    B '$A\\t2' '"' 3
+    """
+    numbered = enumerate(_iter_lines(lines) if isinstance(lines, str) else lines, 1)
+
+    # Lines to tokenize again after an unclosed quote, with the next line last
+    pushed = []
+
+    # The lines after which quotes aren't closed
+    unclosed = dict()
+
+    def read() -> t.Optional[t.Tuple[int, str]]:
+        """Read the next line number and line, without the newline"""
+        if pushed:
+            return pushed.pop()
+        item = next(numbered, None)
+        if item is not None and item[1].endswith("\n"):
+            return item[0], item[1][:-1]
+        return item
+
+    while True:
+        item = read()
+        if item is None:
+            break
+        lineno, text = item
+
+        # Parse the name. Comments and blank lines are skipped
+        name, sep, rest = text.partition("=")
+        name = name.strip()
+        if not sep or env_name_re.fullmatch(name) is None:
+            stripped = text.lstrip()
+            if stripped and stripped[0] != "#":
+                msg = (
+                    f"Invalid environment variable name '{name}'"
+                    if sep
+                    else "Expected a 'name=value' pair"
+                )
+                column = len(text) - len(stripped) + 1
+                _syntax_error(msg, lineno, column, source, strict, errors)
+            continue
+
+        # Parse the value
+        value = rest.lstrip()
+        first = value[:1]
+        if first == '"' or first == "'":
+            quote = first * 3 if value.startswith(first * 3) else first
+            end = _find_quote(value, quote, len(quote))
+            if end != -1:
+                parts = [value[len(quote) : end]]
+            else:
+                # The quoted value continues until the line with the closing
+                # quote
+                parts = [value[len(quote) :]]
+                if lineno < unclosed.get(quote, lineno + 1):
+                    while end == -1:
+                        item = read()
+                        if item is None:
+                            unclosed[quote] = lineno
+                            break
+                        end = _find_quote(item[1], quote, 0)
+                        parts.append(item[1] if end == -1 else item[1][:end])
+
+                if end == -1:
+                    column = len(text) - len(value) + 1
+                    msg = f"Unclosed quote ({quote}) for '{name}'"
+                    _syntax_error(msg, lineno, column, source, strict, errors)
+
+                    # Tokenize the lines after this line again
+                    for i in range(len(parts) - 1, 0, -1):
+                        pushed.append((lineno + i, parts[i]))
+                    continue
+
+            value = _unquote("\n".join(parts), quote)
+        else:
+            quote = ""
+            value = _strip_comment(value)
+
+        refs = scan_refs(value) if first != "'" and "$" in value else ()
+        yield EnvToken(name, value, quote, refs, lineno)
+
+
+def tokenize_env_file(
+    filepath: t.Union[str, Path],
+    strict: bool = False,
+    errors: t.Optional[t.List[EnvSyntaxError]] = None,
+) -> t.List[EnvToken]:
+    """Tokenize the name-value pairs of an environment file.
+
+    See :func:`tokenize_env` for details on the parameters.
+    """
+    with open(filepath) as f:
+        return list(tokenize_env(f, source=str(filepath), strict=strict, errors=errors))
 
 
 def sub_env(
@@ -74,7 +597,9 @@ def sub_env(
     strip_values
         Remove whitespace at the start and end of non-quoted values
     kwargs
-        In addition to os.environ, search the given kwargs for matches.
+        In addition to the current environment (os.environ or the snapshot
+        from :func:`use_env <geomancy.environment.use_env>`), search the given
+        kwargs for matches.
 
     Raises
     ------
@@ -100,87 +625,14 @@ def sub_env(
 
     .. _compose: https://docs.docker.com/compose/environment-variables/env-file/
     """
+    return EnvTemplate(string).substitute(missing_default, strip_values, kwargs)
 
-    # Substitute environment variables in values
-    def sub_func(m: re.Match):
-        """Substitute a regex match from the environment variables, if possible,
-        or return unmodified"""
-        # Get the variable name, which may include alternates identified by
-        # :-/-/:?/?/:+/"
-        d = m.groupdict()
-        name = d["name_brace"] if d["name_brace"] is not None else d["name_nobrace"]
-
-        # Parse the alternate values
-        alt_m = sub_alt_re.match(name)
-        alt_d = alt_m.groupdict() if alt_m is not None else None
-
-        name = alt_d["name"] if alt_d and alt_d["name"] else name
-        default = alt_d["alt"] if alt_d and alt_d["default"] else None
-        error = alt_d["alt"] if alt_d and alt_d["error"] else None
-        replace = alt_d["alt"] if alt_d and alt_d["replace"] else None
-
-        if name in os.environ:
-            # found match in environment variables ('replace' will
-            # replace the returned value)
-            return os.environ[name] if replace is None else replace
-
-        elif name in kwargs and not replace:
-            # found match in passed keyword arguments (replace will replace its value)
-            return kwargs[name] if replace is None else replace
-
-        elif default is not None:  # Not found, return default if available
-            return default
-
-        elif error is not None:  # Not found, raise exception
-            raise EnvironmentError(error)
 
-        else:
-            return missing_default
-
-    # Parse the string like an environment variable value, which may contain
-    # single quotes, double quotes or may be unquoted
-    match = env_value_re.match(string)
-    groupdict = match.groupdict() if match is not None else None
-    if groupdict is None:
-        return string
-
-    # Try to parse the value based on the type of quoting
-    if "value" in groupdict and groupdict["value"]:
-        # Strip comments for non-quoted strings
-        value = groupdict["value"]
-        value = comment_re.sub(r"\1", value)  # Remove comments
-
-        # Substitute values for non-quoted values
-        value = sub_re.sub(sub_func, value)
-
-        # Strip whitespace, if specified
-        return value.strip() if strip_values else value
-
-    elif "qvalue" in groupdict and groupdict["qvalue"]:
-        # Retrieve quoted value and quote type
-        value = groupdict["qvalue"]
-        quote = groupdict["quote"]
-
-        # Substitute escaped quotes
-        value = escaped_quote_re.sub(r"\1", value)
-
-        # Double-quote values may be substituted
-        if '"' in quote:  # double quoted
-            # process escape characters, e.g. \\t -> \t
-            value = codecs.decode(value, "unicode_escape")
-
-            # substitute values for double quoted values
-            return sub_re.sub(sub_func, value)
-
-        # Single-quoted values are used literally--i.e. without substitution
-        elif "'" in quote:
-            return value
-
-    else:
-        raise NotImplementedError
-
-
-def parse_env(string: str, strip_values: bool = True) -> dict:
+def parse_env(
+    string: str,
+    strip_values: bool = True,
+    environ: t.Optional[t.Mapping[str, str]] = None,
+) -> dict:
     """Parse a string in env format into a dict.
 
     See :func:`sub_env` for details on substitution.
@@ -191,6 +643,9 @@ def parse_env(string: str, strip_values: bool = True) -> dict:
         The string in env format to parse
     strip_values
         Remove whitespace at the start and end of non-quoted values
+    environ
+        The environment variables to substitute. Defaults to the current
+        environment (see :func:`current_env <geomancy.environment.current_env>`)
 
     Returns
     -------
@@ -198,29 +653,145 @@ def parse_env(string: str, strip_values: bool = True) -> dict:
         The parsed environment variables from the string. The variable names
         are dict keys and the variable values are dict values.
     """
+    return dict(_substitute_tokens(tokenize_env(string), strip_values, environ))
+
+
+def stream_env(
+    filepath: t.Union[str, Path],
+    strip_values: bool = True,
+    environ: t.Optional[t.Mapping[str, str]] = None,
+    strict: bool = False,
+) -> t.Iterator[t.Tuple[str, str]]:
+    """Stream the environment variables of an environment file.
 
-    # Convert string into a dict
+    The file is read in buffered chunks and tokenized one line at a time, so
+    the memory used is bounded by the longest value rather than the size of
+    the file.
+
+    Parameters
+    ----------
+    filepath
+        The path to the environment file
+    strip_values
+        Remove whitespace at the start and end of non-quoted values
+    environ
+        The environment variables to substitute. Defaults to the current
+        environment (see :func:`current_env <geomancy.environment.current_env>`)
+    strict
+        If True, raise an exception for syntax errors. If False (default), log
+        syntax errors as warnings and skip the lines with syntax errors.
+
+    Yields
+    ------
+    name, value
+        The name and substituted value of each environment variable, in the
+        order of the file
+
+    Raises
+    ------
+    EnvSyntaxError
+        If strict and the file has a syntax error. See :func:`tokenize_env`
+    """
+    with open(filepath) as f:
+        tokens = tokenize_env(f, source=str(filepath), strict=strict)
+        yield from _substitute_tokens(tokens, strip_values, environ)
+
+
+def _substitute_tokens(
+    tokens: t.Iterable[EnvToken],
+    strip_values: bool = True,
+    environ: t.Optional[t.Mapping[str, str]] = None,
+) -> t.Iterator[t.Tuple[str, str]]:
+    """Substitute the values of tokens with the environment variables and the
+    variables of the preceding tokens."""
+    environ = environ if environ is not None else current_env()
     env_vars = dict()
-    for match in env_name_value_re.finditer(string):
-        name = match.group(1)  # name (group 1)
+    for token in tokens:
+        value = token.substitute(
+            strip_values=strip_values, variables=env_vars, environ=environ
+        )
+        env_vars[token.name] = value
+        yield token.name, value
+
+
+def layer_env(
+    env: EnvSnapshot,
+    tokens: t.Iterable[EnvToken],
+    overwrite: bool = False,
+    strip_values: bool = True,
+) -> EnvSnapshot:
+    """Layer the tokens of an environment file over a snapshot.
+
+    Parameters
+    ----------
+    env
+        The snapshot to layer the tokens over. The tokens are substituted with
+        this snapshot's variables.
+    tokens
+        The tokens of the environment file. See :func:`tokenize_env`
+    overwrite
+        If True, overwrite environment variables that already exist in the
+        snapshot. If False (default), only add environment variables that don't
+        already exist
+    strip_values
+        Remove whitespace at the start and end of non-quoted values
 
-        # env_value match. Keep full group, including quotes so that sub_env can parse
-        # the value
-        rest = match.group(2)
+    Returns
+    -------
+    snapshot
+        The new snapshot with the environment variables of the tokens
+    """
+    env_vars = dict(_substitute_tokens(tokens, strip_values, env))
+    return env.update(env_vars, overwrite=overwrite)
 
-        # Substitute environment variables in the value
-        value = sub_env(rest, strip_values=strip_values, **env_vars)
 
-        # Add the new name-value pair in the env_vars
-        env_vars[name] = value
+def load_snapshot(
+    filepath: t.Union[str, Path],
+    overwrite: bool = False,
+    env: t.Optional[EnvSnapshot] = None,
+    **kwargs,
+) -> EnvSnapshot:
+    """Load an environment file into a new snapshot of environment variables,
+    without changing the environment variables of the process (os.environ).
 
-    return env_vars
+    Parameters
+    ----------
+    filepath
+        The path to the file with environment settings to load
+    overwrite
+        If True, overwrite environment variables that already exist in the
+        snapshot. If False (default), only load environment variables that don't
+        already exist
+    env
+        The snapshot to load the environment file into. The environment file's
+        values are substituted with this snapshot's variables. Defaults to a
+        snapshot of the current environment.
+    kwargs
+        Keyword arguments passed to :func:`layer_env`
+
+    Returns
+    -------
+    snapshot
+        The new snapshot with the loaded environment variables
+    """
+    if env is None:
+        environ = current_env()
+        env = environ if isinstance(environ, EnvSnapshot) else EnvSnapshot(environ)
+    with open(filepath) as f:
+        tokens = tokenize_env(f, source=str(filepath))
+        snapshot = layer_env(env, tokens, overwrite=overwrite, **kwargs)
+    logger.debug(f"Loaded '{filepath}' into {snapshot}")
+    return snapshot
 
 
 def load_env(
     filepath: t.Union[str, Path], overwrite: bool = False, *args, **kwargs
 ) -> dict:
-    """Load an environment file.
+    """Load an environment file into the environment variables of the process
+    (os.environ).
+
+    See :func:`load_snapshot` to load environment files without changing
+    os.environ.
 
     Parameters
     ----------
@@ -231,24 +802,20 @@ def load_env(
         If False (default), only load environment variables that don't already
         exist
     args, kwargs
-        Arguments and keyword arguments passed to :func:`parse_env_str`
+        Arguments and keyword arguments passed to :func:`stream_env`
 
     Returns
     -------
     env
         A dict with all of the loaded env variable name-value pairs in a dict
     """
-    # Try loading the file
-    filepath = Path(filepath)
+    # Parse the environment file
     try:
-        string = filepath.read_text()
+        env_vars = dict(stream_env(filepath, *args, **kwargs))
     except FileNotFoundError:
         logger.error(f"Could not file the file '{filepath}'")
         return 0
 
-    # Parse the environment
-    env_vars = parse_env(string=string, *args, **kwargs)
-
     # Load the environment variables
     updated_env_vars = dict()
     for name, value in env_vars.items():
@@ -0,0 +1,152 @@
+"""Immutable, versioned snapshots of environment variables"""
+import typing as t
+import os
+import itertools
+import threading
+from contextlib import contextmanager
+
+__all__ = ("EnvSnapshot", "current_env", "set_env", "use_env")
+
+#: The snapshot used to substitute environment variables, or None to use the
+#: environment variables of the process (os.environ)
+_current: t.Optional["EnvSnapshot"] = None
+
+#: Lock for changing the current snapshot
+_lock = threading.Lock()
+
+
+class EnvSnapshot(t.Mapping[str, str]):
+    """An immutable, versioned snapshot of environment variables.
+
+    Snapshots aren't changed once they're created. Loading environment files
+    creates a new snapshot with a new version, so the values substituted
+    from a snapshot can be reused for as long as its version is used.
+
+    Examples
+    --------
+    >>> env = EnvSnapshot({"NAME": "value"})
+    >>> env["NAME"]
+    'value'
+    >>> new_env = env.update({"NAME": "new", "OTHER": "other"})
+    >>> new_env["NAME"], new_env["OTHER"], new_env.version > env.version
+    ('value', 'other', True)
+    """
+
+    __slots__ = ("_variables", "version")
+
+    #: The environment variable names and values
+    _variables: t.Dict[str, str]
+
+    #: The version of the snapshot. Newer snapshots have higher versions
+    version: int
+
+    #: Counter for the versions of snapshots
+    _versions = itertools.count(1)
+
+    def __init__(self, variables: t.Optional[t.Mapping[str, str]] = None):
+        """
+        Parameters
+        ----------
+        variables
+            The environment variables for the snapshot. Defaults to the
+            environment variables of the process (os.environ)
+        """
+        self._variables = dict(os.environ if variables is None else variables)
+        self.version = next(self._versions)
+
+    def __repr__(self):
+        # Environment variables may have secrets, so only the number is shown
+        return (
+            f"{self.__class__.__name__}(version={self.version}, "
+            f"variables={len(self._variables)})"
+        )
+
+    def __reduce__(self):
+        return self.__class__, (self._variables,)
+
+    def __getitem__(self, name: str) -> str:
+        return self._variables[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._variables
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._variables)
+
+    def __len__(self) -> int:
+        return len(self._variables)
+
+    def get(self, name: str, default: t.Any = None) -> t.Any:
+        return self._variables.get(name, default)
+
+    def update(
+        self, variables: t.Mapping[str, str], overwrite: bool = False
+    ) -> "EnvSnapshot":
+        """A new snapshot with the given environment variables.
+
+        Parameters
+        ----------
+        variables
+            The environment variable names and values to add
+        overwrite
+            If True, replace the values of environment variables that already
+            exist. If False (default), only add environment variables that don't
+            already exist.
+
+        Returns
+        -------
+        snapshot
+            The new snapshot, or this snapshot if no variables were changed
+        """
+        current = self._variables
+        changed = {
+            name: value
+            for name, value in variables.items()
+            if name not in current or (overwrite and current[name] != value)
+        }
+        if not changed:
+            return self
+        return self.__class__({**current, **changed})
+
+
+def current_env() -> t.Mapping[str, str]:
+    """The environment variables used to substitute values: the snapshot set
+    with :func:`set_env` or :func:`use_env`, or os.environ if a snapshot isn't
+    set."""
+    return _current if _current is not None else os.environ
+
+
+def set_env(snapshot: t.Optional[EnvSnapshot]) -> t.Optional[EnvSnapshot]:
+    """Set the snapshot used to substitute values.
+
+    Parameters
+    ----------
+    snapshot
+        The snapshot to use for all threads, or None to use os.environ
+
+    Returns
+    -------
+    previous
+        The snapshot that was replaced
+    """
+    global _current
+    with _lock:
+        previous, _current = _current, snapshot
+    return previous
+
+
+@contextmanager
+def use_env(snapshot: t.Optional[EnvSnapshot]) -> t.Iterator[t.Optional[EnvSnapshot]]:
+    """Use a snapshot to substitute values within a context.
+
+    Examples
+    --------
+    >>> with use_env(EnvSnapshot({"NAME": "value"})):
+    ...     current_env()["NAME"]
+    'value'
+    """
+    previous = set_env(snapshot)
+    try:
+        yield snapshot
+    finally:
+        set_env(previous)
@@ -2,6 +2,7 @@
 import pytest
 
 from geomancy.checks.aws.base import CheckAws, CheckException
+from geomancy.environment import EnvSnapshot, use_env
 
 
 @pytest.mark.block_network
@@ -47,3 +48,39 @@ def test_check_aws_username():
     """Test the CheckAws.username() method with valid credentials"""
     check = CheckAws(name="CheckAws")
     assert check.username() == "mytestuser"
+
+
+@pytest.mark.block_network
+def test_check_aws_session_snapshot(tmp_path):
+    """Test that AWS sessions use the AWS environment variables of a snapshot
+    loaded from an environment file"""
+    credentials_file = tmp_path / "credentials"
+    credentials_file.write_text(
+        "[envprofile]\naws_access_key_id = PROFILEKEY\n"
+        "aws_secret_access_key = PROFILESECRET\n"
+    )
+    env = EnvSnapshot().update(
+        {
+            "AWS_SHARED_CREDENTIALS_FILE": str(credentials_file),
+            "AWS_PROFILE": "envprofile",
+            "AWS_DEFAULT_REGION": "eu-west-2",
+            "AWS_ACCESS_KEY_ID": "SNAPSHOTKEY",
+            "AWS_SECRET_ACCESS_KEY": "SNAPSHOTSECRET",
+        },
+        overwrite=True,
+    )
+    check = CheckAws(name="CheckAws")
+
+    with use_env(env):
+        # Credentials from environment variables are used before profiles
+        session = check.session()
+        assert session.profile_name == "envprofile"
+        assert session.region_name == "eu-west-2"
+        assert session.get_credentials().access_key == "SNAPSHOTKEY"
+
+        # Unless the profile is specified
+        session = check.session("envprofile")
+        assert session.get_credentials().access_key == "PROFILEKEY"
+
+        with pytest.raises(CheckException, match="profile not found"):
+            check.client("s3", profile="missing")
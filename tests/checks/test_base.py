@@ -2,11 +2,22 @@
 Test the environment variable check class
 """
 import typing as t
-from concurrent.futures import ThreadPoolExecutor
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import pytest
 
-from geomancy.checks.base import Check, Result, CheckException, Executor
+from geomancy.checks import CheckEnv, CheckExec, CheckPath
+from geomancy.checks.base import (
+    Check,
+    CheckBatch,
+    Result,
+    CheckException,
+    Executor,
+    Scheduler,
+)
 
 
 class CheckDummy(Check):
@@ -146,6 +157,16 @@ def test_check_env_substitution():
         #   4.6. Use string literal for missing variable
         assert Check(name="sub_env", value="'$MISSING'").value == "$MISSING"
 
+        # 5. Values are substituted again when the environment variables change
+        check = Check(name="sub_env", value="$VARIABLE/$MISSING")
+        assert check.value == "my value/"
+        mp.setenv("MISSING", "found")
+        assert check.value == "my value/found"
+
+        # 6. Setting the value replaces the compiled template
+        check.value = "${MISSING}"
+        assert check.value == "found"
+
 
 # noinspection GrazieInspection
 def test_check_flatten_count():
@@ -181,6 +202,32 @@ def test_check_types():
     assert all(issubclass(v, Check) or v == Check for v in types.values())
 
 
+def test_check_types_registry():
+    """Test that the Check.types() registry is updated with new subclasses"""
+
+    def create():
+        class CheckRegistered(Check):
+            aliases = ("checkRegistered",)
+
+        return CheckRegistered
+
+    cls = create()
+    types = Check.types()
+    assert types["CheckRegistered"] is cls
+    assert types["checkRegistered"] is cls
+
+    # Defining the class again replaces the previous class
+    new_cls = create()
+    assert types["CheckRegistered"] is new_cls
+    assert types["checkRegistered"] is new_cls
+
+    # Aliases can't match other classes
+    with pytest.raises(AssertionError):
+
+        class CheckOther(Check):
+            aliases = ("checkRegistered",)
+
+
 # noinspection GrazieInspection
 def test_check_load_simple():
     """Test the Check.load method from a simple dict"""
@@ -237,8 +284,164 @@ def test_check_load_nested():
     # Validate children entries
     assert flattened[0].children == [flattened[1]]
     assert flattened[1].children == [flattened[2], flattened[3]]
-    assert flattened[2].children == []
-    assert flattened[3].children == []
+    assert flattened[2].children == ()
+    assert flattened[3].children == ()
+
+
+def test_check_walk():
+    """Test walking check trees with depths and paths"""
+    d = {
+        "Environment": {
+            "Path": {"checkDummy": "VAR1"},
+            "Term": {"checkDummy": "VAR2"},
+        },
+        "User": {"checkDummy": "VAR3"},
+    }
+    check = Check.load(d=d, name="Root")
+
+    walk = [(c.name, depth, path) for c, depth, path in check.walk()]
+    assert walk == [
+        ("Root", 0, ("Root",)),
+        ("Environment", 1, ("Root", "Environment")),
+        ("Path", 2, ("Root", "Environment", "Path")),
+        ("Term", 2, ("Root", "Environment", "Term")),
+        ("User", 1, ("Root", "User")),
+    ]
+    assert [c for c, _, _ in check.walk()] == check.flatten
+    assert [c.name for c, _, _ in check.iter_leaves()] == ["Path", "Term", "User"]
+
+    # Deep trees don't reach the recursion limit
+    deep = Check(name="Leaf")
+    for i in range(5_000):
+        deep = Check(name=f"Group{i}", children=[deep])
+    assert len(deep.flatten) == 5_001
+    assert deep.count == 5_001
+    assert next(deep.iter_leaves())[1] == 5_000
+
+
+def test_check_count():
+    """Test that the cached counts of checks are updated when children change"""
+    leaf = CheckDummy(name="Leaf", value="a")
+    group = Check(name="Group", children=[leaf])
+    root = Check(name="Root", children=[group])
+    assert root.count == 3
+    assert root.count == 3  # cached
+
+    group.children.append(CheckDummy(name="Other", value="b"))
+    assert root.count == 4
+
+    del group.children[0]
+    assert root.count == 3
+
+    group.children = []
+    assert group.children == ()
+    assert root.count == 2
+
+    # Nested changes invalidate the counts of the ancestors only
+    other = Check(name="Other", children=[CheckDummy(name="Leaf", value="c")])
+    root.children.append(other)
+    assert (root.count, other.count) == (4, 2)
+    leaf.children = [CheckDummy(name="Nested", value="d")]
+    group.children = [leaf, CheckDummy(name="Last", value="e")]
+    assert other._count == 2
+    assert (root.count, group.count) == (7, 4)
+
+    # Every method that changes the children is tracked
+    group.children.sort(key=lambda c: c.name, reverse=True)
+    assert group._count is None and root._count is None
+    assert [c.name for c in group.children] == ["Leaf", "Last"]
+    group.children.reverse()
+    assert group._count is None and root.count == 7
+    group.children[:1] = []
+    assert root.count == 6
+    assert group.children.pop() is leaf and leaf._parents == ()
+    assert root.count == 4
+
+    # Pickled checks don't include the check groups they're in
+    assert pickle.loads(pickle.dumps(other.children[0]))._parents == ()
+    copied = pickle.loads(pickle.dumps(root))
+    copied.children[1].children.append(CheckDummy(name="New", value="f"))
+    assert (copied.count, root.count) == (5, 4)
+
+
+def test_check_slots():
+    """Test that checks store their attributes in slots"""
+    for cls in (Check, CheckEnv, CheckExec, CheckPath):
+        check = cls(name="Check", value="a")
+        assert not hasattr(check, "__dict__")
+        with pytest.raises(AttributeError):
+            check.other = 1
+
+    # Checks without children share an empty tuple
+    a, b = CheckPath(name="A", value="a"), CheckEnv(name="B", value="b")
+    assert a.children == () and a.children is b.children
+    assert Check(name="Group", children=[a, b]).children == [a, b]
+
+
+def test_check_load_batch():
+    """Test the Check.load method with lists of values and a matrix"""
+    d = {
+        "Vars": {"checkDummy": ["VAR1", "VAR2"], "desc": "Variables"},
+        "Matrix": {
+            "CheckDummy": ["{name}{i}", "{name}"],
+            "matrix": {"name": ["A", "B"], "i": [1, 2]},
+            "timeout": 5,
+        },
+    }
+    check = Check.load(d=d, name="base check")
+    batches = check.children
+    assert [c.__class__ for c in batches] == [CheckBatch, CheckBatch]
+    assert all(c.template.__class__ == CheckDummy for c in batches)
+    assert check.count == 3
+
+    assert batches[0].values == ["VAR1", "VAR2"]
+    assert batches[0].desc == "Variables"
+    assert batches[1].values == ["A1", "A2", "B1", "B2", "A", "A", "B", "B"]
+    assert batches[1].timeout == 5.0
+
+    # Matrix placeholders must be matrix variables
+    with pytest.raises(CheckException):
+        Check.load(d={"checkDummy": "{other}", "matrix": {"name": ["A"]}}, name="M")
+
+
+def test_check_batch():
+    """Test the results of batched checks"""
+    template = DefaultCheck(name="Template")
+    check = CheckBatch("Batch", ["a", "b"], template=template)
+    result = check.check()
+    assert result.status == "passed"
+    assert result.msg == "Batch (2 values)"
+
+    template.default_status = "failed (missing)"
+    check = CheckBatch("Batch", list("abcdefg"), template=template)
+    result = check.check()
+    assert result.status == "failed (7 of 7)"
+    assert result.msg == "Batch (7 values): missing 'a', 'b', 'c', 'd', 'e' and 2 more"
+
+    # Batched checks aren't check types
+    assert "CheckBatch" not in Check.types()
+
+
+def test_check_load_include():
+    """Test the Check.load method with included checks"""
+    d = {"Group": {"include": "other.yaml", "Path": {"checkDummy": "VAR1"}}}
+    included = CheckDummy(name="Included", value="VAR2")
+
+    check = Check.load(d=d, name="base check", include=lambda value: [included])
+    assert [c.name for c in check.flatten] == [
+        "base check",
+        "Group",
+        "Included",
+        "Path",
+    ]
+
+    # Checks can only be included with an include hook (from checks files)
+    with pytest.raises(CheckException):
+        Check.load(d=d, name="base check")
+
+    # Checks can't be included in a check with a type
+    with pytest.raises(CheckException):
+        Check.load(d={"checkDummy": "VAR1", "include": "a.yaml"}, name="Path")
 
 
 def test_check_import_modules():
@@ -351,3 +554,344 @@ def test_check_result_finished():
         assert result.done
         assert len(result.finished) == 2
         assert all(isinstance(r, Result) for r in result.finished)
+
+
+def test_result_listeners():
+    """Test that Result listeners are notified when children checks finish."""
+
+    # Create a check with a thread-locking sub-check
+    sub = HangCheck(name="HangCheck")
+    check = Check(name="root", children=[sub])
+
+    # Create an executor to run the checks
+    with ThreadPoolExecutor() as executor:
+        try:
+            result = check.check(executor=executor)
+
+            # Track the results passed to the listener
+            changes = []
+            notified = threading.Event()
+
+            def listener(r: Result):
+                changes.append(r)
+                notified.set()
+
+            result.listeners.append(listener)
+            assert changes == []
+
+            # Releasing the thread lock should notify the listener
+            sub.locked = False
+            assert notified.wait(timeout=5)
+
+            assert changes == [result]
+
+            # The finished future is replaced by its result, which is linked to
+            # its parent
+            child = result.children[0]
+            assert isinstance(child, Result)
+            assert child.parent is result
+        finally:
+            # Release the hanging thread so that the executor can shut down
+            sub.locked = False
+
+
+def test_result_child_exception():
+    """Test that a check raising an exception produces a failed Result."""
+
+    class ErrorCheck(Check):
+        def check(self, executor=None, level=0) -> Result:
+            raise ValueError("bad check")
+
+    check = Check(name="root", children=[ErrorCheck(name="ErrorCheck")])
+
+    with ThreadPoolExecutor() as executor:
+        result = check.check(executor=executor)
+
+        while not result.done:
+            pass
+
+    assert result.status == "failed"
+    assert result.children[0].status == "failed (ValueError)"
+
+
+def test_result_held():
+    """Test adding children to a held result"""
+    result = Result(msg="root", held=True)
+    assert not result.done
+
+    result.add(Result(status="passed", msg="a"))
+    future = Future()
+    result.add(future)
+    assert result.done_count == 1 and result.pending_count == 2  # root, future
+
+    # The result finishes once it's released and its children are finished
+    result.release()
+    assert not result.done
+    future.set_result(Result(status="failed", msg="b"))
+    assert result.done and not result.passed
+    assert [r.msg for r in result.finished] == ["root", "a", "b"]
+    assert (result.done_count, result.failed_count, result.pending_count) == (3, 2, 0)
+
+
+def test_result_counts():
+    """Test the aggregate counts of Result trees as children checks finish."""
+    # Create a check tree with a thread-locking sub-check
+    hang = HangCheck(name="HangCheck")
+    passing = DefaultCheck(name="Passing")
+    failing = DefaultCheck(name="Failing")
+    failing.default_status = "failed"
+    sub = Check(name="sub", children=[passing, failing])
+    check = Check(name="root", children=[hang, sub], condition="any")
+
+    # Events set by the root result's listener as the checks finish
+    sub_done = threading.Event()
+    root_done = threading.Event()
+
+    def listener(r: Result):
+        if r.done_count >= 3:
+            sub_done.set()
+        if r.done:
+            root_done.set()
+
+    # Create an executor to run the checks
+    with ThreadPoolExecutor() as executor:
+        try:
+            result = check.check(executor=executor)
+            result.listeners.append(listener)
+            listener(result)  # in case the checks finished before registering
+
+            # Wait for the 'sub' group to finish, which leaves the root result
+            # and the 'hang' future
+            assert sub_done.wait(timeout=5)
+
+            assert not result.done
+            assert result.done_count == 3  # sub, passing, failing
+            assert result.passed_count == 1  # passing
+            assert result.failed_count == 2  # sub, failing
+            assert result.pending_count == 2  # root, hang
+            finished = [r.msg for r in result.iter_finished()]
+            assert finished == ["[bold]sub[/bold]", "Passing", "Failing"]
+
+            # Release the thread lock and wait for all checks to finish
+            hang.locked = False
+            assert root_done.wait(timeout=5)
+
+            assert result.passed
+            assert result.done_count == 5
+            assert result.passed_count == 3  # root, hang, passing
+            assert result.failed_count == 2  # sub, failing
+            assert result.pending_count == 0
+            assert len(result.finished) == 5
+        finally:
+            # Release the hanging thread so that the executor can shut down
+            hang.locked = False
+
+
+def test_check_requires():
+    """Test that checks run after their required checks and are skipped if the
+    required checks fail."""
+    # Create a check tree with requirements. Checks are ordered so that the
+    # requiring checks are scheduled before the checks they require
+    passing = DefaultCheck(name="Passing")
+    failing = DefaultCheck(name="Failing")
+    failing.default_status = "failed"
+    after_passing = DefaultCheck(name="AfterPassing", requires="Group.Passing")
+    after_failing = DefaultCheck(name="AfterFailing", requires=["Group.Failing"])
+    nested = Check(
+        name="Nested", children=[DefaultCheck(name="Sub", requires="Passing")]
+    )
+    group = Check(name="Group", children=[nested, passing, failing])
+    check = Check(name="root", children=[after_passing, after_failing, group])
+
+    assert after_passing.requires == ["Group.Passing"]
+    assert after_failing.requires == ["Group.Failing"]
+
+    done = threading.Event()
+    with ThreadPoolExecutor() as executor:
+        result = check.check(executor=executor)
+        result.listeners.append(lambda r: r.done and done.set())
+        assert result.done or done.wait(timeout=5)
+
+    statuses = {r.msg: r.status for r in result.iter_finished()}
+    assert statuses["AfterPassing"] == "passed"
+    assert statuses["AfterFailing"] == "skipped (requires 'Group.Failing')"
+    assert statuses["Sub"] == "passed"
+    assert not result.passed
+
+
+@pytest.mark.parametrize(
+    "requires",
+    (
+        "Missing",  # the required check doesn't exist
+        "Group",  # requiring an ancestor
+        "Other",  # a cycle with the 'Other' check
+    ),
+)
+def test_check_requires_invalid(requires):
+    """Test that missing and circular check requirements raise exceptions."""
+    sub = DefaultCheck(name="Sub", requires=requires)
+    other = DefaultCheck(name="Other", requires="Group.Sub")
+    group = Check(name="Group", children=[sub])
+    check = Check(name="root", children=[group, other])
+
+    with ThreadPoolExecutor() as executor:
+        with pytest.raises(CheckException):
+            check.check(executor=executor)
+
+
+def test_check_init_timeout():
+    """Test the Check init with timeout specified"""
+    assert Check(name="Timeout").timeout is None
+    assert Check(name="Timeout", timeout=2).timeout == 2.0
+    assert Check(name="Timeout", timeout="0.5").timeout == 0.5
+
+    with pytest.raises(CheckException):
+        Check(name="Timeout", timeout="soon")
+
+
+@pytest.mark.parametrize("location", ("check", "parent", "scheduler"))
+def test_check_timeout(location):
+    """Test that checks that don't finish by their deadline fail"""
+    hang = HangCheck(name="HangCheck", timeout=0.1 if location == "check" else None)
+    passing = DefaultCheck(name="Passing")
+    group = Check(
+        name="Group",
+        children=[hang, passing],
+        timeout=0.1 if location == "parent" else None,
+    )
+    check = Check(name="root", children=[group])
+
+    done = threading.Event()
+    with ThreadPoolExecutor() as executor:
+        try:
+            timeout = 0.1 if location == "scheduler" else None
+            scheduler = Scheduler(root=check, executor=executor, timeout=timeout)
+            result = check.check(executor=scheduler)
+            result.listeners.append(lambda r: r.done and done.set())
+            assert result.done or done.wait(timeout=5)
+
+            statuses = {r.msg: r.status for r in result.iter_finished()}
+            assert statuses["HangCheck"] == "failed (timeout)"
+            assert statuses["Passing"] == "passed"
+            assert not result.passed
+        finally:
+            # Release the hanging thread so that the executor can shut down
+            hang.locked = False
+
+
+def test_scheduler_cancel():
+    """Test that cancelling a Scheduler fails the unfinished checks"""
+    hang = HangCheck(name="HangCheck")
+    queued = DefaultCheck(name="Queued")
+    check = Check(name="root", children=[hang, queued])
+
+    # A single worker leaves the 'Queued' check waiting for the 'HangCheck'
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            scheduler = Scheduler(root=check, executor=executor)
+            result = check.check(executor=scheduler)
+            scheduler.cancel()
+
+            assert result.done
+            assert [r.status for r in result.children] == [
+                "failed (cancelled)",
+                "failed (cancelled)",
+            ]
+        finally:
+            # Release the hanging thread so that the executor can shut down
+            hang.locked = False
+
+
+def test_scheduler_stop_tree():
+    """Test that stopping a check stops the unfinished checks in its tree"""
+    queued = DefaultCheck(name="Queued")
+    nested = Check(name="Nested", children=[queued])
+    check = Check(name="root", children=[nested])
+
+    with ThreadPoolExecutor() as executor:
+        scheduler = Scheduler(root=check, executor=executor)
+        scheduler._stop_tree(check, 0, status="failed (cancelled)")
+
+        futures = [scheduler._future(c) for c in (check, nested, queued)]
+        assert all(future.done() for future in futures)
+        assert [future.result().status for future in futures] == [
+            "failed (cancelled)"
+        ] * 3
+
+        # Checks with results aren't stopped again
+        assert not scheduler._stop(queued, 2, status="failed (timeout)")
+        assert futures[2].result().status == "failed (cancelled)"
+
+
+@pytest.mark.parametrize("condition", ("all", "any"))
+def test_check_short_circuit(condition):
+    """Test that the unfinished children of short-circuited groups are skipped
+    once the group's result is decided"""
+    hang = HangCheck(name="HangCheck")
+    deciding = DefaultCheck(name="Deciding")
+    deciding.default_status = "passed" if condition == "any" else "failed"
+    nested = Check(name="Nested", children=[HangCheck(name="NestedHangCheck")])
+    group = Check(
+        name="Group",
+        children=[hang, nested, deciding],
+        condition=condition,
+        short_circuit=True,
+    )
+    check = Check(name="root", children=[group])
+
+    done = threading.Event()
+    with ThreadPoolExecutor() as executor:
+        try:
+            result = check.check(executor=executor)
+            result.listeners.append(lambda r: r.done and done.set())
+            assert result.done or done.wait(timeout=5)
+
+            # The 'Nested' group may be skipped before it runs its child
+            statuses = {r.msg: r.status for r in result.iter_finished()}
+            assert statuses["HangCheck"] == "skipped (short-circuit)"
+            assert statuses.get("NestedHangCheck", "skipped (short-circuit)") == (
+                "skipped (short-circuit)"
+            )
+            assert result.passed == (condition == "any")
+        finally:
+            # Release the hanging threads so that the executor can shut down
+            hang.locked = False
+            nested.children[0].locked = False
+
+
+def test_scheduler_limits():
+    """Test that the number of checks run at once is limited by resource class"""
+
+    class ResourceCheck(Check):
+        """A check that counts the checks of its resource class running at once"""
+
+        resource = "test"
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def check(
+            self, executor: t.Optional[Executor] = None, level: int = 0
+        ) -> Result:
+            cls = self.__class__
+            with cls.lock:
+                cls.running += 1
+                cls.max_running = max(cls.max_running, cls.running)
+            time.sleep(0.01)
+            with cls.lock:
+                cls.running -= 1
+            return Result(msg=self.name, status="passed")
+
+    children = [ResourceCheck(name=f"Check{i}") for i in range(10)]
+    check = Check(name="root", children=children)
+
+    done = threading.Event()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        scheduler = Scheduler(root=check, executor=executor, limits={"test": 2})
+        result = check.check(executor=scheduler)
+        result.listeners.append(lambda r: r.done and done.set())
+        assert result.done or done.wait(timeout=5)
+
+    assert result.passed
+    assert result.done_count == 11
+    assert ResourceCheck.max_running == 2
@@ -0,0 +1,117 @@
+"""
+Test the persistent cache for check results
+"""
+import typing as t
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rich.console import Console
+
+from geomancy.checks.base import Check, Result, Executor, Scheduler
+from geomancy.checks.cache import ResultCache
+
+
+class CountCheck(Check):
+    """A Check subclass with cached results that counts its runs"""
+
+    cache_ttl = 60
+
+    status = "passed"
+
+    #: The number of runs by check name
+    runs: t.Dict[str, int] = defaultdict(int)
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        self.runs[self.name] += 1
+        return Result(msg=self.name, status=self.status)
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResultCache:
+    """A result cache in a temporary directory"""
+    return ResultCache(tmp_path / "results", environ={"VALUE": "1"})
+
+
+def test_result_cache_get_set(cache):
+    """Test caching the results of checks"""
+    check = CountCheck(name="Count", value="a")
+    assert cache.get(check) is None
+
+    assert cache.set(check, Result(status="passed (ok)", msg="Count"))
+    result = cache.get(check)
+    assert result.status == "passed (ok)"
+    assert result.msg == "Count"
+    assert result.cached
+
+    # Cached results aren't cached again
+    assert not cache.set(check, result)
+
+    # Failed results aren't cached
+    other = CountCheck(name="Other", value="a")
+    assert not cache.set(other, Result(status="failed", msg="Other"))
+    assert cache.get(other) is None
+
+    # Clear the cache
+    assert cache.clear() == 1
+    assert cache.get(check) is None
+
+
+def test_result_cache_key(cache, tmp_path):
+    """Test the keys for cached results"""
+    check = CountCheck(name="Count", value="a")
+    key = cache.key(check)
+    assert key is not None
+    assert key == cache.key(CountCheck(name="Count", value="a"))
+
+    # Different values, attributes and environments have different keys
+    assert key != cache.key(CountCheck(name="Count", value="b"))
+    assert key != cache.key(CountCheck(name="Count", value="a", substitute=False))
+    other_cache = ResultCache(tmp_path / "results", environ={"VALUE": "2"})
+    assert key != other_cache.key(check)
+
+    # Checks that aren't cached or that have children don't have keys
+    assert cache.key(Check(name="Check", value="a")) is None
+    assert cache.key(CountCheck(name="Group", children=[check])) is None
+
+    # Cached counts and check groups don't change the key
+    assert check.count == 1
+    assert cache.key(check) == key
+
+
+def test_result_cache_ttl(cache, monkeypatch):
+    """Test that cached results expire"""
+    check = CountCheck(name="Count", value="a")
+    cache.set(check, Result(status="passed", msg="Count"))
+    assert cache.get(check) is not None
+
+    monkeypatch.setattr(CountCheck, "cache_ttl", 0.0001)
+    assert cache.get(check) is None
+
+
+def test_scheduler_cache(cache):
+    """Test that the scheduler uses cached results instead of running checks"""
+
+    def run(root):
+        with ThreadPoolExecutor() as executor:
+            scheduler = Scheduler(root=root, executor=executor, cache=cache)
+            return root.check(executor=scheduler)
+
+    check = CountCheck(name="Cached", value="a")
+    failed = CountCheck(name="Failed", value="b")
+    failed.status = "failed"
+
+    result = run(Check(name="Group", children=[check, failed]))
+    assert CountCheck.runs["Cached"] == 1 and CountCheck.runs["Failed"] == 1
+    assert not any(r.cached for r in result.finished)
+
+    # The passed check's cached result is used. The failed check is run again
+    result = run(Check(name="Group", children=[check, failed]))
+    assert CountCheck.runs["Cached"] == 1 and CountCheck.runs["Failed"] == 2
+    assert [r.cached for r in result.finished] == [False, True, False]
+
+    # Cached results are marked in the output
+    console = Console(width=80)
+    with console.capture() as capture:
+        console.print(result.rich_table())
+    assert "Cached...passed (cached)" in capture.get()
@@ -1,6 +1,12 @@
 """
 Test the CheckExec class
 """
+import asyncio
+import os
+import time
+
+import pytest
+
 from geomancy.checks.exec import CheckExec
 
 
@@ -33,3 +39,48 @@ def test_check_exec_version():
     # Should be less than version 1000.
     check = CheckExec(name="Check Python", value="python>=1000.0")
     assert not check.check().passed
+
+
+def test_check_exec_acheck():
+    """Tests CheckExec checks with asyncio subprocesses"""
+    # Should be greater than version 2.0
+    check = CheckExec(name="Check Python", value="python>=2.0")
+    assert asyncio.run(check.acheck()).passed
+
+    # Should be less than version 1000.
+    check = CheckExec(name="Check Python", value="python>=1000.0")
+    assert not asyncio.run(check.acheck()).passed
+
+    # Should not exist
+    check = CheckExec(name="Check Python", value="_miss_ing_")
+    assert not asyncio.run(check.acheck()).passed
+
+
+@pytest.fixture
+def hanging_exec(tmp_path, monkeypatch):
+    """An executable on the PATH that hangs instead of printing its version"""
+    path = tmp_path / "hanging_exec"
+    path.write_text("#!/bin/sh\nexec sleep 10\n")
+    path.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=os.pathsep)
+    return path.name
+
+
+def test_check_exec_timeout(hanging_exec):
+    """Tests that CheckExec kills executables that don't finish by the check's
+    deadline"""
+    check = CheckExec(name="Check Hanging", value=hanging_exec)
+
+    # Sync subprocess
+    check.deadline = time.monotonic() + 0.2
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        check.check()
+    assert time.monotonic() - start < 5
+
+    # Async subprocess
+    check.deadline = time.monotonic() + 0.2
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(check.acheck())
+    assert time.monotonic() - start < 5
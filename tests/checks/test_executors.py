@@ -0,0 +1,104 @@
+"""
+Test the executors for running checks
+"""
+import typing as t
+import asyncio
+import threading
+
+import pytest
+
+from geomancy.checks.base import Check, Result, Executor
+from geomancy.checks.env import CheckEnv
+from geomancy.checks.path import CheckPath
+from geomancy.checks.executors import AsyncExecutor, ProcessExecutor
+
+
+class AsyncCheck(Check):
+    """A Check subclass with an async-native check"""
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        raise NotImplementedError
+
+    async def acheck(
+        self, executor: t.Optional[Executor] = None, level: int = 0
+    ) -> Result:
+        await asyncio.sleep(0.01)
+        return Result(msg=self.name, status="passed")
+
+
+class SyncCheck(Check):
+    """A Check subclass with a sync check"""
+
+    def check(self, executor: t.Optional[Executor] = None, level: int = 0) -> Result:
+        return Result(msg=self.name, status="passed")
+
+
+def test_async_executor_submit():
+    """Test the AsyncExecutor with functions and coroutine functions"""
+
+    async def coroutine_function(value):
+        await asyncio.sleep(0.01)
+        return value, threading.current_thread().name
+
+    def function(value):
+        return value, threading.current_thread().name
+
+    with AsyncExecutor() as executor:
+        future1 = executor.submit(coroutine_function, 1)
+        future2 = executor.submit(function, 2)
+
+        # Coroutines are run in the event loop thread
+        assert future1.result(timeout=5) == (1, "AsyncExecutor")
+
+        # Functions are run in a thread pool
+        value, thread_name = future2.result(timeout=5)
+        assert value == 2
+        assert thread_name != "AsyncExecutor"
+
+    # No calls can be submitted after shutting down
+    with pytest.raises(RuntimeError):
+        executor.submit(function, 3)
+
+
+def test_async_executor_checks():
+    """Test running a tree of async and sync checks with the AsyncExecutor"""
+    children = [AsyncCheck(name=f"Async{i}") for i in range(100)]
+    children.append(SyncCheck(name="Sync"))
+    group = Check(name="Group", children=children)
+    check = Check(name="root", children=[group])
+
+    done = threading.Event()
+    with AsyncExecutor() as executor:
+        result = check.check(executor=executor)
+        result.listeners.append(lambda r: r.done and done.set())
+        assert result.done or done.wait(timeout=5)
+
+    assert result.passed
+    assert result.done_count == 103
+
+
+def test_process_executor_checks():
+    """Test running leaf checks in processes with the ProcessExecutor"""
+    # CheckEnv and CheckPath can be pickled. SyncCheck is a local class, but
+    # it is run in a thread if it can't be pickled
+    children = [
+        CheckEnv(name="Env", value="$PATH"),
+        CheckPath(name="Path", value="examples/geomancy.yaml"),
+        CheckPath(name="Missing", value=".missing__.txt"),
+        SyncCheck(name="Sync"),
+    ]
+    check = Check(name="root", children=[Check(name="Group", children=children)])
+
+    done = threading.Event()
+    with ProcessExecutor(max_workers=2) as executor:
+        result = check.check(executor=executor)
+        result.listeners.append(lambda r: r.done and done.set())
+        assert result.done or done.wait(timeout=30)
+
+    # Results are returned from the processes
+    statuses = {r.msg: r.status for r in result.iter_finished()}
+    assert statuses["Check environment variable '$PATH'"] == "passed"
+    assert statuses["Check path 'examples/geomancy.yaml'"] == "passed"
+    assert statuses["Check path '.missing__.txt'"] == "failed (missing)"
+    assert statuses["Sync"] == "passed"
+    assert result.done_count == 6
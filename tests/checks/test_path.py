@@ -73,3 +73,24 @@ def test_check_path_env_substitution(tmp_path):
         # Set the ENV variable, and it should now work
         mp.setenv("ENV", ENV)
         assert check.check().passed
+
+
+@pytest.mark.parametrize("path_type", (None, "file", "dir"))
+def test_check_path_values(tmp_path, path_type):
+    """Test CheckPath.check_values with the same statuses as CheckPath.check"""
+    (tmp_path / "exists.txt").touch()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "sub")
+    (tmp_path / "broken").symlink_to(tmp_path / "missing")
+
+    values = [
+        str(tmp_path / name)
+        for name in ("exists.txt", "sub", "link", "broken", "missing", "sub/.")
+    ] + ["."]
+    check = CheckPath(name="PathCheck", type=path_type)
+    statuses = []
+    for value in values:
+        check.value = value
+        statuses.append(check.check().status)
+
+    assert check.check_values(values) == statuses
@@ -28,3 +28,22 @@ def test_check_python_package_version():
     # Should be less than version 1000.
     check = CheckPythonPackage(name="Check pytest", value="pytest>=1000.0")
     assert not check.check().passed
+
+
+def test_check_python_package_values():
+    """Tests CheckPythonPackage.check_values with one scan of the installed
+    packages"""
+    values = [
+        "pytest",
+        "PyTest>=1.0",
+        "pytest>=1000.0",
+        "_miss_ing_",
+        "typing-extensions",
+    ]
+    check = CheckPythonPackage(name="Check packages")
+    statuses = []
+    for value in values:
+        check.value = value
+        statuses.append(check.check().status)
+
+    assert check.check_values(values) == statuses
@@ -17,3 +17,11 @@ def test_env_file() -> dict:
             "VALUE5": "Extra endspaces removed",
         },
     }
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch) -> Path:
+    """Use a temporary cache directory so that tests don't use cached results"""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
@@ -0,0 +1,91 @@
+"""Test the 'cache' subcommand and the cache of checks files"""
+import os
+
+from click.testing import CliRunner
+
+from geomancy.entrypoints import geo_cli
+from geomancy.entrypoints.cache import PlanCache
+from geomancy.entrypoints import loader as loader_module
+from geomancy.entrypoints.check import load_checks_file
+from geomancy.entrypoints.loader import iter_yaml
+
+checks_yaml = """
+config:
+  Check:
+    max_level: 15
+Paths:
+  Tmp:
+    checkPath: {path}
+"""
+
+
+def test_plan_cache(tmp_path, monkeypatch):
+    """Test that checks files are only parsed again when they change"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text(checks_yaml.format(path=tmp_path))
+    plans = PlanCache(tmp_path / "plans")
+
+    # Count the checks files parsed
+    parsed = []
+
+    def parse(data, lines=None):
+        parsed.append(data)
+        return iter_yaml(data, lines=lines)
+
+    monkeypatch.setattr(loader_module, "iter_yaml", parse)
+
+    check = load_checks_file(checks_file, plans=plans)
+    assert check.children[0].name == "Paths"
+    assert len(parsed) == 1
+
+    # The cached plan is used for the unchanged file
+    cached = load_checks_file(checks_file, plans=plans)
+    assert len(parsed) == 1
+    assert cached.children[0].children[0].value == str(tmp_path)
+
+    # Changing the file invalidates the cached plan
+    checks_file.write_text(checks_yaml.format(path=tmp_path / "other"))
+    stat = checks_file.stat()
+    os.utime(checks_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    changed = load_checks_file(checks_file, plans=plans)
+    assert len(parsed) == 2
+    assert changed.children[0].children[0].value == str(tmp_path / "other")
+
+    # Clear the cache
+    assert plans.clear() == 1
+    load_checks_file(checks_file, plans=plans)
+    assert len(parsed) == 3
+
+
+def test_plan_cache_includes(tmp_path, monkeypatch):
+    """Test that changing an included checks file invalidates the cached plan"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text("Group:\n  include: paths.yaml\n")
+    included = tmp_path / "paths.yaml"
+    included.write_text(checks_yaml.format(path=tmp_path))
+    plans = PlanCache(tmp_path / "plans")
+
+    check = load_checks_file(checks_file, plans=plans)
+    assert check.flatten[-1].value == str(tmp_path)
+    assert plans.get(checks_file, plans.key(checks_file, checks_file.read_bytes()))
+
+    # Changing the included file invalidates the cached plan
+    included.write_text(checks_yaml.format(path=tmp_path / "other"))
+    stat = included.stat()
+    os.utime(included, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert not plans.get(checks_file, plans.key(checks_file, checks_file.read_bytes()))
+    check = load_checks_file(checks_file, plans=plans)
+    assert check.flatten[-1].value == str(tmp_path / "other")
+
+
+def test_cli_cache_clear(cache_home):
+    """Test the 'geo cache clear' command"""
+    runner = CliRunner()
+    result = runner.invoke(geo_cli, ["check", "examples/geomancy.yaml"])
+    assert result.exit_code == 0
+    assert any((cache_home / "geomancy" / "plans").iterdir())
+
+    result = runner.invoke(geo_cli, ["cache", "clear"])
+    assert result.exit_code == 0
+    assert "cached checks files" in result.output
+    assert not any((cache_home / "geomancy" / "plans").iterdir())
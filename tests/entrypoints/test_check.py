@@ -0,0 +1,33 @@
+"""Test running the checks of checks files"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from geomancy.checks.base import Scheduler
+from geomancy.entrypoints.check import run_checks_file
+
+
+@pytest.mark.parametrize(
+    "name,template",
+    (
+        ("geomancy.yaml", "A:\n  checkPath: '{path}'\nB:\n  checkPath: '{path}'\n"),
+        ("geomancy.toml", "[A]\ncheckPath = '{path}'\n[B]\ncheckPath = '{path}'\n"),
+    ),
+)
+def test_run_checks_file_listener(tmp_path, name, template):
+    """Test that the listener of a checks file's result is notified when the
+    result finishes, even if its checks finish before the result is returned"""
+    checks_file = tmp_path / name
+    checks_file.write_text(template.format(path=tmp_path))
+    finished = threading.Event()
+
+    with ThreadPoolExecutor() as executor:
+        scheduler = Scheduler(root=None, executor=executor)
+        check, result = run_checks_file(
+            checks_file, scheduler, listener=lambda r: r.done and finished.set()
+        )
+        assert finished.wait(timeout=5)
+
+    assert result.done and result.passed
+    assert [c.name for c in check.children] == ["A", "B"]
@@ -2,11 +2,15 @@
 import typing as t
 from pathlib import Path
 import os
+import subprocess
+import sys
 
 from click.testing import CliRunner
 import pytest
 
 from geomancy.entrypoints import geo_cli
+from geomancy.entrypoints import loader as loader_module
+from geomancy.entrypoints.loader import read_checks_file
 
 
 def get_checks_files():
@@ -68,6 +72,147 @@ def test_cli_check_glob(run, options):
     )
 
 
+def test_cli_check_files(run, tmp_path, monkeypatch):
+    """Test the CLI with multiple checks files, including a file without
+    checks"""
+    # Record the checks files parsed concurrently. The first checks file is
+    # streamed instead
+    parsed = []
+
+    def read(checks_file, data=None):
+        parsed.append(checks_file.name)
+        return read_checks_file(checks_file, data)
+
+    monkeypatch.setattr(loader_module, "read_checks_file", read)
+
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.yaml").write_text(f"{name.upper()}:\n  checkPath: .\n")
+    (tmp_path / "empty.yaml").write_text("config: {}\n")
+    names = ("c.yaml", "empty.yaml", "a.yaml", "b.yaml")
+
+    result = run(["check", "--no-cache"] + [str(tmp_path / name) for name in names])
+
+    # The checks files with checks are listed in order
+    assert "Checking 3 files...passed" in result.output
+    lines = [line for line in result.output.splitlines() if ".yaml..." in line]
+    assert [Path(line.split("...")[0].split()[-1]).name for line in lines] == [
+        "c.yaml",
+        "a.yaml",
+        "b.yaml",
+    ]
+    assert sorted(parsed) == ["a.yaml", "b.yaml", "empty.yaml"]
+
+
+def test_cli_check_stream(run, tmp_path, monkeypatch):
+    """Test running the checks of a checks file while it's loaded, with checks
+    that require checks later in the checks file"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "geomancy.yaml").write_text(
+        "A:\n  checkPath: .\n  requires: C\n"
+        "B:\n  checkPath: .\n"
+        "C:\n  checkPath: missing\n"
+        "condition: any\n"
+    )
+    result = run(["check", "--no-cache", "geomancy.yaml"])
+
+    # The results are in the order of the checks file, and the root condition
+    # follows the checks
+    statuses = [line.split("...")[-1] for line in result.output.splitlines()[:4]]
+    assert [status.strip() for status in statuses] == [
+        "passed",
+        "skipped (requires 'C')",
+        "passed",
+        "failed (missing)",
+    ]
+
+
+@pytest.mark.parametrize("executor", ("thread", "async", "process"))
+def test_cli_check_executor(run, executor):
+    """Test the CLI with the different executors"""
+    result = run(("check", "--executor", executor, "examples/geomancy.yaml"))
+
+    # Check, for example, that environment variables were checked
+    assert "Check environment variable" in result.output
+
+
+@pytest.mark.parametrize("executor", ("thread", "async", "process"))
+def test_cli_check_executor_timeout(executor, tmp_path):
+    """Test that the executors shut down cleanly when checks time out"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    hang = bin_dir / "hang"
+    hang.write_text("#!/bin/sh\nsleep 30\n")  # the child holds the pipes open
+    hang.chmod(0o755)
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text("Hang:\n  checkExec: hang>=1\n  timeout: 1\n")
+
+    code = "from geomancy.entrypoints import geo_cli; geo_cli()"
+    args = ("check", "--executor", executor, "--no-cache", str(checks_file))
+    env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+    process = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=20,
+    )
+    assert process.returncode == 1
+    assert "failed (timeout)" in process.stdout
+    assert process.stderr == ""
+
+
+def test_cli_check_cache(run):
+    """Test that the CLI uses cached results unless disabled"""
+    result = run(("check", "examples/geomancy.yaml"))
+    assert "(cached)" not in result.output
+
+    result = run(("check", "examples/geomancy.yaml"))
+    assert "(cached)" in result.output
+
+    result = run(("check", "--no-cache", "examples/geomancy.yaml"))
+    assert "(cached)" not in result.output
+
+
+def test_cli_check_yaml_loader(run):
+    """Test that the YAML loader used is reported in the debug output"""
+    result = run(("--debug", "check", "--no-cache", "examples/geomancy.yaml"))
+    assert "SafeLoader" in result.output
+
+
+def test_cli_validate(run, tmp_path):
+    """Test validating checks files without running their checks"""
+    checks_files = get_checks_files()
+    result = run(["validate"] + list(map(str, checks_files)))
+    assert f"Validated {len(checks_files)} checks file(s)" in result.output
+
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text("Checks:\n  checkPath: .\n  type: folder\n")
+    result = run(["validate", str(checks_file)], expected_code=1)
+    assert f"{checks_file}:3: The type 'folder' of 'Checks'" in result.output
+    assert "Found 1 error(s) in 1 checks file(s)" in result.output
+
+
+@pytest.mark.parametrize("args", (["--version"], ["run", "true"]))
+def test_cli_lazy_imports(args):
+    """Test that commands don't import the dependencies of other commands"""
+    code = (
+        "import sys\n"
+        "from geomancy.entrypoints import geo_cli\n"
+        "try:\n"
+        f"    geo_cli({args!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(' '.join(sys.modules), file=sys.stderr)\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    modules = process.stderr.split()
+    assert "geomancy.entrypoints" in modules
+    for module in ("rich", "yaml", "thatway", "asyncio", "geomancy.checks"):
+        assert module not in modules
+
+
 @pytest.mark.parametrize("flag", ("", "--toml", "--yaml"))
 def test_cli_config(run, flag):
     """Test the --config option"""
@@ -79,15 +224,12 @@ def test_cli_config(run, flag):
 
 
 @pytest.mark.parametrize("flag", ("-e", "--env"))
-def test_cli_handle_env(run, flag, test_env_file):
+def test_cli_handle_env(run, flag, test_env_file, tmp_path, monkeypatch):
     """Test the handling of -e/--env and --overwrite flags for loading
     environment variables.
 
     See ./conftest.py for details on the 'test_env_file' fixture
     """
-    # Get a single checks file to test against
-    checks_file = get_checks_files()[0]
-
     # Set up the env files
     env_filepath = test_env_file["filepath"]
     variables = test_env_file["variables"]
@@ -95,26 +237,92 @@ def test_cli_handle_env(run, flag, test_env_file):
     # running '--overwrite' without '-e/--env' gives an error
     result = run("--overwrite", expected_code=2)
 
+    # A checks file that checks the variables from the env file
+    monkeypatch.chdir(tmp_path)
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text(
+        "".join(f"{name}:\n  checkEnv: ${name}\n" for name in variables)
+    )
+
     with pytest.MonkeyPatch.context() as mp:
         # Reset env variables
         for name in variables.keys():
             mp.delenv(name, raising=False)
 
-        # The variables are in the environment (os.environ)
+        # The variables are not in the environment (os.environ)
         for name, value in variables.items():
             assert name not in os.environ
 
-        # running "-e/--env" should load environment variables, which are logged
-        # in debug mode
-        options = ("-d", flag, env_filepath, "checks", str(checks_file))
+        # running "-e/--env" should load environment variables for the checks
+        options = ("-d", "check", flag, env_filepath, "--no-cache", "geomancy.yaml")
         result = run(options)
+        assert f"{len(variables) + 1} passed" in result.output
 
-        # The variables are loaded in the current process
+        # The variables are loaded in a snapshot, without changing the
+        # environment variables of the current process
         for name, value in variables.items():
-            assert os.environ[name] == value
+            assert name not in os.environ
+
+        # Without "-e/--env", the variables are missing
+        result = run(("check", "--no-cache", "geomancy.yaml"), expected_code=1)
+        assert "failed" in result.output
+
+
+@pytest.mark.parametrize("executor", ("thread", "async", "process"))
+def test_cli_env_path(run, executor, tmp_path, monkeypatch):
+    """Test that executables are found with a PATH from an environment file,
+    and that they run with the environment variables of the environment file"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = bin_dir / "geotool"
+    tool.write_text('#!/bin/sh\necho "geotool $GEOTOOL_VERSION"\n')
+    tool.chmod(0o755)
+
+    env_file = tmp_path / "test.env"
+    env_file.write_text(f"PATH={bin_dir}:${{PATH}}\nGEOTOOL_VERSION=1.2.3\n")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "geomancy.yaml").write_text("Tool:\n  checkExec: geotool>=1.2\n")
 
+    args = ("check", "--executor", executor, "--no-cache", "geomancy.yaml")
+    result = run(args[:1] + ("--overwrite", "-e", str(env_file)) + args[1:])
+    assert "2 passed" in result.output
 
-def test_cli_run(run, test_env_file):
+    # Without the environment file, the executable is missing
+    result = run(args, expected_code=1)
+    assert "failed (missing)" in result.output
+
+
+def test_cli_multiple_env_files(run, tmp_path, cache_home):
+    """Test loading multiple environment files with the -e/--env and
+    --overwrite flags"""
+    first = tmp_path / "first.env"
+    first.write_text("A=first\nB=first\n")
+    second = tmp_path / "second.env"
+    second.write_text("B=second\nC=${A}-second\n")
+    env_files = ("-e", str(first), "-e", str(second))
+
+    output = tmp_path / "env.txt"
+    code = "import os, sys; open(sys.argv[1], 'w').write(repr(dict(os.environ)))"
+
+    for options, expected in (((), "first"), (("--overwrite",), "second")):
+        run(("run", *env_files, *options, sys.executable, "-c", code, str(output)))
+
+        # Later files are substituted with the variables of earlier files, and
+        # they only replace existing variables with --overwrite
+        environ = eval(output.read_text())
+        assert (environ["A"], environ["B"]) == ("first", expected)
+        assert environ["C"] == "first-second"
+
+    # The tokenized environment files are cached, unless --no-cache is used
+    env_cache = cache_home / "geomancy" / "env"
+    assert len(list(env_cache.iterdir())) == 2
+
+    run(("cache", "clear"))
+    run(("check", *env_files, "--no-cache", "examples/geomancy.yaml"))
+    assert not any(env_cache.iterdir())
+
+
+def test_cli_run(run, test_env_file, tmp_path):
     """Test the 'run' subcommand and the handle_env function.
 
     See ./conftest.py for details on the 'test_env_file' fixture.
@@ -132,9 +340,14 @@ def test_cli_run(run, test_env_file):
         for name, value in variables.items():
             assert name not in os.environ
 
-        # Run the command with the 'run' subcommand
-        result = run(("run", "-e", filepath, "echo", "here!"))
+        # Run the command with the 'run' subcommand. The command writes its
+        # environment variables to a file
+        output = tmp_path / "env.txt"
+        code = "import os, sys; open(sys.argv[1], 'w').write(repr(dict(os.environ)))"
+        run(("run", "-e", filepath, sys.executable, "-c", code, str(output)))
 
-        # The variables are loaded in the current process
+        # The variables are loaded in the command's process only
+        environ = eval(output.read_text())
         for name, value in variables.items():
-            assert os.environ[name] == value
+            assert environ[name] == value
+            assert name not in os.environ
@@ -0,0 +1,206 @@
+"""Test the loader for checks files and included checks files"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+
+from geomancy.checks import CheckException
+from geomancy.entrypoints import loader as loader_module
+from geomancy.entrypoints.loader import (
+    ChecksFile,
+    ChecksLoader,
+    iter_yaml,
+    read_checks_file,
+)
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """The names of the checks files parsed"""
+    names = []
+
+    def read(checks_file, data=None):
+        names.append(checks_file.name)
+        return read_checks_file(checks_file, data)
+
+    monkeypatch.setattr(loader_module, "read_checks_file", read)
+    return names
+
+
+def test_loader_include(tmp_path, parsed):
+    """Test including checks files with relative paths and globs"""
+    (tmp_path / "services").mkdir()
+    (tmp_path / "geomancy.yaml").write_text(
+        "config:\n"
+        "  Check:\n"
+        "    max_level: 15\n"
+        "Services:\n"
+        "  include: [base.yaml, 'services/*.yaml']\n"
+    )
+    (tmp_path / "base.yaml").write_text("Base:\n  checkPath: base\n")
+    (tmp_path / "services" / "a.yaml").write_text(
+        "A:\n  checkPath: a\nBase:\n  include: ../base.yaml\n"
+    )
+    (tmp_path / "services" / "b.toml").write_text("[B]\ncheckPath = 'b'\n")
+    (tmp_path / "services" / "c.yml").write_text("C:\n  checkPath: c\n")
+
+    with ThreadPoolExecutor() as pool:
+        loader = ChecksLoader(executor=pool)
+        loaded = loader.load(tmp_path / "geomancy.yaml")
+
+    # Included checks files are added to the group with the 'include' key.
+    # base.yaml is included twice, but it's only loaded and parsed once
+    services = loaded.check.children[0]
+    assert services.name == "Services"
+    assert [c.name for c in services.children] == [
+        str(tmp_path / "base.yaml"),
+        str(tmp_path / "services" / "a.yaml"),
+    ]
+    assert [c.value for c in services.flatten if c.value] == ["base", "a"]
+    assert [p.name for p in loaded.includes] == ["base.yaml", "a.yaml"]
+    assert sorted(parsed) == ["a.yaml", "base.yaml", "geomancy.yaml"]
+    assert loaded.config_sections == [{"Check": {"max_level": 15}}]
+
+
+def test_loader_include_errors(tmp_path):
+    """Test the errors for missing included files and include cycles"""
+    (tmp_path / "missing.yaml").write_text("Group:\n  include: other.yaml\n")
+    with pytest.raises(CheckException, match="Could not find"):
+        ChecksLoader().load(tmp_path / "missing.yaml")
+
+    (tmp_path / "a.yaml").write_text("A:\n  include: b.yaml\n")
+    (tmp_path / "b.yaml").write_text("B:\n  include: a.yaml\n")
+    with pytest.raises(CheckException, match="includes itself"):
+        ChecksLoader().load(tmp_path / "a.yaml")
+
+
+def test_iter_yaml():
+    """Test building YAML documents from parser events"""
+    data = (
+        "a: 1\n"
+        "b: [1, 2.5, true, null, '2', 2020-01-01]\n"
+        "c: &c {d: e}\n"
+        "f:\n"
+        "  <<: *c\n"
+        "  g: !!str 1\n"
+    )
+    lines = dict()
+    items = list(iter_yaml(data, lines=lines))
+    assert dict(items) == yaml.safe_load(data)
+    assert [key for key, _ in items] == ["a", "b", "c", "f"]
+    assert lines == {
+        ("a",): 1,
+        ("b",): 2,
+        ("c",): 3,
+        ("c", "d"): 3,
+        ("f",): 4,
+        ("f", "g"): 6,
+    }
+
+    # Documents without a root mapping don't have items
+    assert list(iter_yaml("- a\n- b\n")) == []
+
+    with pytest.raises(yaml.YAMLError, match="single document"):
+        list(iter_yaml("a: 1\n---\nb: 2\n"))
+
+
+def test_iter_yaml_tags():
+    """Test building YAML documents with tagged collections"""
+    data = (
+        "a: &a !!set {x, y}\n"
+        "b: !!omap [{k: 1}, {j: *a}]\n"
+        "c: !!map {d: 1}\n"
+        "e: [!!pairs [{f: 1}], *a]\n"
+    )
+    items = dict(iter_yaml(data))
+    assert items == yaml.safe_load(data)
+    assert items["a"] == {"x", "y"}
+    assert items["b"] == [("k", 1), ("j", {"x", "y"})]
+
+    # Unknown tags on collections aren't ignored
+    with pytest.raises(yaml.YAMLError, match="!custom"):
+        list(iter_yaml("a: !custom {b: 1}\n"))
+    with pytest.raises(yaml.YAMLError, match="undefined alias"):
+        list(iter_yaml("a: !!set {*b}\n"))
+
+
+def test_loader_stream(tmp_path):
+    """Test loading checks while a YAML checks file is parsed"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text(
+        "A:\n  checkPath: a\n"
+        "config:\n  Check:\n    max_level: 15\n"
+        "B:\n  checkPath: b\n"
+        "condition: any\n"
+        "C:\n  checkPath: [c\n"  # syntax error
+    )
+    loaded = ChecksFile(path=checks_file)
+    checks = ChecksLoader().stream(loaded)
+
+    # Checks are held until the config section is applied
+    a = next(checks)
+    assert a.name == "A"
+    assert loaded.config_sections == [{"Check": {"max_level": 15}}]
+    assert loaded.check.name == str(checks_file)
+    assert next(checks).name == "B"
+
+    # Checks are yielded before the rest of the file is parsed
+    with pytest.raises(yaml.YAMLError):
+        next(checks)
+    assert loaded.check.condition is any
+
+
+def test_loader_stream_nested_config(tmp_path):
+    """Test that nested keys named like config sections don't hold checks"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text(
+        "A:\n  config:\n    checkPath: a\n"
+        "B:\n  checkPath: [b\n"  # syntax error
+    )
+    checks = ChecksLoader().stream(ChecksFile(path=checks_file))
+
+    # The check is yielded before the rest of the file is parsed
+    assert next(checks).name == "A"
+    with pytest.raises(yaml.YAMLError):
+        next(checks)
+
+
+def test_loader_stream_parsed(tmp_path, parsed):
+    """Test that YAML checks files that were already parsed concurrently are
+    loaded whole instead of being parsed again"""
+    first = tmp_path / "first.yaml"
+    first.write_text("A:\n  checkPath: a\n")
+    second = tmp_path / "second.yaml"
+    second.write_text("B:\n  checkPath: b\nC:\n  checkPath: c\n")
+
+    with ThreadPoolExecutor() as pool:
+        loader = ChecksLoader(executor=pool)
+        loader.parse(second)
+        assert loader.is_parsed(second) and not loader.is_parsed(first)
+
+        # The first checks file is streamed, and the second is loaded whole
+        loaded = ChecksFile(path=first)
+        assert [check.name for check in loader.stream(loaded)] == ["A"]
+        loaded = ChecksFile(path=second)
+        assert list(loader.stream(loaded)) == []
+        assert [check.name for check in loaded.check.children] == ["B", "C"]
+
+    assert parsed == ["second.yaml"]
+
+
+@pytest.mark.parametrize(
+    "name,text,count",
+    (
+        ("geomancy.toml", "[A]\ncheckPath = 'a'\n[B]\ncheckPath = 'b'\n", 3),
+        ("geomancy.yaml", "checkPath: a\ndesc: A check\n", 1),
+    ),
+)
+def test_loader_stream_whole(tmp_path, name, text, count):
+    """Test that TOML checks files, and checks files with a check at their
+    root, are loaded whole"""
+    checks_file = tmp_path / name
+    checks_file.write_text(text)
+    loaded = ChecksFile(path=checks_file)
+    assert list(ChecksLoader().stream(loaded)) == []
+    assert loaded.check.name == str(checks_file)
+    assert loaded.check.count == count
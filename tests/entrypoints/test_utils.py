@@ -0,0 +1,27 @@
+"""Test the CLI utils"""
+import os
+
+import pytest
+
+from geomancy.entrypoints.utils import cpu_count
+
+
+@pytest.mark.parametrize(
+    "files,expected",
+    (
+        ({}, None),
+        ({"cpu.max": "max 100000\n"}, None),
+        ({"cpu.max": "50000 100000\n"}, 1),
+        ({"cpu/cpu.cfs_quota_us": "-1\n", "cpu/cpu.cfs_period_us": "100000\n"}, None),
+        ({"cpu/cpu.cfs_quota_us": "50000\n", "cpu/cpu.cfs_period_us": "100000"}, 1),
+    ),
+)
+def test_cpu_count(tmp_path, files, expected):
+    """Test the number of CPUs available with cgroup CPU quotas"""
+    for name, text in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    count = cpu_count(cgroup_root=tmp_path)
+    assert count == (expected if expected is not None else len(os.sched_getaffinity(0)))
@@ -0,0 +1,110 @@
+"""Test the validation of checks files"""
+import pytest
+
+from geomancy.checks import Check, CheckPath
+from geomancy.checks.aws.ssm import CheckAwsSsmParameter
+from geomancy.entrypoints.validate import Schema, validate_checks_file
+
+
+@pytest.fixture
+def schema() -> Schema:
+    """The schema of the registered check types"""
+    return Schema()
+
+
+def test_schema_options(schema):
+    """Test the options and allowed values derived from check classes"""
+    # Options from __init__ arguments and *_aliases
+    assert schema.options[Check]["desc"] == "desc"
+    assert schema.options[Check]["subchecks"] == "condition"
+    assert schema.options[CheckPath]["type"] == "type"
+    assert "matrix" not in schema.options[CheckPath]
+    assert "include" not in schema.options[Check]
+
+    # Allowed values from *_options and allowed_*s
+    assert schema.values[Check]["condition"] == ("all", "any")
+    assert schema.values[CheckPath]["type"] == (None, "dir", "file")
+    assert schema.values[CheckAwsSsmParameter]["type"] == (
+        "String",
+        "StringList",
+        "SecureString",
+    )
+
+
+def test_validate_yaml(tmp_path, schema):
+    """Test that all errors in a YAML checks file are reported with their
+    line numbers"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text(
+        "config:\n"  # 1
+        "  Check:\n"  # 2
+        "    unknown: 1\n"  # 3
+        "Checks:\n"  # 4
+        "  decs: Checks with errors\n"  # 5
+        "  condition: Any\n"  # 6
+        "  Path:\n"  # 7
+        "    checkPath: README.md\n"  # 8
+        "    type: directory\n"  # 9
+        "    timeout: soon\n"  # 10
+        "  Both:\n"  # 11
+        "    checkPath: a\n"  # 12
+        "    checkEnv: b\n"  # 13
+        "  Matrix:\n"  # 14
+        "    checkPath: '{name}'\n"  # 15
+        "    matrix: {other: [a]}\n"  # 16
+        "  Include:\n"  # 17
+        "    checkPath: a\n"  # 18
+        "    include: other.yaml\n"  # 19
+        "  Missing:\n"  # 20
+        "    include: missing.yaml\n"  # 21
+    )
+
+    issues, includes = validate_checks_file(checks_file, schema)
+    assert includes == []
+    assert [(issue.line, issue.msg.split()[0]) for issue in issues] == [
+        (5, "Unknown"),
+        (9, "The"),
+        (10, "The"),
+        (11, "More"),
+        (16, "Could"),
+        (19, "Checks"),
+        (21, "Could"),
+    ]
+    assert str(issues[0]) == (
+        f"{checks_file}:5: Unknown option 'decs' in 'Checks' (group)"
+    )
+
+
+def test_validate_toml(tmp_path, schema):
+    """Test the line numbers of errors in TOML and pyproject.toml files"""
+    checks_file = tmp_path / "pyproject.toml"
+    checks_file.write_text(
+        "[project]\n"  # 1
+        "name = 'test'\n"  # 2
+        "[tool.geomancy.Checks]\n"  # 3
+        "subchecks = 'some'\n"  # 4
+        "[tool.geomancy.Checks.Path]\n"  # 5
+        "checkPath = 'README.md'\n"  # 6
+        "requires = [1, 2]\n"  # 7
+    )
+    issues, _ = validate_checks_file(checks_file, schema)
+    assert [issue.line for issue in issues] == [4, 7]
+
+
+def test_validate_syntax(tmp_path, schema):
+    """Test that syntax errors are reported"""
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text("Checks:\n  checkPath: [a\n")
+    issues, _ = validate_checks_file(checks_file, schema)
+    assert len(issues) == 1
+    assert issues[0].msg.startswith("Invalid YAML")
+
+
+def test_validate_include(tmp_path, schema):
+    """Test that included checks files are returned for validation"""
+    (tmp_path / "base.yaml").write_text("Base:\n  checkPath: .\n")
+    checks_file = tmp_path / "geomancy.yaml"
+    checks_file.write_text("Services:\n  include: base.yaml\n")
+    issues, includes = validate_checks_file(checks_file, schema)
+    assert issues == []
+    assert includes == [tmp_path / "base.yaml"]
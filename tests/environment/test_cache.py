@@ -0,0 +1,50 @@
+"""Test the cache of tokenized environment files"""
+import os
+
+from geomancy.environment import cache as cache_module
+from geomancy.environment.cache import EnvCache
+from geomancy.environment.dotenv import tokenize_env_file
+
+
+def test_env_cache(tmp_path, monkeypatch):
+    """Test that environment files are only tokenized again when they change"""
+    env_file = tmp_path / "test.env"
+    env_file.write_text('A=1\nB="$A ${C:-default}"\nnot a name-value pair\n')
+    cache = EnvCache(tmp_path / "env")
+
+    # Count the environment files tokenized
+    tokenized = []
+
+    def tokenize(filepath, **kwargs):
+        tokenized.append(filepath)
+        return tokenize_env_file(filepath, **kwargs)
+
+    monkeypatch.setattr(cache_module, "tokenize_env_file", tokenize)
+
+    tokens, errors = cache.tokenize(env_file)
+    assert [token.name for token in tokens] == ["A", "B"]
+    assert [(exc.line, exc.msg) for exc in errors] == [
+        (3, "Expected a 'name=value' pair")
+    ]
+    assert len(tokenized) == 1
+
+    # The cached tokens and syntax errors are used for the unchanged file
+    cached_tokens, cached_errors = cache.tokenize(env_file)
+    assert len(tokenized) == 1
+    assert cached_tokens == tokens
+    assert cached_tokens[1].refs[1].alt == "default"
+    assert list(map(str, cached_errors)) == list(map(str, errors))
+
+    # Changing the file invalidates the cached tokens, even if the size and
+    # modification time are the same
+    stat = env_file.stat()
+    env_file.write_text('A=2\nB="$A ${C:-default}"\nnot a name-value pair\n')
+    os.utime(env_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    tokens, errors = cache.tokenize(env_file)
+    assert len(tokenized) == 2
+    assert tokens[0].value == "2"
+
+    # Clear the cache
+    assert cache.clear() == 1
+    cache.tokenize(env_file)
+    assert len(tokenized) == 3
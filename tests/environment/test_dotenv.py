@@ -4,6 +4,13 @@ import os
 import pytest
 
 from geomancy.environment import sub_env, parse_env, load_env
+from geomancy.environment.dotenv import (
+    EnvRef,
+    EnvSyntaxError,
+    EnvTemplate,
+    tokenize_env,
+    stream_env,
+)
 
 
 def test_sub_env():
@@ -24,6 +31,107 @@ def test_sub_env():
         assert sub_env("$MISSING") == ''
 
 
+def test_tokenize_env():
+    """Test the names, values, quotes, references and line numbers of tokens
+    from tokenize_env"""
+    string = (
+        "# comment\n"
+        "A=1 # comment\n"
+        'B="$A and ${C:-default}\\t"\n'
+        "C='''multiline\n"
+        "value $A'''\n"
+        "not a name-value pair\n"
+        "D='unclosed\n"
+        " E = \n"
+    )
+    tokens = list(tokenize_env(string))
+
+    assert [token.name for token in tokens] == ["A", "B", "C", "E"]
+    assert [token.value for token in tokens] == [
+        "1 ",
+        "$A and ${C:-default}\t",
+        "multiline\nvalue $A",
+        "",
+    ]
+    assert [token.quote for token in tokens] == ["", '"', "'''", ""]
+    assert [token.line for token in tokens] == [2, 3, 4, 8]
+
+    # Single-quoted values aren't substituted, so they have no references
+    assert tokens[1].refs == (
+        EnvRef(start=0, end=2, name="A", directive="", alt=""),
+        EnvRef(start=7, end=20, name="C", directive="-", alt="default"),
+    )
+    assert tokens[2].refs == ()
+
+
+@pytest.mark.parametrize(
+    "string,line,column,msg",
+    (
+        ("A=1\nnot a name-value pair", 2, 1, "Expected a 'name=value' pair"),
+        ("A=1\n  1A=2", 2, 3, "Invalid environment variable name '1A'"),
+        ("A=1\nB = 'unclosed\nC=3", 2, 5, "Unclosed quote (') for 'B'"),
+    ),
+)
+def test_tokenize_env_syntax_errors(string, line, column, msg, caplog):
+    """Test the line and column numbers of syntax errors from tokenize_env"""
+    # Syntax errors are raised, if strict
+    with pytest.raises(EnvSyntaxError) as exc:
+        list(tokenize_env(string, source="test.env", strict=True))
+    assert (exc.value.line, exc.value.column, exc.value.msg) == (line, column, msg)
+    assert str(exc.value) == f"test.env:{line}:{column}: {msg}"
+
+    # Otherwise they're logged, and the lines with errors are skipped
+    tokens = list(tokenize_env(string, source="test.env"))
+    assert "A" in [token.name for token in tokens]
+    assert f"test.env:{line}:{column}: {msg}" in caplog.text
+
+
+def test_stream_env(tmp_path):
+    """Test streaming the environment variables of an env file"""
+    filepath = tmp_path / "test.env"
+    filepath.write_text('A=1\nB="multiline\n$A"\nC=${B}\n')
+
+    stream = stream_env(filepath, environ={})
+    assert next(stream) == ("A", "1")
+    assert next(stream) == ("B", "multiline\n1")
+    assert next(stream) == ("C", "multiline\n1")
+    assert next(stream, None) is None
+
+
+def test_env_template():
+    """Test the segments, references and memoized values of EnvTemplate"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("VAR1", "variable1")
+        mp.delenv("MISSING", raising=False)
+
+        template = EnvTemplate(" $VAR1 and ${MISSING:-default} ")
+        assert template.segments == (" ", " and ", " ")
+        assert [ref.name for ref in template.refs] == ["VAR1", "MISSING"]
+        assert template.resolve() == "variable1 and default"
+
+        # The memoized value is reused until a referenced variable changes
+        assert template.resolve() is template.resolve()
+        mp.setenv("MISSING", "found")
+        assert template.resolve() == "variable1 and found"
+
+        # Quoted strings and strings with unclosed quotes
+        assert EnvTemplate('" $VAR1 "').resolve() == " variable1 "
+        assert EnvTemplate("'$VAR1'").resolve() == "$VAR1"
+        assert EnvTemplate("'$VAR1").resolve() == "'$VAR1"
+
+
+def test_parse_env_values():
+    """Test parse_env with empty values, quotes in values and variable names
+    that match parameter names"""
+    p = parse_env
+
+    assert p("VAR=\nOTHER=1") == {"VAR": "", "OTHER": "1"}
+    assert p('VAR=""') == {"VAR": ""}
+    assert p("VAR=it's") == {"VAR": "it's"}
+    assert p('VAR="it\'s"') == {"VAR": "it's"}
+    assert p("string=1\nstrip_values=$string") == {"string": "1", "strip_values": "1"}
+
+
 def test_parse_env_docker_rules():
     """Test the parse_env function rules compared to docker dotenv rules.
 
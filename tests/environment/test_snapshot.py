@@ -0,0 +1,68 @@
+"""Test environment snapshots"""
+import os
+
+import pytest
+
+from geomancy.environment import (
+    EnvSnapshot,
+    EnvTemplate,
+    current_env,
+    use_env,
+    load_snapshot,
+)
+
+
+def test_env_snapshot():
+    """Test the versions and updates of EnvSnapshot"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("VAR1", "variable1")
+        env = EnvSnapshot()
+        assert env["VAR1"] == "variable1"
+
+        # Snapshots don't change with os.environ
+        mp.setenv("VAR1", "changed")
+        assert env["VAR1"] == "variable1"
+
+    # Updates create new snapshots, and existing variables are only replaced
+    # with overwrite
+    new_env = env.update({"VAR1": "new", "VAR2": "variable2"})
+    assert new_env.version > env.version
+    assert (new_env["VAR1"], new_env["VAR2"]) == ("variable1", "variable2")
+    assert "VAR2" not in env
+
+    new_env = env.update({"VAR1": "new"}, overwrite=True)
+    assert new_env["VAR1"] == "new"
+
+    # Updates without changes return the same snapshot
+    assert env.update({"VAR1": "variable1"}, overwrite=True) is env
+
+
+def test_use_env(test_env_file):
+    """Test substituting values with the current snapshot"""
+    filepath = test_env_file["filepath"]
+    variables = test_env_file["variables"]
+
+    with pytest.MonkeyPatch.context() as mp:
+        for name in variables.keys():
+            mp.delenv(name, raising=False)
+
+        # Loading the env file creates a snapshot without changing os.environ
+        env = load_snapshot(filepath)
+        assert {name: env[name] for name in variables} == variables
+        assert all(name not in os.environ for name in variables)
+
+        # Templates resolve with the current snapshot, and they're memoized by
+        # the snapshot's version
+        template = EnvTemplate("${VALUE3}")
+        assert current_env() is os.environ
+        assert template.resolve() == ""
+
+        with use_env(env):
+            assert current_env() is env
+            assert template.resolve() == "my-dev"
+
+            new_env = env.update({"VALUE3": "new"}, overwrite=True)
+            assert template.resolve(new_env) == "new"
+
+        assert current_env() is os.environ
+        assert template.resolve() == ""